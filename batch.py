@@ -0,0 +1,89 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+from utils.batch_runner import run_batch, write_report
+from utils.pipeline_io import load_pipeline, pipeline_hash
+
+
+def parse_option(text):
+    """Parses KEY=VALUE, reading VALUE as JSON when possible and as a string otherwise."""
+    key, separator, value = text.partition("=")
+    if not separator or not key:
+        raise argparse.ArgumentTypeError(f"Expected KEY=VALUE, got {text!r}")
+    try:
+        value = json.loads(value)
+    except ValueError:
+        pass
+    return key.strip(), value
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run a saved ImageU processing stack over a directory of images without the GUI."
+    )
+    parser.add_argument("pipeline", help="Pipeline JSON file describing the processing stack")
+    parser.add_argument("input_dir", help="Directory to search recursively for images")
+    parser.add_argument("output_dir", help="Directory to write processed images to")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Number of worker processes (default: CPU count)")
+    parser.add_argument("--max-in-flight", type=int, default=None,
+                        help="Maximum files queued at once (default: 2 per worker)")
+    parser.add_argument("--cv-threads", type=int, default=1,
+                        help="OpenCV threads per worker process (default: 1)")
+    parser.add_argument("--tile-memory", type=float, default=None,
+                        help="Run neighborhood filters in tiles using at most this many MB per worker")
+    parser.add_argument("--format", dest="output_format", default=None,
+                        help="Output file extension, e.g. png (default: keep input format)")
+    parser.add_argument("--writers", type=int, default=None,
+                        help="Threads encoding and writing outputs while workers process the next "
+                             "files (default: one per worker; 0 writes in the workers)")
+    parser.add_argument("--option", dest="encoder_options", action="append", default=[],
+                        type=parse_option, metavar="KEY=VALUE",
+                        help="Encoder setting, e.g. png_compression=6, jpeg_quality=90, "
+                             "jpeg_progressive=true, tiff_compression=deflate (repeatable)")
+    parser.add_argument("--skip-existing", action="store_true",
+                        help="Skip files whose output already exists")
+    parser.add_argument("--report", default=None,
+                        help="Report path (default: <output_dir>/batch_report.json)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print the summary")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    def progress(done, total, result):
+        if args.quiet:
+            return
+        status = "ok" if result["status"] == "ok" else f"error: {result['error']}"
+        print(f"[{done}/{total}] {result['input']} ({result['total_seconds']:.2f}s) {status}")
+
+    start = time.perf_counter()
+    stages = load_pipeline(args.pipeline)
+    results = run_batch(
+        stages, args.input_dir, args.output_dir,
+        workers=args.workers,
+        max_in_flight=args.max_in_flight,
+        output_format=args.output_format,
+        skip_existing=args.skip_existing,
+        cv_threads=args.cv_threads,
+        progress=progress,
+        tile_memory=int(args.tile_memory * 1024 * 1024) if args.tile_memory else None,
+        writers=args.writers,
+        encoder_params=dict(args.encoder_options),
+    )
+    elapsed = time.perf_counter() - start
+
+    report_path = args.report or os.path.join(args.output_dir, "batch_report.json")
+    write_report(results, report_path, elapsed, pipeline_hash(stages))
+
+    failed = sum(1 for r in results if r["status"] != "ok")
+    print(f"Processed {len(results)} files in {elapsed:.1f}s, {failed} failed. Report: {report_path}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
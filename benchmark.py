@@ -0,0 +1,89 @@
+import argparse
+import sys
+
+from utils.benchmark import (
+    SIZES, compare, compare_pixelation, environment, load_report, measure_startup, run_benchmarks,
+    save_report
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark every ImageU tool on synthetic images and compare against a baseline."
+    )
+    parser.add_argument("-o", "--output", default="benchmark_report.json",
+                        help="Where to write the JSON report (default: benchmark_report.json)")
+    parser.add_argument("--sizes", nargs="+", default=None, choices=list(SIZES),
+                        help="Image sizes to run (default: all)")
+    parser.add_argument("--channels", nargs="+", default=None, choices=["bgr", "gray"],
+                        help="Image layouts to run (default: both)")
+    parser.add_argument("--tools", nargs="+", default=None,
+                        help="Tool names to run (default: every registered tool)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed calls per case (default: 3)")
+    parser.add_argument("--baseline", default=None, help="Baseline report to compare against")
+    parser.add_argument("--max-regression", type=float, default=20.0,
+                        help="Allowed slowdown against the baseline, in percent (default: 20)")
+    parser.add_argument("--min-seconds", type=float, default=0.005,
+                        help="Ignore cases faster than this in both runs (default: 0.005)")
+    parser.add_argument("--startup", action="store_true",
+                        help="Also time cold startup (imports, tool registry, first tool) in fresh interpreters")
+    parser.add_argument("--startup-only", action="store_true",
+                        help="Only time cold startup, skipping the per-tool cases")
+    parser.add_argument("--pixelation", action="store_true",
+                        help="Also compare pixelation against the old per-block loop on 4K and 8K frames")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only print the summary")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    def progress(result):
+        if args.quiet:
+            return
+        case = f"{result['tool']} [{result['size']} {result['channels']}]"
+        if result["status"] != "ok":
+            print(f"{case}: {result['status']} {result['error'] or ''}")
+            return
+        rss = result["peak_rss_bytes"]
+        rss_text = f"{rss / 2**20:.0f} MiB" if rss is not None else "n/a"
+        print(f"{case}: {result['seconds_median'] * 1000:.1f} ms, peak RSS +{rss_text}, "
+              f"allocated {result['alloc_peak_bytes'] / 2**20:.0f} MiB")
+
+    if args.startup_only:
+        report = {"environment": environment(), "repeat": args.repeat, "results": []}
+    else:
+        report = run_benchmarks(args.tools, args.sizes, args.channels, args.repeat, progress)
+    if args.startup or args.startup_only:
+        report["startup"] = measure_startup(args.repeat)
+        for phase, seconds in report["startup"].items():
+            print(f"startup {phase}: {seconds * 1000:.0f} ms")
+    if args.pixelation:
+        report["pixelation"] = compare_pixelation(repeat=args.repeat)
+        for case in report["pixelation"]:
+            print(f"pixelation {case['size']}: loop {case['loop_seconds']:.2f} s, "
+                  f"square {case['square_seconds']:.2f} s ({case['speedup']:.0f}x), "
+                  f"hexagonal {case['hexagonal_seconds']:.2f} s, max difference {case['max_difference']}")
+    save_report(report, args.output)
+    errors = sum(1 for r in report["results"] if r["status"] == "error")
+    print(f"Ran {len(report['results'])} cases, {errors} errors. Report: {args.output}")
+
+    if args.baseline:
+        regressions = compare(report, load_report(args.baseline),
+                              args.max_regression / 100, args.min_seconds)
+        for regression in regressions:
+            case = f"{regression['tool']} [{regression['size']} {regression['channels']}]"
+            if "reason" in regression:
+                print(f"REGRESSION {case}: now fails ({regression['reason']})")
+            else:
+                print(f"REGRESSION {case}: {regression['baseline_seconds'] * 1000:.1f} ms -> "
+                      f"{regression['seconds'] * 1000:.1f} ms (+{regression['change'] * 100:.0f}%)")
+        if regressions:
+            print(f"{len(regressions)} regressions over {args.max_regression:g}% against {args.baseline}")
+            return 1
+        print(f"No regressions over {args.max_regression:g}% against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -186,18 +186,11 @@ class AddProcessDialog(BaseDialog):
             # Filter tools based on the selected category
             self.filtered_tools = []
             for tool_name in self.available_tools:
-                # Get the class name by removing spaces
-                class_name = "".join(tool_name.split())
-                
-                # Try to find the tool in the tool categories dictionary
-                # We need to check if the class name exists or if a similar name exists
-                matching_tool = None
-                for key in self.tool_manager.tool_categories:
-                    if key.lower() in class_name.lower() or class_name.lower() in key.lower():
-                        matching_tool = key
-                        break
-                
-                if matching_tool and self.tool_manager.tool_categories[matching_tool].value == selected_category:
+                try:
+                    category = self.tool_manager.get_display_category(tool_name)
+                except ValueError:
+                    continue
+                if category.value == selected_category:
                     self.filtered_tools.append(tool_name)
         
         # Update the tool selector
@@ -244,7 +237,8 @@ class ConfigDialog(BaseDialog):
                 input_field.addItems(valid_options[param])
                 input_field.setCurrentText(str(value))
             else:
-                input_field = QLineEdit(str(value))
+                # Values are read back with eval, so strings such as paths keep their quotes
+                input_field = QLineEdit(repr(value) if isinstance(value, str) else str(value))
             
             input_field.setStyleSheet("""
                 QLineEdit, QComboBox {
@@ -0,0 +1,176 @@
+# gui/image_item.py
+import math
+import sys
+from collections import OrderedDict
+from typing import Tuple
+
+import numpy as np
+from PyQt5 import sip
+from PyQt5.QtCore import QRectF
+from PyQt5.QtGui import QImage, QPixmap
+from PyQt5.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem
+
+from utils.bit_depth import to_display
+from utils.image_source import area_resize
+
+# Edge length of pyramid tiles in pixels of their level
+TILE_SIZE = 512
+
+# Budget for tiles converted to pixmaps, across all levels
+TILE_CACHE_BYTES = 256 * 1024 * 1024
+
+# QImage formats matching OpenCV's channel order in memory, by channel count
+_FORMATS = {
+    1: QImage.Format_Grayscale8,
+    3: QImage.Format_BGR888,
+    # BGRA bytes are ARGB32 on little-endian machines
+    4: QImage.Format_ARGB32,
+}
+
+
+def numpy_to_qimage(image: np.ndarray) -> Tuple[QImage, np.ndarray]:
+    """Wraps a uint8 OpenCV image in a QImage without copying its pixels.
+
+    Returns the QImage and the array it reads from: image itself (views
+    with padded rows included), or a packed copy if its pixels are not
+    contiguous within rows. The caller must keep that array alive and
+    unmodified for as long as the QImage is used.
+    """
+    if image.dtype != np.uint8:
+        raise ValueError(f"Cannot display {image.dtype} images")
+    channels = image.shape[2] if image.ndim == 3 else 1
+    if channels not in _FORMATS:
+        raise ValueError(f"Cannot display images with {channels} channels")
+    if channels == 4 and sys.byteorder != "little":
+        raise ValueError("BGRA display needs a little-endian machine")
+    # Rows may be padded, but the pixels within a row must be packed
+    if image.strides[-1] != 1 or (image.ndim == 3 and image.strides[1] != channels):
+        image = np.ascontiguousarray(image)
+    height, width = image.shape[:2]
+    # A raw pointer, since PyQt only accepts buffers that are contiguous overall
+    return QImage(sip.voidptr(image.ctypes.data), width, height, image.strides[0], _FORMATS[channels]), image
+
+
+class ImageItem(QGraphicsItem):
+    """Graphics item that paints a NumPy image as a tiled mip pyramid.
+
+    Each paint picks the pyramid level matching the view's magnification
+    and draws only the tiles that intersect the exposed area, so the cost
+    of panning and zooming depends on the viewport size rather than the
+    image size. Levels are downscaled lazily from the nearest finer one the
+    first time they are needed, and tiles are converted to pixmaps on first use
+    and kept in an LRU cache bounded by TILE_CACHE_BYTES.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._array = None
+        self._levels = []
+        self._tiles = OrderedDict()
+        self._tile_bytes = 0
+        self._rect = QRectF()
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+
+    def set_image(self, image: np.ndarray):
+        """Shows image; the array must not be modified while it is displayed."""
+        if image is self._array:
+            return
+        # Validate before replacing the current image
+        numpy_to_qimage(to_display(image[:1, :1]))
+        rect = QRectF(0, 0, image.shape[1], image.shape[0])
+        if rect != self._rect:
+            self.prepareGeometryChange()
+            self._rect = rect
+        self._array = image
+        self._levels = [image]
+        self._tiles.clear()
+        self._tile_bytes = 0
+        self.update()
+
+    def clear(self):
+        """Drops the image and its pyramid."""
+        self.prepareGeometryChange()
+        self._array = None
+        self._levels = []
+        self._tiles.clear()
+        self._tile_bytes = 0
+        self._rect = QRectF()
+
+    def image(self):
+        """The displayed array, or None."""
+        return self._array
+
+    def boundingRect(self):
+        return self._rect
+
+    def _level(self, index):
+        if index < len(self._levels) and self._levels[index] is not None:
+            return self._levels[index]
+        self._levels.extend([None] * (index + 1 - len(self._levels)))
+        # Downscale the nearest finer level in one pass, so intermediate levels of
+        # a memory-mapped image are never built unless they are shown
+        source = max(i for i in range(index) if self._levels[i] is not None)
+        height, width = self._levels[source].shape[:2]
+        for _ in range(index - source):
+            height, width = (height + 1) // 2, (width + 1) // 2
+        self._levels[index] = area_resize(self._levels[source], (width, height))
+        return self._levels[index]
+
+    def _level_for(self, level_of_detail):
+        """Coarsest level that still has at least one pixel per device pixel."""
+        if level_of_detail >= 1:
+            return 0
+        height, width = self._array.shape[:2]
+        coarsest = max(0, int(math.ceil(math.log2(max(width, height)))) - int(math.log2(TILE_SIZE)))
+        return min(int(math.floor(math.log2(1 / level_of_detail))), coarsest)
+
+    def _tile(self, index, row, column):
+        key = (index, row, column)
+        pixmap = self._tiles.get(key)
+        if pixmap is not None:
+            self._tiles.move_to_end(key)
+            return pixmap
+        level = self._level(index)
+        y0, x0 = row * TILE_SIZE, column * TILE_SIZE
+        # Deeper images are kept as they are and only tiles are reduced to 8 bits
+        qt_image, _ = numpy_to_qimage(to_display(level[y0:y0 + TILE_SIZE, x0:x0 + TILE_SIZE]))
+        # fromImage copies, so the level array only has to outlive this call
+        pixmap = QPixmap.fromImage(qt_image)
+        self._tiles[key] = pixmap
+        self._tile_bytes += pixmap.width() * pixmap.height() * 4
+        while self._tile_bytes > TILE_CACHE_BYTES and len(self._tiles) > 1:
+            _, evicted = self._tiles.popitem(last=False)
+            self._tile_bytes -= evicted.width() * evicted.height() * 4
+        return pixmap
+
+    def paint(self, painter, option, widget=None):
+        if self._array is None:
+            return
+        # exposedRect may cover the whole item (e.g. QGraphicsScene.render), so
+        # also clip to the part of the paint device that is visible
+        device = painter.device()
+        inverse, invertible = painter.worldTransform().inverted()
+        exposed = option.exposedRect.intersected(self._rect)
+        if invertible:
+            exposed = exposed.intersected(inverse.mapRect(QRectF(0, 0, device.width(), device.height())))
+        if painter.hasClipping():
+            exposed = exposed.intersected(painter.clipBoundingRect())
+        if exposed.isEmpty():
+            return
+        lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        index = self._level_for(lod)
+        level = self._level(index)
+        height, width = self._array.shape[:2]
+        level_height, level_width = level.shape[:2]
+        sx, sy = width / level_width, height / level_height
+
+        rows = range(max(0, int(exposed.top() / sy) // TILE_SIZE),
+                     min(int(math.ceil(exposed.bottom() / sy)), level_height - 1) // TILE_SIZE + 1)
+        columns = range(max(0, int(exposed.left() / sx) // TILE_SIZE),
+                        min(int(math.ceil(exposed.right() / sx)), level_width - 1) // TILE_SIZE + 1)
+        for row in rows:
+            for column in columns:
+                pixmap = self._tile(index, row, column)
+                target = QRectF(column * TILE_SIZE * sx, row * TILE_SIZE * sy,
+                                pixmap.width() * sx, pixmap.height() * sy)
+                painter.drawPixmap(target, pixmap, QRectF(pixmap.rect()))
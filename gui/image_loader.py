@@ -0,0 +1,90 @@
+import threading
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from utils.image_io import read_image
+
+
+class _LoadJob(QRunnable):
+    def __init__(self, loader, load_id, path):
+        super().__init__()
+        self.loader = loader
+        self.load_id = load_id
+        self.path = path
+        self.image = None
+        self.error = None
+        self.done = threading.Event()
+
+    def is_superseded(self):
+        return self.load_id != self.loader.latest_load_id
+
+    def run(self):
+        try:
+            # A load cancelled while queued never starts decoding
+            if self.is_superseded():
+                return
+            try:
+                self.image = read_image(self.path)
+            except Exception as e:
+                self.error = str(e)
+        finally:
+            self.done.set()
+        if self.is_superseded():
+            return
+        if self.error is None:
+            self.loader.image_loaded.emit(self.load_id, self.image)
+        else:
+            self.loader.load_failed.emit(self.load_id, self.error)
+
+
+class ImageLoader(QObject):
+    """Decodes full-resolution images on a worker thread and reports them via signals."""
+
+    image_loaded = pyqtSignal(int, object)
+    load_failed = pyqtSignal(int, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.latest_load_id = 0
+        self._job = None
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+    def load(self, path):
+        """Queues a decode of path, superseding any pending one."""
+        self.latest_load_id += 1
+        self._job = _LoadJob(self, self.latest_load_id, path)
+        self.pool.start(self._job)
+        return self.latest_load_id
+
+    def cancel(self):
+        """Abandons the pending decode; a decode already running is discarded when it ends."""
+        self.latest_load_id += 1
+        self._job = None
+
+    def is_loading(self):
+        return self._job is not None and not self._job.done.is_set()
+
+    def wait(self):
+        """Blocks until the latest decode finishes and returns its image."""
+        return self.waiter()()
+
+    def waiter(self):
+        """Returns a function that blocks until the latest decode finishes and returns its image.
+
+        The function stays bound to the current decode even if another
+        load supersedes it, so it can be handed to a worker thread.
+        """
+        job = self._job
+        if job is None:
+            raise ValueError("No image is loading")
+
+        def wait():
+            job.done.wait()
+            if job.error is not None:
+                raise ValueError(job.error)
+            if job.image is None:
+                raise ValueError("The image load was cancelled")
+            return job.image
+
+        return wait
@@ -0,0 +1,63 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from utils.image_io import write_image
+
+
+class _SaveJob(QRunnable):
+    def __init__(self, saver, save_id, path, write):
+        super().__init__()
+        self.saver = saver
+        self.save_id = save_id
+        self.path = path
+        self.write = write
+
+    def run(self):
+        try:
+            def report(fraction):
+                self.saver.save_progress.emit(self.save_id, fraction)
+
+            self.write(report)
+        except Exception as e:
+            self.saver.save_failed.emit(self.save_id, str(e))
+            return
+        self.saver.save_finished.emit(self.save_id, self.path)
+
+
+class ImageSaver(QObject):
+    """Renders and encodes images for saving on a worker thread.
+
+    Saves run one at a time in the order they were requested and are never
+    superseded, so every requested file gets written.
+    """
+
+    # (save id, fraction done from 0 to 1)
+    save_progress = pyqtSignal(int, float)
+    save_finished = pyqtSignal(int, str)
+    save_failed = pyqtSignal(int, str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.latest_save_id = 0
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+    def save(self, path, produce, options=None):
+        """Queues a save of the image returned by produce() to path.
+
+        produce runs on the worker, so it may render or wait for a decode;
+        options are EncoderOptions, or None for the format's defaults.
+        """
+        return self.save_with(path, lambda progress: write_image(path, produce(), options, progress))
+
+    def save_with(self, path, write):
+        """Queues write(progress), which writes path itself and reports progress from 0 to 1."""
+        self.latest_save_id += 1
+        self.pool.start(_SaveJob(self, self.latest_save_id, path, write))
+        return self.latest_save_id
+
+    def is_saving(self):
+        return self.pool.activeThreadCount() > 0
+
+    def wait(self):
+        """Blocks until all queued saves are written."""
+        self.pool.waitForDone()
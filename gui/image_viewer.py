@@ -1,13 +1,38 @@
 from PyQt5.QtWidgets import (
-    QGraphicsView, QGraphicsScene, QGraphicsPixmapItem,
+    QGraphicsView, QGraphicsScene,
     QRubberBand, QLabel, QWidget
 )
-from PyQt5.QtGui import QPixmap, QImage, QPainter, QCursor, QFont, QColor
-from PyQt5.QtCore import Qt, QRectF, QPointF, QSizeF, QPoint, QRect, QTimer
-import cv2
+from PyQt5.QtGui import QPainter, QCursor, QFont, QColor
+from PyQt5.QtCore import Qt, QRectF, QPointF, QSizeF, QPoint, QRect, QTimer, pyqtSignal
+import copy
+import os
+import numpy as np
 from .dialogs import AddProcessDialog, ConfigDialog
+from .image_item import ImageItem
+from .image_loader import ImageLoader
+from .image_saver import ImageSaver
+from .processing_engine import ProcessingEngine
+from utils.pipeline_executor import PipelineExecutor, accumulated_halo
+from utils.profiler import PipelineProfiler
+from utils.tile_executor import TileExecutor
+from utils.decode_cache import DecodeCache
+from utils.image_io import FORMATS, PREVIEW_MAX_PIXELS, file_key, image_format, read_image, read_reduced
+from utils.image_source import MAPPED_EXTENSIONS, is_mapped, open_mapped, write_streamed
+from utils.stage_cache import StageCache
+from utils.proxy import make_proxy, proxy_scale_for, scale_stack
+
+# Zoomed-in views showing at most this fraction of the image render the
+# visible region first, then the rest
+ROI_MAX_FRACTION = 0.25
 
 class ImageViewer(QGraphicsView):
+    # Emitted with the restored stack when a render fails and an edit is rolled back
+    stack_reverted = pyqtSignal(list)
+    # Emitted with True when a background render starts and False when it settles
+    rendering_changed = pyqtSignal(bool)
+    # Profiled run of the displayed render and the scale it was rendered at
+    stage_profile_changed = pyqtSignal(object, float)
+
     def __init__(self):
         super().__init__()
         self.setup_ui()
@@ -20,9 +45,14 @@ class ImageViewer(QGraphicsView):
         self.setScene(self.scene)
         
         # Image item setup
-        self.image_item = QGraphicsPixmapItem()
-        self.image_item.setShapeMode(QGraphicsPixmapItem.BoundingRectShape)
+        # Paints the processed array directly, without an RGB copy or pixmap
+        self.image_item = ImageItem()
         self.scene.addItem(self.image_item)
+        # Visible region rendered ahead of the full image, shown over it until that arrives
+        self.region_item = ImageItem()
+        self.region_item.setZValue(1)
+        self.region_item.hide()
+        self.scene.addItem(self.region_item)
         
         # Enhanced view settings
         self.setRenderHint(QPainter.Antialiasing, True)
@@ -128,6 +158,8 @@ class ImageViewer(QGraphicsView):
 
     def setup_variables(self):
         self.original_image = None
+        # (height, width) of the full-resolution image, known before it is decoded
+        self.image_shape = None
         self.processed_image = None
         self.processing_stack = []
         self.zoom_factor = 1.0
@@ -135,6 +167,54 @@ class ImageViewer(QGraphicsView):
         self.max_zoom = 10.0
         self.error_state = False
 
+        # Per-stage output cache so edits only recompute downstream stages;
+        # neighborhood filters run in tiles to bound memory on large images
+        self.stage_cache = StageCache()
+        # Allocation tracking slows every render, so it is only on while a timeline is recorded
+        self.profiler = PipelineProfiler(track_allocations=False)
+        self.executor = PipelineExecutor(self.stage_cache, TileExecutor(), self.profiler)
+        self.source_key = None
+
+        # Background rendering so tool.apply never blocks the event loop
+        self.engine = ProcessingEngine(self.executor, self)
+        self.engine.render_finished.connect(self._on_render_finished)
+        self.engine.region_finished.connect(self._on_region_finished)
+        self.engine.render_failed.connect(self._on_render_failed)
+        self.engine.render_profiled.connect(self._on_render_profiled)
+        self.rendered_stack = []
+        # Parameters of rendered_stack, since edits change the tools in place
+        self._rendered_parameters = []
+        self._render_pending = False
+        self._render_error_prefix = "Error applying processing"
+
+        # Interactive edits render on a downscaled proxy; full resolution follows on idle
+        self.preview_mode = True
+        self.processed_scale = 1.0
+        self._render_scale = 1.0
+        self._proxies = {}
+        self.full_render_timer = QTimer(self)
+        self.full_render_timer.setSingleShot(True)
+        self.full_render_timer.setInterval(700)
+        self.full_render_timer.timeout.connect(self.render_full_resolution)
+
+        # Large JPEGs show a reduced decode at once; the full decode follows in the background
+        self.loader = ImageLoader(self)
+        self.loader.image_loaded.connect(self._on_image_loaded)
+        self.loader.load_failed.connect(self._on_load_failed)
+        self._preview = None  # (reduced decode, its scale) until the full image arrives
+
+        # Proxies of recently opened images are kept on disk, so reopening one shows at once
+        self.decode_cache = DecodeCache()
+        self._cached_levels = {}  # scale -> memory-mapped proxy from the decode cache
+
+        # Saves render and encode on their own worker; finished stages come from the shared cache
+        self.saver = ImageSaver(self)
+        self.save_executor = PipelineExecutor(self.stage_cache, TileExecutor())
+
+    def set_cache_budget(self, megabytes):
+        """Sets the memory budget for cached intermediate frames."""
+        self.stage_cache.max_bytes = int(float(megabytes) * 1024 * 1024)
+
     def show_error(self, message):
         self.error_label.setText(message)
         self.error_label.adjustSize()
@@ -199,13 +279,55 @@ class ImageViewer(QGraphicsView):
 
     def load_image(self, file_path):
         try:
-            image = cv2.imread(file_path)
-            if image is None:
-                raise ValueError("Failed to load image")
-            
-            self.original_image = image
-            self.processed_image = image.copy()
+            source_key = file_key(file_path)
+            # Proxies cached by an earlier open are shown without decoding anything
+            cached = self.decode_cache.load(source_key)
+            # Uncompressed scans too large for memory are mapped and read on demand
+            image = open_mapped(file_path)
+            preview = None
+            if cached is not None:
+                image_shape, levels = cached
+                # The largest cached proxy within the budget of a reduced decode
+                scale = max((scale for scale, level in levels.items()
+                             if level.shape[0] * level.shape[1] <= PREVIEW_MAX_PIXELS), default=min(levels))
+                preview = (np.array(levels[scale]), scale)
+            elif image is None:
+                reduced = read_reduced(file_path)
+                if reduced is None:
+                    image = read_image(file_path)
+                else:
+                    reduced_image, factor, image_shape = reduced
+                    preview = (reduced_image, 1.0 / factor)
+
+            self.engine.cancel()
+            self.loader.cancel()
+            self.full_render_timer.stop()
+            self._render_pending = False
+            self._clear_region()
+            self._proxies = {}
+            self._cached_levels = {} if cached is None else cached[1]
+            if image is not None:
+                self._preview = None
+                self.original_image = image
+                self.image_shape = image.shape[:2]
+                # Tools never modify their input, so the display can share the original
+                self.processed_image = image
+                self.processed_scale = 1.0
+                if preview is not None:
+                    # A mapped image shows its cached proxy instead of reading the whole file
+                    self.processed_image, self.processed_scale = preview
+                self.decode_cache.store_async(source_key, image)
+            else:
+                self._preview = preview
+                self.original_image = None
+                self.image_shape = image_shape
+                self.processed_image, self.processed_scale = preview
+                self.loader.load(file_path)
             self.processing_stack = []
+            self.rendered_stack = []
+            self._rendered_parameters = []
+            self.stage_cache.clear()
+            self.source_key = source_key
             self.update_display()
             self.fitInView(self.scene.sceneRect(), Qt.KeepAspectRatio)
             self.zoom_factor = 1.0
@@ -220,38 +342,153 @@ class ImageViewer(QGraphicsView):
             return
         
         try:
-            rgb_image = cv2.cvtColor(self.processed_image, cv2.COLOR_BGR2RGB)
-            height, width, channel = rgb_image.shape
-            bytes_per_line = 3 * width
-            
-            qt_image = QImage(rgb_image.data, width, height, bytes_per_line, QImage.Format_RGB888)
-            qt_pixmap = QPixmap.fromImage(qt_image)
-            
-            self.image_item.setPixmap(qt_pixmap)
-            self.scene.setSceneRect(self.image_item.boundingRect())
+            self.image_item.set_image(self.processed_image)
+            width = self.processed_image.shape[1]
+
+            # Stretch proxy renders over the full-resolution scene rect
+            if self.image_shape is not None:
+                self.image_item.setScale(self.image_shape[1] / width)
+            self.scene.setSceneRect(self.image_item.sceneBoundingRect())
             
         except Exception as e:
             self.show_error(f"Error updating display: {str(e)}")
 
+    def has_image(self):
+        return self.image_shape is not None
+
+    def preview_scale(self):
+        """Returns the proxy scale matching the current on-screen magnification."""
+        scale = proxy_scale_for(self.transform().m11(), self.image_shape) if self.preview_mode else 1.0
+        if self._preview is not None:
+            # Until the full decode arrives nothing finer than the reduced decode or cached proxies exists
+            scale = min(scale, max([self._preview[1]] + list(self._cached_levels)))
+        return scale
+
+    def _get_proxy(self, scale):
+        if scale not in self._proxies:
+            if scale in self._cached_levels:
+                # Read into memory so renders don't stream it like a mapped image
+                self._proxies[scale] = (np.array(self._cached_levels[scale]), f"{self.source_key}@{scale}")
+            elif self.original_image is not None:
+                self._proxies[scale] = (make_proxy(self.original_image, scale), f"{self.source_key}@{scale}")
+            else:
+                # Keyed apart from proxies of the full image, which differ slightly
+                preview, preview_scale = self._preview
+                self._proxies[scale] = (make_proxy(preview, scale / preview_scale),
+                                        f"{self.source_key}@{scale}~reduced")
+        return self._proxies[scale]
+
+    def request_render(self, error_prefix="Error applying processing", full_resolution=False):
+        """Queues a background render of the current processing stack."""
+        self._render_error_prefix = error_prefix
+        self._render_pending = True
+        self.full_render_timer.stop()
+
+        scale = 1.0 if full_resolution and self.original_image is not None else self.preview_scale()
+        region = None
+        if scale < 1.0:
+            image, key = self._get_proxy(scale)
+            stack = scale_stack(self.processing_stack, scale)
+        else:
+            image, key, stack = self.original_image, self.source_key, self.processing_stack
+            region = self.visible_region()
+        self._render_scale = scale
+        self.engine.submit(image, stack, key, region)
+        self.rendering_changed.emit(True)
+
+    def visible_region(self):
+        """Returns the visible part of the image as (y0, y1, x0, x1) if it is a small part of it."""
+        height, width = self.image_shape
+        visible = self.mapToScene(self.viewport().rect()).boundingRect().toAlignedRect()
+        visible = visible.intersected(QRect(0, 0, width, height))
+        if visible.isEmpty() or visible.width() * visible.height() > ROI_MAX_FRACTION * width * height:
+            return None
+        return visible.top(), visible.bottom() + 1, visible.left(), visible.right() + 1
+
+    def _on_image_loaded(self, load_id, image):
+        if load_id != self.loader.latest_load_id or self._preview is None:
+            return
+        self._finish_load(image)
+
+    def _on_load_failed(self, load_id, message):
+        if load_id != self.loader.latest_load_id:
+            return
+        self.show_error(f"Error loading full-resolution image: {message}")
+
+    def _finish_load(self, image):
+        """Switches from the reduced decode to the full-resolution image."""
+        self._preview = None
+        self.original_image = image
+        self.image_shape = image.shape[:2]
+        self._proxies = {}
+        self.decode_cache.store_async(self.source_key, image)
+        self.render_full_resolution()
+
+    def _clear_region(self):
+        self.region_item.hide()
+        self.region_item.clear()
+
+    def render_full_resolution(self):
+        """Replaces a proxy preview with a full-resolution render."""
+        if self.original_image is None or self._render_pending or self.processed_scale >= 1.0:
+            return
+        self.request_render(self._render_error_prefix, full_resolution=True)
+
+    def _on_region_finished(self, job_id, region, image):
+        if job_id != self.engine.latest_job_id:
+            return
+        y0, _, x0, _ = region
+        try:
+            self.region_item.set_image(image)
+        except ValueError as e:
+            self.show_error(f"Error updating display: {str(e)}")
+            return
+        self.region_item.setPos(x0, y0)
+        self.region_item.show()
+
+    def _on_render_finished(self, job_id, image):
+        if job_id != self.engine.latest_job_id:
+            return
+        self._render_pending = False
+        self._clear_region()
+        self.rendered_stack = self.processing_stack.copy()
+        self._rendered_parameters = [copy.deepcopy(tool.get_parameters()) for tool in self.rendered_stack]
+        self.processed_image = image
+        self.processed_scale = self._render_scale
+        self.update_display()
+        self.rendering_changed.emit(False)
+        if self.processed_scale < 1.0:
+            self.full_render_timer.start()
+
+    def _on_render_profiled(self, job_id, run):
+        if job_id != self.engine.latest_job_id or run is None:
+            return
+        self.stage_profile_changed.emit(run, self._render_scale)
+
+    def _on_render_failed(self, job_id, message):
+        if job_id != self.engine.latest_job_id:
+            return
+        self._render_pending = False
+        self._clear_region()
+        self.show_error(f"{self._render_error_prefix}: {message}")
+        # Roll back to the last stack and parameters that rendered successfully
+        edited = [(tool, params) for tool, params in zip(self.rendered_stack, self._rendered_parameters)
+                  if tool.get_parameters() != params]
+        if self.processing_stack != self.rendered_stack or edited:
+            for tool, params in edited:
+                tool.update_parameters(copy.deepcopy(params))
+            self.processing_stack = self.rendered_stack.copy()
+            self.stack_reverted.emit(self.processing_stack.copy())
+        self.rendering_changed.emit(False)
+
     def add_processing(self, tool):
-        if self.original_image is None:
+        if not self.has_image():
             self.show_error("No image loaded")
             return False
 
         try:
-            # Create a copy of the processing stack
-            new_stack = self.processing_stack.copy()
-            new_stack.append(tool)
-            
-            # Test the new processing chain
-            temp_image = self.original_image.copy()
-            for t in new_stack:
-                temp_image = t.apply(temp_image)
-            
-            # If successful, update the actual stack and image
-            self.processing_stack = new_stack
-            self.processed_image = temp_image
-            self.update_display()
+            self.processing_stack = self.processing_stack + [tool]
+            self.request_render("Failed to add processing tool")
             return True
             
         except Exception as e:
@@ -263,44 +500,35 @@ class ImageViewer(QGraphicsView):
             if not 0 <= index < len(self.processing_stack):
                 raise IndexError("Invalid processing tool index")
             
-            # Create a copy of the processing stack without the removed tool
-            new_stack = self.processing_stack[:index] + self.processing_stack[index+1:]
-            
-            # Test the new processing chain
-            temp_image = self.original_image.copy()
-            for tool in new_stack:
-                temp_image = tool.apply(temp_image)
-            
-            # If successful, update the actual stack and image
-            self.processing_stack = new_stack
-            self.processed_image = temp_image
-            self.update_display()
+            self.processing_stack = self.processing_stack[:index] + self.processing_stack[index+1:]
+            self.request_render("Failed to remove processing tool")
             return True
             
         except Exception as e:
             self.show_error(f"Failed to remove processing tool: {str(e)}")
             return False
 
+    def set_processing_stack(self, stack):
+        """Replaces the whole processing stack, e.g. with a loaded pipeline."""
+        if not self.has_image():
+            self.show_error("No image loaded")
+            return False
+
+        self.processing_stack = list(stack)
+        self.request_render("Failed to apply pipeline")
+        return True
+
     def move_processing(self, from_index, to_index):
         try:
             if not (0 <= from_index < len(self.processing_stack) and 
                    0 <= to_index < len(self.processing_stack)):
                 raise IndexError("Invalid processing tool index")
             
-            # Create a new processing stack with the moved tool
             new_stack = self.processing_stack.copy()
             tool = new_stack.pop(from_index)
             new_stack.insert(to_index, tool)
-            
-            # Test the new processing chain
-            temp_image = self.original_image.copy()
-            for tool in new_stack:
-                temp_image = tool.apply(temp_image)
-            
-            # If successful, update the actual stack and image
             self.processing_stack = new_stack
-            self.processed_image = temp_image
-            self.update_display()
+            self.request_render("Failed to move processing tool")
             return True
             
         except Exception as e:
@@ -325,32 +553,74 @@ class ImageViewer(QGraphicsView):
         self.zoom_factor = max(self.min_zoom, min(self.zoom_factor, self.max_zoom))
         self.scale(factor, factor)
 
-    def save_image(self, file_path):
-        if self.processed_image is None:
+        # Zooming past the proxy resolution brings the full render forward
+        if self.processed_scale < 1.0 and not self._render_pending:
+            self.full_render_timer.start()
+
+    def save_image(self, file_path, options=None):
+        """Queues a full-resolution save of the processed image and returns its save id.
+
+        Rendering, encoding and writing happen on the saver's worker; progress
+        and the outcome are reported by the saver's signals. Returns None if
+        the save could not be queued.
+        """
+        if not self.has_image():
             self.show_error("No image to save")
-            return False
-            
+            return None
+
         try:
-            cv2.imwrite(file_path, self.processed_image)
-            return True
+            stack = copy.deepcopy(self.processing_stack)
+            source_key, executor = self.source_key, self.save_executor
+            extension = os.path.splitext(file_path)[1].lower()
+            if is_mapped(self.original_image) and extension in MAPPED_EXTENSIONS:
+                original = self.original_image
+                if accumulated_halo(stack) is not None:
+                    # Stream the result tile by tile into the file so it never has to fit in memory
+                    sample = executor.run_streamed(original[:64, :64], stack)
+
+                    def write(progress):
+                        write_streamed(file_path, original.shape[:2] + sample.shape[2:], sample.dtype,
+                                       lambda output: executor.run_streamed(original, stack, output,
+                                                                            progress=progress))
+
+                    return self.saver.save_with(file_path, write)
+                if extension not in FORMATS:
+                    # Whole-image tools need the result in memory; .npy has no encoder, so
+                    # the result is copied into a mapped file instead
+                    def write(progress):
+                        result = executor.run(original, stack, source_key)
+                        write_streamed(file_path, result.shape, result.dtype,
+                                       lambda output: np.copyto(output, result))
+                        progress(1.0)
+
+                    return self.saver.save_with(file_path, write)
+                # Other formats are encoded in memory like any other save
+
+            image_format(file_path)
+            if self._preview is not None:
+                # Saving needs the full-resolution image, so the worker waits for its decode
+                source = self.loader.waiter()
+            else:
+                original = self.original_image
+                source = lambda: original
+            if not self._render_pending and self.processed_scale >= 1.0 and self._preview is None:
+                # The display is already the full-resolution result
+                processed = self.processed_image
+                produce = lambda: processed
+            else:
+                produce = lambda: executor.run(source(), stack, source_key)
+            return self.saver.save(file_path, produce, options)
         except Exception as e:
             self.show_error(f"Error saving image: {str(e)}")
-            return False
+            return None
 
     def apply_processing(self):
         try:
-            if self.original_image is None:
+            if not self.has_image():
                 raise ValueError("No image loaded")
             
-            # Start with a fresh copy of the original image
-            self.processed_image = self.original_image.copy()
-        
-            # Apply each tool in the processing stack
-            for tool in self.processing_stack:
-                self.processed_image = tool.apply(self.processed_image)
-            
-            # Update the display with the newly processed image
-            self.update_display()
+            # Re-render in the background, recomputing only stages whose parameters changed
+            self.request_render()
             return True
         
         except Exception as e:
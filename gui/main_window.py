@@ -5,9 +5,13 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QIcon, QFont
+import os
 from .image_viewer import ImageViewer
 from .dialogs import AddProcessDialog, ConfigDialog
 from utils.tool_manager import ToolManager
+from utils.pipeline_io import build_stack, load_pipeline, save_pipeline, stack_to_stages
+from utils.profiler import format_stage, save_chrome_trace
+from utils.image_io import EncoderOptions
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -57,6 +61,12 @@ class MainWindow(QMainWindow):
 
         # Initialize tool manager
         self.tool_manager = ToolManager()
+        # Display names of tools in the stack, used to rebuild the list after a rollback
+        self.tool_names = {}
+        # Chrome trace file each finished render is written to while recording
+        self.trace_path = None
+        # Last encoder settings chosen for each format
+        self.encoder_settings = {}
 
     def setup_sidebar(self, main_layout):
         # Sidebar container
@@ -156,6 +166,15 @@ class MainWindow(QMainWindow):
         self.save_button.clicked.connect(self.save_image)
         layout.addWidget(self.save_button)
 
+        # Pipeline presets
+        self.load_pipeline_button = self.create_button("Load Pipeline", "open.png")
+        self.load_pipeline_button.clicked.connect(self.load_pipeline)
+        layout.addWidget(self.load_pipeline_button)
+
+        self.save_pipeline_button = self.create_button("Save Pipeline", "save.png")
+        self.save_pipeline_button.clicked.connect(self.save_pipeline)
+        layout.addWidget(self.save_pipeline_button)
+
         # Process controls
         self.add_process_button = self.create_button("Add Process", "add.png")
         self.add_process_button.clicked.connect(self.add_processing)
@@ -179,6 +198,11 @@ class MainWindow(QMainWindow):
 
         layout.addLayout(move_layout)
 
+        self.record_button = self.create_button("Record Timeline", "record.png")
+        self.record_button.setCheckable(True)
+        self.record_button.toggled.connect(self.toggle_timeline_recording)
+        layout.addWidget(self.record_button)
+
     def create_processing_list(self, layout):
         self.process_list = QListWidget()
         self.process_list.setStyleSheet("""
@@ -234,8 +258,78 @@ class MainWindow(QMainWindow):
 
     def setup_connections(self):
         self.process_list.itemSelectionChanged.connect(self.update_button_states)
+        self.image_viewer.stack_reverted.connect(self.sync_process_list)
+        self.image_viewer.rendering_changed.connect(self.update_render_status)
+        self.image_viewer.stage_profile_changed.connect(self.show_stage_profile)
+        self.image_viewer.saver.save_progress.connect(self.show_save_progress)
+        self.image_viewer.saver.save_finished.connect(self.on_save_finished)
+        self.image_viewer.saver.save_failed.connect(self.on_save_failed)
         self.update_button_states()
 
+    def sync_process_list(self, stack):
+        """Rebuilds the processing list to match the viewer's stack."""
+        self.process_list.clear()
+        for tool in stack:
+            self.process_list.addItem(self.tool_names.get(tool, tool.__class__.__name__))
+        self.update_button_states()
+
+    def show_stage_profile(self, run, scale):
+        """Shows each stage's time and memory next to its entry in the processing list."""
+        stack = self.image_viewer.processing_stack
+        if len(run["stages"]) != self.process_list.count() or len(stack) != len(run["stages"]):
+            return
+        names = [self.tool_names.get(tool, tool.__class__.__name__) for tool in stack]
+        for row, stage in enumerate(run["stages"]):
+            summary = format_stage(stage)
+            item = self.process_list.item(row)
+            item.setText(f"{names[row]}    {summary}" if summary else names[row])
+            tooltip = f"{names[row]}: {summary or 'not run'}"
+            if stage["output_shape"] is not None:
+                shape = " x ".join(str(v) for v in stage["output_shape"])
+                tooltip += f"\nOutput {shape} {stage['output_dtype']}, {stage['output_bytes'] / 1e6:.1f} MB"
+            if stage["alloc_peak_bytes"] is not None:
+                tooltip += f"\nPeak allocations {stage['alloc_peak_bytes'] / 1e6:.1f} MB"
+            if stage["tiled"]:
+                tooltip += "\nRan in tiles"
+            if scale < 1.0:
+                tooltip += f"\nPreview at {scale:.0%} resolution"
+            item.setToolTip(tooltip)
+
+        if self.trace_path:
+            try:
+                save_chrome_trace(run, self.trace_path, names)
+            except OSError as e:
+                self.record_button.setChecked(False)
+                QMessageBox.critical(self, "Error", f"Failed to write timeline: {str(e)}")
+
+    def toggle_timeline_recording(self, checked):
+        """Starts or stops writing each render's stage timeline as a Chrome trace."""
+        # Stages show their output size on every run; traced allocation peaks, which
+        # slow renders down, are recorded only while a timeline is being recorded
+        self.image_viewer.profiler.track_allocations = checked
+        if not checked:
+            if self.trace_path:
+                self.statusBar().showMessage(f"Timeline saved to {self.trace_path}", 3000)
+            self.trace_path = None
+            return
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Record Timeline", "trace.json",
+            "Chrome Trace (*.json)"
+        )
+        if not file_path:
+            self.record_button.setChecked(False)
+            return
+        self.trace_path = file_path
+        last_run = self.image_viewer.profiler.last_run
+        if last_run is not None:
+            self.show_stage_profile(last_run, self.image_viewer.processed_scale)
+
+    def update_render_status(self, rendering):
+        if rendering:
+            self.statusBar().showMessage("Processing...")
+        else:
+            self.statusBar().clearMessage()
+
     def update_button_states(self):
         has_selection = bool(self.process_list.selectedItems())
         current_row = self.process_list.currentRow()
@@ -251,27 +345,88 @@ class MainWindow(QMainWindow):
             )
             if file_path and self.image_viewer.load_image(file_path):
                 self.process_list.clear()
+                self.tool_names.clear()
                 self.statusBar().showMessage("Image loaded successfully", 3000)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to load image: {str(e)}")
 
     def save_image(self):
         try:
-            if self.image_viewer.processed_image is None:
+            if not self.image_viewer.has_image():
                 raise ValueError("No image to save")
 
             file_path, _ = QFileDialog.getSaveFileName(
                 self, "Save Image", "",
-                "Images (*.png *.jpg *.jpeg *.bmp *.tif *.tiff)"
+                "Images (*.png *.jpg *.jpeg *.bmp *.tif *.tiff *.webp)"
             )
-            if file_path and self.image_viewer.save_image(file_path):
-                self.statusBar().showMessage("Image saved successfully", 3000)
+            if not file_path:
+                return
+
+            options = EncoderOptions(os.path.splitext(file_path)[1])
+            if self.encoder_settings.get(options.format):
+                options.update_parameters(self.encoder_settings[options.format])
+            if options.get_parameters():
+                if not ConfigDialog(options, self).exec_():
+                    return
+                self.encoder_settings[options.format] = options.get_parameters()
+            if self.image_viewer.save_image(file_path, options) is not None:
+                self.statusBar().showMessage("Saving image...")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Failed to save image: {str(e)}")
 
+    def show_save_progress(self, save_id, fraction):
+        self.statusBar().showMessage(f"Saving image... {int(fraction * 100)}%")
+
+    def on_save_finished(self, save_id, file_path):
+        self.statusBar().showMessage(f"Image saved to {file_path}", 3000)
+
+    def on_save_failed(self, save_id, message):
+        self.statusBar().clearMessage()
+        QMessageBox.critical(self, "Error", f"Failed to save image: {message}")
+
+    def load_pipeline(self):
+        try:
+            if not self.image_viewer.has_image():
+                raise ValueError("Please load an image first")
+
+            file_path, _ = QFileDialog.getOpenFileName(
+                self, "Load Pipeline", "", "Pipelines (*.json)"
+            )
+            if not file_path:
+                return
+
+            stages = load_pipeline(file_path)
+            stack = build_stack(stages, self.tool_manager)
+            if self.image_viewer.set_processing_stack(stack):
+                self.tool_names.update({tool: stage["name"] for tool, stage in zip(stack, stages)})
+                self.sync_process_list(stack)
+                self.statusBar().showMessage("Pipeline loaded", 3000)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to load pipeline: {str(e)}")
+
+    def save_pipeline(self):
+        try:
+            stack = self.image_viewer.processing_stack
+            if not stack:
+                raise ValueError("Processing stack is empty")
+
+            file_path, _ = QFileDialog.getSaveFileName(
+                self, "Save Pipeline", "", "Pipelines (*.json)"
+            )
+            if not file_path:
+                return
+
+            names = [self.tool_names.get(tool) for tool in stack]
+            if None in names:
+                names = None
+            save_pipeline(file_path, stack_to_stages(stack, names, self.tool_manager))
+            self.statusBar().showMessage("Pipeline saved", 3000)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to save pipeline: {str(e)}")
+
     def add_processing(self):
         try:
-            if self.image_viewer.original_image is None:
+            if not self.image_viewer.has_image():
                 raise ValueError("Please load an image first")
 
             dialog = AddProcessDialog(self.tool_manager.get_available_tools(), self.tool_manager, self)
@@ -280,6 +435,7 @@ class MainWindow(QMainWindow):
                 if process_name:
                     tool = self.tool_manager.get_tool(process_name)
                     if self.image_viewer.add_processing(tool):
+                        self.tool_names[tool] = process_name
                         self.process_list.addItem(process_name)
                         self.statusBar().showMessage("Processing tool added", 3000)
         except Exception as e:
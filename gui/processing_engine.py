@@ -0,0 +1,92 @@
+import copy
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from utils.pipeline_executor import PipelineCancelled, PipelineExecutor
+
+
+class _RenderJob(QRunnable):
+    def __init__(self, engine, job_id, image, stack, source_key, region=None):
+        super().__init__()
+        self.engine = engine
+        self.job_id = job_id
+        self.image = image
+        self.stack = stack
+        self.source_key = source_key
+        self.region = region
+
+    def is_superseded(self):
+        return self.job_id != self.engine.latest_job_id
+
+    def run(self):
+        profiler = self.engine.executor.profiler
+        previous_run = profiler.last_run if profiler is not None else None
+        try:
+            if self.region is not None:
+                partial = self.engine.executor.run_region(
+                    self.image, self.stack, self.region, self.source_key,
+                    should_cancel=self.is_superseded
+                )
+                if self.is_superseded():
+                    return
+                if partial is not None:
+                    self.engine.region_finished.emit(self.job_id, self.region, partial)
+            result = self.engine.executor.run(
+                self.image, self.stack, self.source_key,
+                should_cancel=self.is_superseded
+            )
+            if self.is_superseded():
+                return
+            # Streamed runs of mapped images are not profiled
+            if profiler is not None and profiler.last_run is not previous_run:
+                self.engine.render_profiled.emit(self.job_id, profiler.last_run)
+            self.engine.render_finished.emit(self.job_id, result)
+        except PipelineCancelled:
+            pass
+        except Exception as e:
+            if not self.is_superseded():
+                self.engine.render_failed.emit(self.job_id, str(e))
+
+
+class ProcessingEngine(QObject):
+    """Runs processing stacks on a worker thread and reports results via signals."""
+
+    render_started = pyqtSignal(int)
+    render_finished = pyqtSignal(int, object)
+    # (job id, (y0, y1, x0, x1), output) for the region rendered ahead of the full image
+    region_finished = pyqtSignal(int, object, object)
+    render_failed = pyqtSignal(int, str)
+    # Per-stage timings of a finished render, when the executor has a profiler
+    render_profiled = pyqtSignal(int, object)
+
+    def __init__(self, executor: PipelineExecutor, parent=None):
+        super().__init__(parent)
+        self.executor = executor
+        self.latest_job_id = 0
+        # A single worker keeps renders ordered; OpenCV parallelises inside each call
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+    def submit(self, image, stack, source_key=None, region=None):
+        """Queues a render of stack over image, superseding any pending render.
+
+        With region (y0, y1, x0, x1), that part of the output is computed and
+        reported through region_finished before the whole image.
+        """
+        self.latest_job_id += 1
+        # Snapshot the tools so parameter edits can't race with the running job
+        job = _RenderJob(self, self.latest_job_id, image, copy.deepcopy(stack), source_key, region)
+        self.render_started.emit(job.job_id)
+        self.pool.start(job)
+        return job.job_id
+
+    def cancel(self):
+        """Abandons any pending render at the next stage boundary."""
+        self.latest_job_id += 1
+
+    def is_busy(self):
+        return self.pool.activeThreadCount() > 0
+
+    def wait(self, msecs=-1):
+        """Blocks until all queued renders have stopped."""
+        return self.pool.waitForDone(msecs)
@@ -0,0 +1,48 @@
+import json
+import os
+
+import cv2
+import pytest
+
+from utils.batch_runner import run_batch, write_report
+from utils.benchmark import synthetic_image
+
+STAGES = [{"name": "Gaussian Blur", "params": {"kernel_size": 3}}]
+
+
+@pytest.fixture
+def input_dir(tmp_path):
+    directory = tmp_path / "input"
+    (directory / "nested").mkdir(parents=True)
+    cv2.imwrite(str(directory / "a.png"), synthetic_image(40, 50))
+    cv2.imwrite(str(directory / "nested" / "b.png"), synthetic_image(30, 20))
+    (directory / "corrupt.png").write_bytes(b"not an image")
+    return str(directory)
+
+
+@pytest.mark.parametrize("writers", [0, 1])
+def test_failed_files_are_reported_without_stopping_the_batch(tmp_path, input_dir, writers):
+    output_dir = str(tmp_path / "output")
+    # A directory in place of an output file makes its write fail
+    os.makedirs(os.path.join(output_dir, "nested", "b.png"))
+
+    results = run_batch(STAGES, input_dir, output_dir, workers=1, writers=writers)
+
+    by_name = {os.path.relpath(r["input"], input_dir): r for r in results}
+    assert by_name["a.png"]["status"] == "ok"
+    assert cv2.imread(by_name["a.png"]["output"]).shape == (40, 50, 3)
+    for name in ("corrupt.png", os.path.join("nested", "b.png")):
+        assert by_name[name]["status"] == "error"
+        assert by_name[name]["error"]
+
+    report_path = str(tmp_path / "report" / "report.json")
+    write_report(results, report_path, elapsed=1.0, pipeline_hash="hash")
+    with open(report_path) as file:
+        report = json.load(file)
+
+    assert report["summary"]["files"] == 3
+    assert report["summary"]["succeeded"] == 1
+    assert report["summary"]["failed"] == 2
+    assert report["summary"]["pipeline_hash"] == "hash"
+    assert {os.path.basename(f["input"]) for f in report["files"] if f["status"] == "error"} == \
+        {"corrupt.png", "b.png"}
@@ -0,0 +1,43 @@
+import os
+
+import numpy as np
+
+from utils.benchmark import synthetic_image
+from utils.decode_cache import THUMBNAIL_SIZE, DecodeCache
+
+
+def _age(cache, key, seconds):
+    # Entry timestamps only change once per clock tick, so age them explicitly
+    path = os.path.join(cache._entry_path(key), "entry.json")
+    mtime = os.stat(path).st_mtime - seconds
+    os.utime(path, (mtime, mtime))
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path):
+    image = synthetic_image(1500, 1400, channels="gray")
+    cache = DecodeCache(str(tmp_path))
+    assert cache.store("a", image)
+    entry_bytes = cache.current_bytes()
+    cache.max_bytes = 2 * entry_bytes
+    assert cache.store("b", image)
+    _age(cache, "a", 20)
+    _age(cache, "b", 10)
+
+    # Loading "a" makes "b" the least recently used entry
+    shape, levels = cache.load("a")
+    assert cache.store("c", image)
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.current_bytes() == 2 * entry_bytes
+    assert shape == image.shape[:2]
+    assert np.array_equal(levels[0.5], cache.load("a")[1][0.5])
+    assert max(cache.thumbnail("a").shape) <= THUMBNAIL_SIZE
+
+
+def test_small_and_over_budget_images_are_not_cached(tmp_path):
+    cache = DecodeCache(str(tmp_path))
+    assert not cache.store("small", np.zeros((10, 10), dtype=np.uint8))
+
+    cache.max_bytes = 1000
+    assert not cache.store("large", synthetic_image(1500, 1400, channels="gray"))
+    assert cache.load("large") is None and cache.current_bytes() == 0
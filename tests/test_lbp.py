@@ -0,0 +1,41 @@
+import cv2
+import numpy as np
+import pytest
+
+from tools.lbp import LBPTool
+from utils.benchmark import synthetic_image
+from utils.bit_depth import to_display
+from utils.pipeline_executor import apply_stages
+
+
+def test_codes_wider_than_16_bits_are_usable_downstream():
+    tool = LBPTool()
+    tool.update_parameters({"radius": 3, "n_points": 24, "method": "default"})
+    image = synthetic_image(64, 80)
+
+    result = apply_stages(image, [tool])
+
+    assert result.dtype == np.float32
+    assert to_display(result).dtype == np.uint8
+    # Scaling to 0-1 keeps every 24-bit code distinct
+    codes = tool._calculate_lbp(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), 3, 24)
+    assert np.array_equal(np.rint(result.astype(np.float64) * ((1 << 24) - 1)), codes)
+
+
+def test_raw_codes_are_limited_to_24_points():
+    tool = LBPTool()
+    for method in ("default", "ror"):
+        with pytest.raises(ValueError):
+            tool.update_parameters({"n_points": 25, "method": method})
+
+
+def test_mapped_codes_past_24_points_are_usable_downstream():
+    image = synthetic_image(64, 80)
+    for method, n_points in (("uniform", 32), ("nri_uniform", 32), ("ror", 24)):
+        tool = LBPTool()
+        tool.update_parameters({"radius": 3, "n_points": n_points, "method": method})
+
+        result = apply_stages(image, [tool])
+
+        assert result.dtype in (np.uint8, np.uint16, np.float32)
+        assert to_display(result).dtype == np.uint8
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from tools.base_tool import apply_lut
+from utils.benchmark import synthetic_image
+from utils.pipeline_executor import apply_stages
+from utils.tool_manager import ToolManager
+
+# Pointwise tools with non-identity parameters
+ADJUSTMENTS = [
+    ("Brightness Adjustment", {"brightness": 40}),
+    ("Contrast Adjustment", {"contrast": 1.6}),
+    ("Exposure Adjustment", {"exposure": 0.7}),
+    ("Gamma Correction", {"gamma": 2.2}),
+    ("Darken Image", {"amount": 0.35}),
+    ("Invert Colors", {"strength": 0.6}),
+    ("Posterization", {"levels": 5}),
+]
+
+
+def _tool(name, params):
+    tool = ToolManager(load_plugins=False).get_tool(name)
+    tool.update_parameters(params)
+    return tool
+
+
+def test_every_pointwise_tool_is_covered():
+    tool_manager = ToolManager(load_plugins=False)
+    pointwise = {name for name in tool_manager.tools if tool_manager.get_tool(name).pointwise}
+
+    assert pointwise == {name for name, _ in ADJUSTMENTS}
+
+
+@pytest.mark.parametrize("name, params", ADJUSTMENTS)
+def test_lookup_table_matches_apply(name, params):
+    tool = _tool(name, params)
+    image = synthetic_image(64, 80)
+
+    assert np.array_equal(apply_lut(image, tool.get_lut()), tool.apply(image))
+
+
+@pytest.mark.parametrize("channels", ["bgr", "gray"])
+def test_fused_chain_matches_running_each_tool(channels):
+    image = synthetic_image(64, 80, channels=channels)
+    stack = [_tool(name, params) for name, params in ADJUSTMENTS]
+
+    expected = image
+    for tool in stack:
+        expected = tool.apply(expected)
+
+    assert np.array_equal(apply_stages(image, stack), expected)
@@ -0,0 +1,34 @@
+import cv2
+import numpy as np
+
+from tools.pixelation import PixelationTool
+from utils.benchmark import synthetic_image
+
+
+def test_mask_limits_pixelation_to_nonzero_pixels(tmp_path):
+    image = synthetic_image(120, 160)
+    mask = np.zeros((60, 80), dtype=np.uint8)
+    mask[:, :40] = 255
+    mask_path = str(tmp_path / "mask.png")
+    cv2.imwrite(mask_path, mask)
+
+    tool = PixelationTool()
+    tool.update_parameters({"pixel_size": 10, "mask": mask_path})
+    result = tool.apply(image)
+
+    # The mask is stretched to the image, so it covers the left half
+    assert np.array_equal(result[:, 80:], image[:, 80:])
+    tool.update_parameters({"mask": None})
+    assert np.array_equal(result[:, :80], tool.apply(image)[:, :80])
+
+
+def test_region_is_a_rectangle():
+    image = synthetic_image(120, 160)
+    tool = PixelationTool()
+    tool.update_parameters({"pixel_size": 10, "region": [20, 30, 40, 50]})
+    result = tool.apply(image)
+
+    outside = np.ones(image.shape[:2], dtype=bool)
+    outside[30:80, 20:60] = False
+    assert np.array_equal(result[outside], image[outside])
+    assert not np.array_equal(result[30:80, 20:60], image[30:80, 20:60])
@@ -0,0 +1,64 @@
+import numpy as np
+
+from tools.gaussian_blur import GaussianBlurTool
+from tools.invert_colors import InvertColorsTool
+from utils.benchmark import synthetic_image
+from utils.pipeline_executor import PipelineExecutor, apply_stages
+from utils.stage_cache import StageCache, image_fingerprint, stage_key
+
+
+class CountingBlur(GaussianBlurTool):
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def apply(self, image):
+        self.calls += 1
+        return super().apply(image)
+
+
+def test_stage_key_depends_on_input_and_parameters():
+    tool = GaussianBlurTool()
+    key = stage_key("input", tool)
+
+    assert stage_key("input", GaussianBlurTool()) == key
+    assert stage_key("other input", tool) != key
+    tool.update_parameters({"kernel_size": 7})
+    assert stage_key("input", tool) != key
+
+
+def test_least_recently_used_frames_are_evicted_first():
+    frame = np.zeros((10, 10), dtype=np.uint8)
+    cache = StageCache(max_bytes=2 * frame.nbytes)
+    cache.put("a", frame.copy())
+    cache.put("b", frame.copy())
+
+    cache.get("a")
+    cache.put("c", frame.copy())
+
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.current_bytes == 2 * frame.nbytes
+    cache.max_bytes = frame.nbytes
+    assert list(cache._entries) == ["c"]
+
+
+def test_frames_larger_than_the_budget_are_not_cached():
+    cache = StageCache(max_bytes=50)
+    cache.put("a", np.zeros((10, 10), dtype=np.uint8))
+
+    assert len(cache) == 0 and cache.current_bytes == 0
+
+
+def test_editing_a_stage_only_recomputes_downstream():
+    image = synthetic_image(64, 80)
+    first, second = CountingBlur(), CountingBlur()
+    stack = [first, InvertColorsTool(), second]
+    executor = PipelineExecutor()
+    source_key = image_fingerprint(image)
+
+    executor.run(image, stack, source_key)
+    second.update_parameters({"kernel_size": 9})
+    result = executor.run(image, stack, source_key)
+
+    assert (first.calls, second.calls) == (1, 2)
+    assert np.array_equal(result, apply_stages(image, stack))
@@ -0,0 +1,57 @@
+import numpy as np
+import pytest
+
+from utils.benchmark import synthetic_image
+from utils.image_source import create_mapped, is_mapped, open_mapped
+from utils.pipeline_executor import PipelineExecutor, apply_stages
+from utils.pipeline_io import build_stack
+from utils.tile_executor import MIN_TILE_SIZE, TileExecutor
+from utils.tool_manager import ToolManager
+
+STAGES = [
+    {"name": "Gaussian Blur", "params": {"kernel_size": 9, "sigma": 2.0}},
+    {"name": "Gamma Correction", "params": {"gamma": 1.8}},
+    {"name": "Contrast Adjustment", "params": {"contrast": 1.3}},
+    {"name": "Unsharp Masking", "params": {}},
+    {"name": "Median Blur", "params": {"kernel_size": 5}},
+]
+
+
+def _mapped(path, image):
+    mapped = create_mapped(path, image.shape, image.dtype)
+    mapped[...] = image
+    del mapped
+    return open_mapped(path, min_bytes=0)
+
+
+def _image(extension):
+    image = synthetic_image(3 * MIN_TILE_SIZE + 17, 2 * MIN_TILE_SIZE + 29)
+    if extension == ".npy":
+        # NPY files also carry high bit depth images
+        return image[:, :, 0].astype(np.uint16) * 257
+    return image
+
+
+@pytest.mark.parametrize("extension", [".tif", ".npy"])
+def test_streamed_run_matches_in_memory_run(tmp_path, extension):
+    image = _image(extension)
+    mapped = _mapped(str(tmp_path / f"image{extension}"), image)
+    stack = build_stack(STAGES, ToolManager(load_plugins=False))
+    executor = PipelineExecutor(tiler=TileExecutor(max_workers=2, tile_size=MIN_TILE_SIZE))
+
+    assert is_mapped(mapped)
+    result = executor.run(mapped, stack)
+
+    assert is_mapped(result)
+    assert len(executor.cache) == 0
+    assert np.array_equal(result, apply_stages(image, stack))
+
+
+def test_whole_image_stages_run_mapped_images_in_memory(tmp_path):
+    image = _image(".tif")
+    mapped = _mapped(str(tmp_path / "image.tif"), image)
+    stack = build_stack(STAGES + [{"name": "Otsu Threshold", "params": {}}], ToolManager(load_plugins=False))
+
+    result = PipelineExecutor().run(mapped, stack)
+
+    assert np.array_equal(result, apply_stages(image, stack))
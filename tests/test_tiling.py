@@ -0,0 +1,58 @@
+import pytest
+
+from tools.bilateral_filter import BilateralFilterTool
+from utils.benchmark import synthetic_image
+from utils.tile_executor import MIN_TILE_SIZE, verify_tiling
+from utils.tool_manager import ToolManager
+
+TOOL_NAMES = list(ToolManager(load_plugins=False).tools)
+
+# Parameters that make each kernel tool read well past its default halo
+LARGE_KERNELS = [
+    ("Bilateral Filter", {"d": 25}),
+    ("Gaussian Blur", {"kernel_size": 31, "sigma": 6.0}),
+    ("Median Blur", {"kernel_size": 15}),
+    ("TopHat Transform", {"kernel_size": 21}),
+    ("BlackHat Transform", {"kernel_size": 21}),
+    ("Adaptive Threshold", {"block_size": 51}),
+    ("Laplacian Sharpening", {"kernel_size": 7}),
+    ("HighPass Filter", {"kernel_size": 15, "sigma": 4.0}),
+    ("LBP", {"radius": 5, "n_points": 16}),
+]
+
+
+def _image():
+    # Uneven multiples of the tile size, so edge tiles are partial
+    return synthetic_image(3 * MIN_TILE_SIZE + 17, 4 * MIN_TILE_SIZE + 29)
+
+
+@pytest.mark.parametrize("name", TOOL_NAMES)
+def test_declared_halo_tiles_seamlessly(name):
+    tool = ToolManager(load_plugins=False).get_tool(name)
+
+    # One level of tolerance allows for OpenCV switching large filter2D
+    # kernels (Gabor) to DFT convolution
+    report = verify_tiling(tool, _image(), tolerance=1)
+
+    assert report["equal"], report
+
+
+@pytest.mark.parametrize("name, params", LARGE_KERNELS)
+def test_declared_halo_tiles_seamlessly_with_large_kernels(name, params):
+    tool = ToolManager(load_plugins=False).get_tool(name)
+    tool.update_parameters(params)
+
+    report = verify_tiling(tool, _image())
+
+    assert report["tiled"]
+    assert report["equal"], report
+
+
+def test_bilateral_filter_with_unit_diameter_tiles_seamlessly():
+    tool = BilateralFilterTool()
+    tool.update_parameters({"d": 1})
+
+    report = verify_tiling(tool, synthetic_image(3 * MIN_TILE_SIZE, 3 * MIN_TILE_SIZE))
+
+    assert report["tiled"]
+    assert report["equal"], report
@@ -4,6 +4,8 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class AdaptiveThresholdTool(ImageProcessingTool):
+    output_channels = 'gray'
+
     def __init__(self):
         self._max_value = 255
         self._block_size = 11
@@ -78,6 +80,9 @@ class AdaptiveThresholdTool(ImageProcessingTool):
         except Exception as e:
             raise RuntimeError(f"Error applying adaptive threshold: {str(e)}")
 
+    def get_halo(self):
+        return self._block_size // 2
+
     def get_parameters(self):
         return {
             "max_value": self._max_value,
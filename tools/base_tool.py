@@ -1,7 +1,61 @@
 # tools/base_tool.py
 from abc import ABC, abstractmethod
 
+import cv2
+import numpy as np
+
+def scale_odd_size(size, scale, minimum=1):
+    """Scales a pixel size by scale, keeping it odd and at least minimum."""
+    scaled = max(minimum, int(round(size * scale)))
+    return scaled if scaled % 2 == 1 else scaled + 1
+
+def apply_lut(image, lut):
+    """Maps every uint8 pixel through a 256-entry table, shared or one column per channel."""
+    lut = np.asarray(lut, dtype=np.uint8)
+    if lut.ndim == 1:
+        return cv2.LUT(image, lut)
+    channels = image.shape[2] if image.ndim == 3 else 1
+    if lut.shape[1] != channels:
+        raise ValueError(f"Lookup table has {lut.shape[1]} channels, image has {channels}")
+    return cv2.LUT(image, np.ascontiguousarray(lut).reshape(256, 1, channels))
+
+def compose_luts(first, second):
+    """Returns the table equivalent to applying first and then second."""
+    first = np.asarray(first, dtype=np.uint8)
+    second = np.asarray(second, dtype=np.uint8)
+    if first.ndim == 1 and second.ndim == 1:
+        return second[first]
+    channels = max(lut.shape[1] for lut in (first, second) if lut.ndim == 2)
+    first = np.broadcast_to(first.reshape(256, -1), (256, channels))
+    second = np.broadcast_to(second.reshape(256, -1), (256, channels))
+    return np.take_along_axis(second, first.astype(np.intp), axis=0)
+
 class ImageProcessingTool(ABC):
+    # Capabilities the executor uses to plan fusion, tiling, caching and
+    # parallel dispatch; subclasses override the ones that differ.
+
+    # Maps each uint8 value independently and implements get_lut, which lets
+    # the pipeline executor fuse consecutive pointwise tools into one table
+    pointwise = False
+    # Context radius in pixels an output pixel depends on; None means the
+    # whole image (see get_halo)
+    halo = None
+    # Channel layout accepted ('any', 'bgr', 'gray') and produced ('same', 'bgr', 'gray')
+    input_channels = 'any'
+    output_channels = 'same'
+    # Image dtypes apply accepts
+    dtypes = ('uint8',)
+    # The same input and parameters always produce the same output
+    deterministic = True
+    # Output width and height can differ from the input
+    changes_size = False
+    # apply does not modify the tool, so one instance can process several images at once
+    thread_safe = True
+
+    # Registry metadata for plugin tools; built-in tools are listed in the tool manager
+    display_name = None
+    category = None
+
     @abstractmethod
     def apply(self, image):
         pass
@@ -12,4 +66,33 @@ class ImageProcessingTool(ABC):
     
     @abstractmethod
     def update_parameters(self, params):
-        pass
\ No newline at end of file
+        pass
+
+    def get_scaled_parameters(self, scale):
+        """Returns parameters adjusted for an image resized by scale.
+
+        Tools with pixel-size parameters override this so that previews
+        rendered on a downscaled proxy look like the full-resolution result.
+        """
+        return self.get_parameters()
+
+    def get_halo(self):
+        """Returns the context radius for the current parameters, or None if the whole image is needed."""
+        return 0 if self.pointwise else self.halo
+
+    def capabilities(self):
+        """Returns the declared capabilities for the current parameters."""
+        return {
+            "pointwise": self.pointwise,
+            "halo": self.get_halo(),
+            "input_channels": self.input_channels,
+            "output_channels": self.output_channels,
+            "dtypes": tuple(self.dtypes),
+            "deterministic": self.deterministic,
+            "changes_size": self.changes_size,
+            "thread_safe": self.thread_safe,
+        }
+
+    def get_lut(self):
+        """Returns the tool's lookup table: shape (256,), or (256, channels) per channel."""
+        raise NotImplementedError(f"{type(self).__name__} is not a pointwise tool")
\ No newline at end of file
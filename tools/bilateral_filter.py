@@ -4,6 +4,8 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class BilateralFilterTool(ImageProcessingTool):
+    dtypes = ('uint8', 'float32')
+
     def __init__(self):
         self._d = 9
         self._sigma_color = 75
@@ -45,18 +47,30 @@ class BilateralFilterTool(ImageProcessingTool):
         if image is None:
             raise ValueError("No image provided for processing")
         try:
+            # sigma_color is in 8-bit levels
+            sigma_color = self._sigma_color / 255.0 if image.dtype == np.float32 else self._sigma_color
             return cv2.bilateralFilter(
                 image,
                 self._d,
-                self._sigma_color,
+                sigma_color,
                 self._sigma_space
             )
         except Exception as e:
             raise RuntimeError(f"Error applying bilateral filter: {str(e)}")
 
+    def get_halo(self):
+        # OpenCV filters with a radius of at least 1, even for d=1
+        return max(1, self._d // 2)
+
     def get_parameters(self):
         return self.parameters
 
+    def get_scaled_parameters(self, scale):
+        params = self.parameters
+        params["d"] = max(1, int(round(self._d * scale)))
+        params["sigma_space"] = max(self._sigma_space * scale, 0.1)
+        return params
+
     def update_parameters(self, params):
         if not isinstance(params, dict):
             raise ValueError("Parameters must be provided as a dictionary")
@@ -1,9 +1,11 @@
 # tools/brightness_adjustment.py
-import cv2
 import numpy as np
-from .base_tool import ImageProcessingTool
+from .base_tool import ImageProcessingTool, apply_lut
 
 class BrightnessAdjustmentTool(ImageProcessingTool):
+    pointwise = True
+    dtypes = ('uint8', 'float32')
+
     def __init__(self):
         self._brightness = 0
         self._validate_brightness(self._brightness)
@@ -29,15 +31,16 @@ class BrightnessAdjustmentTool(ImageProcessingTool):
         if image is None:
             raise ValueError("No image provided for processing")
         try:
-            # Convert the brightness adjustment to the same type as the image
-            adjustment = np.full(image.shape, self._brightness, dtype=np.uint8)
-            # Perform the addition
-            adjusted = cv2.add(image.astype(np.int16), adjustment.astype(np.int16))
-            # Clip and convert back to uint8
-            return np.clip(adjusted, 0, 255).astype(np.uint8)
+            if image.dtype == np.float32:
+                return np.clip(image + self._brightness / 255.0, 0, 1)
+            return apply_lut(image, self.get_lut())
         except Exception as e:
             raise RuntimeError(f"Error adjusting brightness: {str(e)}")
 
+    def get_lut(self):
+        levels = np.arange(256, dtype=np.uint8)
+        return np.clip(np.round(levels + self._brightness), 0, 255).astype(np.uint8)
+
     def get_parameters(self):
         return {"brightness": self._brightness}
 
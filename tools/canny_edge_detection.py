@@ -4,6 +4,10 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class CannyEdgeDetectionTool(ImageProcessingTool):
+    output_channels = 'gray'
+    # Hysteresis follows edges across the whole image
+    halo = None
+
     def __init__(self):
         self._threshold1 = 100
         self._threshold2 = 200
@@ -4,6 +4,10 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class CartoonizationTool(ImageProcessingTool):
+    input_channels = 'bgr'
+    # Pyramid levels depend on the image size
+    halo = None
+
     def __init__(self):
         # Default cartoonization parameters
         self._num_down = 2  # Number of downsampling steps
@@ -4,6 +4,10 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class ColorBalancingTool(ImageProcessingTool):
+    input_channels = 'bgr'
+    halo = 0
+    dtypes = ('uint8', 'uint16', 'float32')
+
     def __init__(self):
         self._red_balance = 1.0
         self._green_balance = 1.0
@@ -47,17 +51,14 @@ class ColorBalancingTool(ImageProcessingTool):
             # Split the channels
             b, g, r = cv2.split(image)
             
-            # Apply balance to each channel
+            # Apply balance to each channel; integer depths saturate at their maximum
             r = cv2.multiply(r, self._red_balance)
             g = cv2.multiply(g, self._green_balance)
             b = cv2.multiply(b, self._blue_balance)
             
-            # Clip values and merge
-            balanced = cv2.merge([
-                np.clip(b, 0, 255).astype(np.uint8),
-                np.clip(g, 0, 255).astype(np.uint8),
-                np.clip(r, 0, 255).astype(np.uint8)
-            ])
+            balanced = cv2.merge([b, g, r])
+            if image.dtype == np.float32:
+                balanced = np.clip(balanced, 0, 1)
             return balanced
         except Exception as e:
             raise RuntimeError(f"Error balancing colors: {str(e)}")
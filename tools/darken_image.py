@@ -1,9 +1,12 @@
 # tools/darken_image.py
 import cv2
 import numpy as np
-from .base_tool import ImageProcessingTool
+from .base_tool import ImageProcessingTool, apply_lut
 
 class DarkenImageTool(ImageProcessingTool):
+    pointwise = True
+    dtypes = ('uint8', 'float32')
+
     def __init__(self):
         self._amount = 0.2
         self._validate_amount(self._amount)
@@ -29,10 +32,16 @@ class DarkenImageTool(ImageProcessingTool):
         if image is None:
             raise ValueError("No image provided for processing")
         try:
-            return cv2.multiply(image, np.array([1.0 - self._amount])).astype(np.uint8)
+            if image.dtype == np.float32:
+                return image * (1.0 - self._amount)
+            return apply_lut(image, self.get_lut())
         except Exception as e:
             raise RuntimeError(f"Error darkening image: {str(e)}")
 
+    def get_lut(self):
+        levels = np.arange(256, dtype=np.uint8)
+        return cv2.multiply(levels, np.array([1.0 - self._amount])).ravel()
+
     def get_parameters(self):
         return {"amount": self._amount}
 
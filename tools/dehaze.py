@@ -1,15 +1,25 @@
 # tools/dehaze.py
 import cv2
 import numpy as np
-from .base_tool import ImageProcessingTool
+from .base_tool import ImageProcessingTool, scale_odd_size
+
+# Kernel size the dark channel is computed at; larger filters run on a downsampled image
+DARK_CHANNEL_KERNEL = 15
+
+# Regularization of the guided filter that refines the transmission map
+GUIDED_FILTER_EPS = 1e-3
 
 class DehazingTool(ImageProcessingTool):
+    # Atmospheric light is estimated from the whole image
+    halo = None
+
     def __init__(self):
         # Default dehazing parameters
         self._transmission_weight = 0.95  # Transmission weight
-        self._attenuation_factor = 0.1  # Attenuation factor
+        self._attenuation_factor = 0.1  # Lower bound on transmission, limits amplification of dense haze
         self._max_filter_size = 81  # Maximum filter size for dark channel prior
         self._omega = 0.75  # Global atmospheric light estimation parameter
+        self._algorithm = 'guided_filter'  # Transmission refinement: 'dark_channel' or 'guided_filter'
 
     def _validate_transmission_weight(self, weight):
         """Validate transmission weight parameter."""
@@ -51,6 +61,13 @@ class DehazingTool(ImageProcessingTool):
         except (ValueError, TypeError) as e:
             raise ValueError(f"Invalid omega value: {str(e)}")
 
+    def _validate_algorithm(self, algorithm):
+        """Validate transmission refinement algorithm."""
+        valid_algorithms = ['dark_channel', 'guided_filter']
+        if algorithm not in valid_algorithms:
+            raise ValueError(f"Algorithm must be one of {valid_algorithms}")
+        return algorithm
+
     @property
     def transmission_weight(self):
         return self._transmission_weight
@@ -83,48 +100,98 @@ class DehazingTool(ImageProcessingTool):
     def omega(self, value):
         self._omega = self._validate_omega(value)
 
-    def _dark_channel_prior(self, image):
+    @property
+    def algorithm(self):
+        return self._algorithm
+
+    @algorithm.setter
+    def algorithm(self, value):
+        self._algorithm = self._validate_algorithm(value)
+
+    def _dark_channel_prior(self, image, filter_size):
         """Compute dark channel prior."""
         dark_channel = np.min(image, axis=2)
-        dark_channel = cv2.erode(dark_channel, np.ones((self._max_filter_size, self._max_filter_size)))
-        return dark_channel
+        kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (filter_size, filter_size))
+        return cv2.erode(dark_channel, kernel, borderType=cv2.BORDER_REPLICATE)
 
     def _estimate_atmospheric_light(self, image, dark_channel):
-        """Estimate global atmospheric light."""
+        """Estimate global atmospheric light from the omega fraction of pixels with the haziest dark channel."""
         flat_dark = dark_channel.ravel()
         flat_image = image.reshape(-1, 3)
-        
-        top_dark_indices = np.argsort(flat_dark)[-int(len(flat_dark) * self._omega):]
-        atmospheric_light = np.mean(flat_image[top_dark_indices], axis=0)
-        
-        return atmospheric_light
+        count = max(1, int(len(flat_dark) * self._omega))
+
+        # The dark channel of a uint8 image has 256 levels, so a histogram finds the
+        # threshold level in linear time; ties at the threshold are taken in scan order
+        histogram = np.bincount(flat_dark, minlength=256)
+        above = np.cumsum(histogram[::-1])[::-1]
+        threshold = int(np.nonzero(above >= count)[0][-1])
+        selected = flat_dark > threshold
+        needed = count - int(np.count_nonzero(selected))
+        selected[np.flatnonzero(flat_dark == threshold)[:needed]] = True
+
+        return flat_image[selected].mean(axis=0, dtype=np.float64).astype(np.float32) / 255.0
+
+    def _guided_filter(self, guide, src, radius):
+        """Edge-preserving smoothing of src steered by guide (He et al.)."""
+        size = (2 * radius + 1, 2 * radius + 1)
+        mean_guide = cv2.boxFilter(guide, -1, size)
+        mean_src = cv2.boxFilter(src, -1, size)
+        cov = cv2.boxFilter(guide * src, -1, size) - mean_guide * mean_src
+        var = cv2.boxFilter(guide * guide, -1, size) - mean_guide * mean_guide
+        a = cov / (var + GUIDED_FILTER_EPS)
+        b = mean_src - a * mean_guide
+        return cv2.boxFilter(a, -1, size), cv2.boxFilter(b, -1, size)
 
     def apply(self, image):
         """Apply dehazing effect using dark channel prior method."""
         if image is None:
             raise ValueError("No image provided for processing")
-        
-        try:
-            # Normalize image to float
-            img = image.astype(np.float32) / 255.0
 
-            # Compute dark channel prior
-            dark_channel = self._dark_channel_prior(img)
+        try:
+            is_gray = image.ndim == 2
+            if is_gray:
+                image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+            h, w = image.shape[:2]
+
+            # The dark channel and transmission are low-frequency, so estimate them on a
+            # downsampled image with a proportionally smaller filter
+            factor = max(1, min(self._max_filter_size // DARK_CHANNEL_KERNEL, min(h, w) // 32))
+            small = image if factor == 1 else cv2.resize(
+                image, (max(1, w // factor), max(1, h // factor)), interpolation=cv2.INTER_AREA)
+            filter_size = scale_odd_size(self._max_filter_size, 1 / factor)
 
             # Estimate atmospheric light
-            atmospheric_light = self._estimate_atmospheric_light(img, dark_channel)
+            dark_channel = self._dark_channel_prior(small, filter_size)
+            atmospheric_light = np.maximum(self._estimate_atmospheric_light(small, dark_channel), 1e-3)
 
             # Compute transmission map
-            normalized_img = img / atmospheric_light
-            transmission = 1 - self._transmission_weight * np.min(normalized_img, axis=2)
-
-            # Recover scene radiance
-            recovered = np.zeros_like(img)
-            for i in range(3):
-                recovered[:,:,i] = (img[:,:,i] - atmospheric_light[i]) / np.maximum(transmission, 0.1) + atmospheric_light[i]
-
-            # Clip and convert back to uint8
-            recovered = np.clip(recovered * 255, 0, 255).astype(np.uint8)
+            normalized_small = small.astype(np.float32) * (1 / (255.0 * atmospheric_light))
+            transmission = 1 - self._transmission_weight * self._dark_channel_prior(normalized_small, filter_size)
+
+            if self._algorithm == 'guided_filter':
+                # Fast guided filter: solve the local linear model on the small grid, then
+                # apply the upsampled coefficients to the full-resolution guide
+                guide = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY).astype(np.float32) / 255.0
+                small_guide = guide if factor == 1 else cv2.resize(
+                    guide, (small.shape[1], small.shape[0]), interpolation=cv2.INTER_AREA)
+                a, b = self._guided_filter(small_guide, transmission, max(1, filter_size))
+                if factor != 1:
+                    a = cv2.resize(a, (w, h), interpolation=cv2.INTER_LINEAR)
+                    b = cv2.resize(b, (w, h), interpolation=cv2.INTER_LINEAR)
+                transmission = a * guide + b
+            elif factor != 1:
+                transmission = cv2.resize(transmission, (w, h), interpolation=cv2.INTER_LINEAR)
+
+            # Recover scene radiance, never dividing by less than the attenuation factor;
+            # OpenCV arithmetic keeps this in a few passes and saturates back to uint8
+            transmission = np.maximum(transmission, max(self._attenuation_factor, 1e-3))
+            light = tuple(float(v) * 255.0 for v in atmospheric_light) + (0.0,)
+            inverse = cv2.merge([cv2.divide(1.0, transmission)] * 3)
+            recovered = cv2.subtract(image, light, dtype=cv2.CV_32F)
+            recovered = cv2.add(cv2.multiply(recovered, inverse), light, dtype=cv2.CV_8U)
+
+            if is_gray:
+                recovered = cv2.cvtColor(recovered, cv2.COLOR_BGR2GRAY)
 
             return recovered
 
@@ -137,9 +204,16 @@ class DehazingTool(ImageProcessingTool):
             "transmission_weight": self._transmission_weight,
             "attenuation_factor": self._attenuation_factor,
             "max_filter_size": self._max_filter_size,
-            "omega": self._omega
+            "omega": self._omega,
+            "algorithm": self._algorithm
         }
 
+    def get_scaled_parameters(self, scale):
+        """Get parameters adjusted for an image resized by scale."""
+        params = self.get_parameters()
+        params["max_filter_size"] = min(scale_odd_size(self._max_filter_size, scale, 3), 201)
+        return params
+
     def update_parameters(self, params):
         """Update tool parameters."""
         if not isinstance(params, dict):
@@ -152,4 +226,12 @@ class DehazingTool(ImageProcessingTool):
         if "max_filter_size" in params:
             self.max_filter_size = params["max_filter_size"]
         if "omega" in params:
-            self.omega = params["omega"]
\ No newline at end of file
+            self.omega = params["omega"]
+        if "algorithm" in params:
+            self.algorithm = params["algorithm"]
+
+    def get_valid_options(self):
+        """Return valid options for parameters that require a drop-down menu."""
+        return {
+            "algorithm": ['dark_channel', 'guided_filter']
+        }
\ No newline at end of file
@@ -4,6 +4,9 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class EmbossingTool(ImageProcessingTool):
+    halo = 1
+    dtypes = ('uint8', 'float32')
+
     def __init__(self):
         # Default embossing parameters
         self._emboss_angle = 45  # Embossing angle in degrees
@@ -118,8 +121,11 @@ class EmbossingTool(ImageProcessingTool):
             embossed = cv2.filter2D(gray, -1, kernel)
 
             # Add background gray level
-            embossed = embossed + self._background_gray
-            embossed = np.clip(embossed, 0, 255).astype(np.uint8)
+            if image.dtype == np.float32:
+                embossed = np.clip(embossed + self._background_gray / 255.0, 0, 1)
+            else:
+                embossed = embossed + self._background_gray
+                embossed = np.clip(embossed, 0, 255).astype(np.uint8)
 
             # Convert back to 3-channel if original was color
             if len(image.shape) > 2:
@@ -4,6 +4,9 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class ErosionTool(ImageProcessingTool):
+    halo = 1
+    dtypes = ('uint8', 'uint16', 'float32')
+
     def apply(self, image):
         if image is None:
             raise ValueError("No image provided for processing")
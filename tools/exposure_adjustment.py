@@ -1,9 +1,12 @@
 # tools/exposure_adjustment.py
 import cv2
 import numpy as np
-from .base_tool import ImageProcessingTool
+from .base_tool import ImageProcessingTool, apply_lut
 
 class ExposureAdjustmentTool(ImageProcessingTool):
+    pointwise = True
+    dtypes = ('uint8', 'float32')
+
     def __init__(self):
         self._exposure = 1.0
         self._validate_exposure(self._exposure)
@@ -29,11 +32,16 @@ class ExposureAdjustmentTool(ImageProcessingTool):
         if image is None:
             raise ValueError("No image provided for processing")
         try:
-            adjusted = cv2.multiply(image, np.array([self._exposure]))
-            return np.clip(adjusted, 0, 255).astype(np.uint8)
+            if image.dtype == np.float32:
+                return np.clip(image * self._exposure, 0, 1)
+            return apply_lut(image, self.get_lut())
         except Exception as e:
             raise RuntimeError(f"Error adjusting exposure: {str(e)}")
 
+    def get_lut(self):
+        levels = np.arange(256, dtype=np.uint8)
+        return cv2.multiply(levels, np.array([self._exposure])).ravel()
+
     def get_parameters(self):
         return {"exposure": self._exposure}
 
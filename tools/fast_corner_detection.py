@@ -4,6 +4,8 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class FASTCornerDetectionTool(ImageProcessingTool):
+    output_channels = 'bgr'
+
     def __init__(self):
         # Default FAST parameters
         self._threshold = 10  # Threshold for corner detection
@@ -4,6 +4,10 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class FlippingMirroringTool(ImageProcessingTool):
+    # Each output pixel comes from the mirrored position
+    halo = None
+    dtypes = ('uint8', 'uint16', 'float32')
+
     def apply(self, image):
         if image is None:
             raise ValueError("No image provided for processing")
@@ -43,6 +43,9 @@ class GaborFilterTool(ImageProcessingTool):
         except Exception as e:
             raise RuntimeError(f"Error applying Gabor filter: {str(e)}")
 
+    def get_halo(self):
+        return self._kernel_size // 2
+
     def get_parameters(self):
         return {
             "kernel_size": self._kernel_size,
@@ -1,9 +1,11 @@
 # tools/gamma_correction.py
-import cv2
 import numpy as np
-from .base_tool import ImageProcessingTool
+from .base_tool import ImageProcessingTool, apply_lut
 
 class GammaCorrectionTool(ImageProcessingTool):
+    pointwise = True
+    dtypes = ('uint8', 'float32')
+
     def __init__(self):
         self._gamma = 1.0
         self._validate_gamma(self._gamma)
@@ -29,15 +31,18 @@ class GammaCorrectionTool(ImageProcessingTool):
         if image is None:
             raise ValueError("No image provided for processing")
         try:
-            # Normalize to 0-1 range
-            normalized = image.astype(np.float32) / 255.0
-            # Apply gamma correction
-            corrected = np.power(normalized, 1.0/self._gamma)
-            # Convert back to 0-255 range
-            return (corrected * 255).astype(np.uint8)
+            if image.dtype == np.float32:
+                return np.power(np.clip(image, 0, 1), 1.0 / self._gamma)
+            return apply_lut(image, self.get_lut())
         except Exception as e:
             raise RuntimeError(f"Error applying gamma correction: {str(e)}")
 
+    def get_lut(self):
+        # Normalize to 0-1 range, apply gamma correction and convert back to 0-255 range
+        normalized = np.arange(256, dtype=np.float32) / 255.0
+        corrected = np.power(normalized, 1.0/self._gamma)
+        return (corrected * 255).astype(np.uint8)
+
     def get_parameters(self):
         return {"gamma": self._gamma}
 
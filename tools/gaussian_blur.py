@@ -1,9 +1,11 @@
 # tools/gaussian_blur.py
 import cv2
 import numpy as np
-from .base_tool import ImageProcessingTool
+from .base_tool import ImageProcessingTool, scale_odd_size
 
 class GaussianBlurTool(ImageProcessingTool):
+    dtypes = ('uint8', 'uint16', 'float32')
+
     def __init__(self):
         self._kernel_size = 5
         self._sigma = 1.0
@@ -47,9 +49,18 @@ class GaussianBlurTool(ImageProcessingTool):
         except Exception as e:
             raise RuntimeError(f"Error applying Gaussian blur: {str(e)}")
 
+    def get_halo(self):
+        return self._kernel_size // 2
+
     def get_parameters(self):
         return self.parameters
 
+    def get_scaled_parameters(self, scale):
+        return {
+            "kernel_size": scale_odd_size(self._kernel_size, scale),
+            "sigma": max(self._sigma * scale, 0.1)
+        }
+
     def update_parameters(self, params):
         if not isinstance(params, dict):
             raise ValueError("Parameters must be provided as a dictionary")
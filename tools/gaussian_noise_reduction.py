@@ -4,6 +4,8 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class GaussianNoiseReductionTool(ImageProcessingTool):
+    dtypes = ('uint8', 'uint16', 'float32')
+
     def __init__(self):
         self._kernel_size = (5, 5)
         self._sigma_x = 0
@@ -56,6 +58,9 @@ class GaussianNoiseReductionTool(ImageProcessingTool):
         except Exception as e:
             raise RuntimeError(f"Error applying Gaussian noise reduction: {str(e)}")
 
+    def get_halo(self):
+        return max(self._kernel_size) // 2
+
     def get_parameters(self):
         return self.parameters
 
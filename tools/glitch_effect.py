@@ -1,5 +1,4 @@
 # tools/glitch_effect.py
-import cv2
 import numpy as np
 from .base_tool import ImageProcessingTool
 
@@ -49,6 +48,11 @@ class GlitchEffectTool(ImageProcessingTool):
             raise ValueError(f"Glitch type must be one of {valid_types}")
         return glitch_type
 
+    @property
+    def deterministic(self):
+        # Without a seed every call draws fresh randomness
+        return self._seed is not None
+
     @property
     def glitch_intensity(self):
         return self._glitch_intensity
@@ -71,7 +75,7 @@ class GlitchEffectTool(ImageProcessingTool):
 
     @seed.setter
     def seed(self, value):
-        self._seed = value if value is not None else np.random.randint(0, 1000)
+        self._seed = value if value is not None else int(np.random.default_rng().integers(0, 1000))
 
     @property
     def glitch_type(self):
@@ -89,14 +93,52 @@ class GlitchEffectTool(ImageProcessingTool):
     def block_size(self, value):
         self._block_size = self._validate_block_size(value)
 
+    def _shift_range(self, rng, size):
+        """Draw size random shifts in [-channel_shift, channel_shift]."""
+        return rng.integers(-self._channel_shift, self._channel_shift + 1, size)
+
+    def _glitch_blocks(self, glitched, rng):
+        """Shift or randomize a random subset of blocks, all in one pass."""
+        h, w = glitched.shape[:2]
+        size = self._block_size
+        num_blocks_h, num_blocks_w = h // size, w // size
+        num_glitched = int(num_blocks_h * num_blocks_w * self._glitch_intensity)
+        if num_glitched == 0:
+            return
+
+        # View the whole-block area as (block row, y, block column, x, channel)
+        pixels = glitched if glitched.ndim == 3 else glitched[:, :, np.newaxis]
+        blocks = pixels[:num_blocks_h * size, :num_blocks_w * size].reshape(
+            num_blocks_h, size, num_blocks_w, size, pixels.shape[2])
+
+        chosen = rng.choice(num_blocks_h * num_blocks_w, num_glitched, replace=False)
+        block_y, block_x = np.divmod(chosen, num_blocks_w)
+        shifted = rng.random(num_glitched) < 0.5
+
+        # Roll each shifted block by its own offset through one gather
+        sy, sx = block_y[shifted], block_x[shifted]
+        count = sy.size
+        offsets = np.arange(size)
+        rows = (offsets[np.newaxis, :] - self._shift_range(rng, count)[:, np.newaxis]) % size
+        cols = (offsets[np.newaxis, :] - self._shift_range(rng, count)[:, np.newaxis]) % size
+        selected = blocks[sy, :, sx, :]
+        blocks[sy, :, sx, :] = selected[np.arange(count)[:, np.newaxis, np.newaxis],
+                                        rows[:, :, np.newaxis], cols[:, np.newaxis, :]]
+
+        # Fill the remaining blocks with noise
+        ry, rx = block_y[~shifted], block_x[~shifted]
+        blocks[ry, :, rx, :] = rng.integers(0, 256, (ry.size, size, size, pixels.shape[2]),
+                                            dtype=np.uint8)
+
     def apply(self, image):
         """Apply glitch effect."""
         if image is None:
             raise ValueError("No image provided for processing")
-        
+
         try:
-            # Set random seed for reproducibility
-            np.random.seed(self._seed)
+            # A generator per call keeps the output reproducible for a given seed and
+            # lets several instances run concurrently without sharing global state
+            rng = np.random.default_rng(self._seed)
 
             # Create a copy of the image
             glitched = image.copy()
@@ -107,64 +149,34 @@ class GlitchEffectTool(ImageProcessingTool):
             # Apply different glitch types based on selected type
             if self._glitch_type == 'random':
                 # Random pixel modifications
+                pixels = glitched.reshape(h * w, -1)
                 num_glitch_pixels = int(h * w * self._glitch_intensity)
-                glitch_indices = np.random.randint(0, h*w, num_glitch_pixels)
-                glitched.ravel()[glitch_indices] = np.random.randint(0, 256, num_glitch_pixels)
+                glitch_indices = rng.integers(0, h * w, num_glitch_pixels)
+                pixels[glitch_indices] = rng.integers(0, 256, (num_glitch_pixels, pixels.shape[1]),
+                                                      dtype=np.uint8)
 
             elif self._glitch_type == 'block':
                 # Block glitch effect
-                num_blocks_h = h // self._block_size
-                num_blocks_w = w // self._block_size
-
-                for _ in range(int(num_blocks_h * num_blocks_w * self._glitch_intensity)):
-                    block_x = np.random.randint(0, num_blocks_w)
-                    block_y = np.random.randint(0, num_blocks_h)
-
-                    start_x = block_x * self._block_size
-                    start_y = block_y * self._block_size
-
-                    # Shift or randomize block
-                    block = glitched[
-                        start_y:start_y+self._block_size, 
-                        start_x:start_x+self._block_size
-                    ]
-                    
-                    if np.random.random() < 0.5:
-                        # Shift block
-                        shift_x = np.random.randint(-self._channel_shift, self._channel_shift)
-                        shift_y = np.random.randint(-self._channel_shift, self._channel_shift)
-                        block = np.roll(block, (shift_y, shift_x), axis=(0, 1))
-                    else:
-                        # Randomize block
-                        block[:] = np.random.randint(0, 256, block.shape)
-
-                    glitched[
-                        start_y:start_y+self._block_size, 
-                        start_x:start_x+self._block_size
-                    ] = block
-
-            elif self._glitch_type == 'channel':
-                # Channel shift glitch
-                for channel in range(3):
-                    shift = np.random.randint(-self._channel_shift, self._channel_shift)
-                    channel_img = glitched[:,:,channel]
-                    channel_img = np.roll(channel_img, shift, axis=0)
-                    glitched[:,:,channel] = channel_img
+                self._glitch_blocks(glitched, rng)
+
+            elif self._glitch_type == 'channel' and glitched.ndim == 3:
+                # Channel shift glitch: gather every channel through its own shifted row index
+                channels = glitched.shape[2]
+                rows = (np.arange(h)[:, np.newaxis] - self._shift_range(rng, channels)) % h
+                glitched = glitched[rows, :, np.arange(channels)].transpose(0, 2, 1).copy()
 
             elif self._glitch_type == 'slice':
                 # Image slice glitch
                 slice_height = int(h * self._glitch_intensity)
-                slice_y = np.random.randint(0, h - slice_height)
-                
+                slice_y = rng.integers(0, h - slice_height + 1)
+
                 # Shift or randomize slice
                 slice_img = glitched[slice_y:slice_y+slice_height, :]
-                if np.random.random() < 0.5:
-                    shift_x = np.random.randint(-self._channel_shift, self._channel_shift)
-                    slice_img = np.roll(slice_img, shift_x, axis=1)
+                if rng.random() < 0.5:
+                    shift_x = self._shift_range(rng, None)
+                    slice_img[:] = np.roll(slice_img, shift_x, axis=1)
                 else:
-                    slice_img = np.random.randint(0, 256, slice_img.shape)
-                
-                glitched[slice_y:slice_y+slice_height, :] = slice_img
+                    slice_img[:] = rng.integers(0, 256, slice_img.shape, dtype=np.uint8)
 
             return glitched
 
@@ -196,6 +208,7 @@ class GlitchEffectTool(ImageProcessingTool):
             self.glitch_type = params["glitch_type"]
         if "block_size" in params:
             self.block_size = params["block_size"]
+
     def get_valid_options(self):
         """Return valid options for parameters that require a drop-down menu."""
         return {
@@ -4,6 +4,8 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class GradientTool(ImageProcessingTool):
+    output_channels = 'gray'
+
     def __init__(self):
         self._gradient_type = 'sobel'
         self._kernel_size = 3
@@ -92,6 +94,11 @@ class GradientTool(ImageProcessingTool):
         except Exception as e:
             raise RuntimeError(f"Error applying gradient: {str(e)}")
 
+    def get_halo(self):
+        if self._gradient_type == 'scharr':
+            return 1
+        return max(1, self._kernel_size // 2)
+
     def get_parameters(self):
         return {
             "gradient_type": self._gradient_type,
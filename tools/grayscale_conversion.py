@@ -4,6 +4,11 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class GrayscaleConversionTool(ImageProcessingTool):
+    input_channels = 'bgr'
+    output_channels = 'gray'
+    halo = 0
+    dtypes = ('uint8', 'uint16', 'float32')
+
     def __init__(self):
         self._weights = [0.299, 0.587, 0.114]  # Standard BT.601 weights
         self._validate_weights(self._weights)
@@ -4,6 +4,8 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class HighPassFilterTool(ImageProcessingTool):
+    dtypes = ('uint8', 'uint16', 'float32')
+
     def __init__(self):
         self._kernel_size = 3
         self._sigma = 1.0
@@ -47,10 +49,17 @@ class HighPassFilterTool(ImageProcessingTool):
             # Create low pass filter
             blur = cv2.GaussianBlur(image, (self._kernel_size, self._kernel_size), self._sigma)
             # Subtract from original image to get high pass
-            return cv2.subtract(image, blur)
+            high_pass = cv2.subtract(image, blur)
+            if image.dtype == np.float32:
+                # Integer depths saturate at zero
+                return np.maximum(high_pass, 0)
+            return high_pass
         except Exception as e:
             raise RuntimeError(f"Error applying high pass filter: {str(e)}")
 
+    def get_halo(self):
+        return self._kernel_size // 2
+
     def get_parameters(self):
         return {
             "kernel_size": self._kernel_size,
@@ -4,6 +4,8 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class HoughTransformTool(ImageProcessingTool):
+    output_channels = 'bgr'
+
     def __init__(self):
         self._transform_type = 'lines'
         self._rho = 1
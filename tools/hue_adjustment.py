@@ -4,6 +4,10 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class HueAdjustmentTool(ImageProcessingTool):
+    input_channels = 'bgr'
+    halo = 0
+    dtypes = ('uint8', 'float32')
+
     def __init__(self):
         self._hue_shift = 0
         self._validate_hue_shift(self._hue_shift)
@@ -30,7 +34,11 @@ class HueAdjustmentTool(ImageProcessingTool):
             raise ValueError("No image provided for processing")
         try:
             hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
-            hsv[:, :, 0] = (hsv[:, :, 0] + self._hue_shift) % 180
+            if image.dtype == np.float32:
+                # Float hue is in degrees rather than 8-bit half-degrees
+                hsv[:, :, 0] = (hsv[:, :, 0] + 2 * self._hue_shift) % 360
+            else:
+                hsv[:, :, 0] = (hsv[:, :, 0] + self._hue_shift) % 180
             return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
         except Exception as e:
             raise RuntimeError(f"Error adjusting hue: {str(e)}")
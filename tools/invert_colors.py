@@ -1,9 +1,12 @@
 # tools/invert_colors.py
 import cv2
 import numpy as np
-from .base_tool import ImageProcessingTool
+from .base_tool import ImageProcessingTool, apply_lut
 
 class InvertColorsTool(ImageProcessingTool):
+    pointwise = True
+    dtypes = ('uint8', 'float32')
+
     def __init__(self):
         self._strength = 1.0
         self._validate_strength(self._strength)
@@ -29,13 +32,19 @@ class InvertColorsTool(ImageProcessingTool):
         if image is None:
             raise ValueError("No image provided for processing")
         try:
-            inverted = cv2.bitwise_not(image)
-            if self._strength == 1.0:
-                return inverted
-            return cv2.addWeighted(image, 1 - self._strength, inverted, self._strength, 0)
+            if image.dtype == np.float32:
+                return image + self._strength * (1.0 - 2.0 * image)
+            return apply_lut(image, self.get_lut())
         except Exception as e:
             raise RuntimeError(f"Error inverting colors: {str(e)}")
 
+    def get_lut(self):
+        levels = np.arange(256, dtype=np.uint8)
+        inverted = cv2.bitwise_not(levels)
+        if self._strength == 1.0:
+            return inverted.ravel()
+        return cv2.addWeighted(levels, 1 - self._strength, inverted, self._strength, 0).ravel()
+
     def get_parameters(self):
         return {"strength": self._strength}
 
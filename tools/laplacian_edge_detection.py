@@ -4,6 +4,8 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class LaplacianEdgeDetectionTool(ImageProcessingTool):
+    output_channels = 'gray'
+
     def __init__(self):
         self._kernel_size = 3
         self._scale = 1.0
@@ -65,6 +67,9 @@ class LaplacianEdgeDetectionTool(ImageProcessingTool):
         except Exception as e:
             raise RuntimeError(f"Error applying Laplacian edge detection: {str(e)}")
 
+    def get_halo(self):
+        return max(1, self._kernel_size // 2)
+
     def get_parameters(self):
         return self.parameters
 
@@ -4,6 +4,8 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class LaplacianSharpeningTool(ImageProcessingTool):
+    dtypes = ('uint8', 'float32')
+
     def __init__(self):
         self._kernel_size = 3
         self._scale = 1.0
@@ -45,11 +47,16 @@ class LaplacianSharpeningTool(ImageProcessingTool):
             laplacian = cv2.Laplacian(img_float, cv2.CV_32F, ksize=self._kernel_size)
             # Apply sharpening
             sharpened = img_float + self._scale * laplacian
+            if image.dtype == np.float32:
+                return np.clip(sharpened, 0, 1)
             # Clip values and convert back to uint8
             return np.clip(sharpened, 0, 255).astype(np.uint8)
         except Exception as e:
             raise RuntimeError(f"Error applying Laplacian sharpening: {str(e)}")
 
+    def get_halo(self):
+        return max(1, self._kernel_size // 2)
+
     def get_parameters(self):
         return self.parameters
 
@@ -1,8 +1,80 @@
+# tools/lbp.py
+from functools import lru_cache
+
 import cv2
 import numpy as np
 from .base_tool import ImageProcessingTool
 
+MAX_POINTS = 32
+# default and ror emit raw P-bit codes, which stay distinct as 0-1 float32 up to 24 bits
+MAX_RAW_POINTS = 24
+# Mappings are tabulated up to this many points; beyond that they are computed per pixel
+MAX_TABLE_POINTS = 16
+
+
+def _code_dtype(max_value):
+    """Smallest unsigned dtype that holds codes up to max_value."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+def _rotate_right(codes, n_points, shift):
+    """Circularly rotate n_points-bit codes right by shift bits."""
+    mask = np.uint64((1 << n_points) - 1)
+    shift = shift % n_points
+    if shift == 0:
+        return codes & mask
+    return ((codes >> np.uint64(shift)) | (codes << np.uint64(n_points - shift))) & mask
+
+
+def _popcount(codes, n_points):
+    counts = np.zeros(codes.shape, dtype=np.uint8)
+    for bit in range(n_points):
+        counts += ((codes >> np.uint64(bit)) & np.uint64(1)).astype(np.uint8)
+    return counts
+
+
+def _map_codes(codes, method, n_points):
+    """Map raw LBP codes with the uniform, ror or nri_uniform scheme."""
+    codes = codes.astype(np.uint64)
+    if method == 'ror':
+        # Rotation invariant: smallest value over all circular rotations
+        mapped = codes.copy()
+        for shift in range(1, n_points):
+            np.minimum(mapped, _rotate_right(codes, n_points, shift), out=mapped)
+        return mapped.astype(_code_dtype((1 << n_points) - 1))
+
+    ones = _popcount(codes, n_points)
+    transitions = _popcount(codes ^ _rotate_right(codes, n_points, 1), n_points)
+    is_uniform = transitions <= 2
+
+    if method == 'uniform':
+        # Uniform patterns map to their number of set bits, the rest share bin n_points + 1
+        mapped = np.where(is_uniform, ones, n_points + 1)
+        return mapped.astype(_code_dtype(n_points + 1))
+
+    # nri_uniform: each rotation of a uniform pattern gets its own bin
+    run_starts = codes & ~_rotate_right(codes, n_points, n_points - 1) & np.uint64((1 << n_points) - 1)
+    start = np.log2(np.maximum(run_starts, 1).astype(np.float64)).astype(np.int64)
+    ones = ones.astype(np.int64)
+    rotation = (n_points - start) % n_points
+    mapped = np.where(is_uniform, 1 + (ones - 1) * n_points + rotation, n_points * (n_points - 1) + 2)
+    mapped = np.where(ones == 0, 0, mapped)
+    mapped = np.where(ones == n_points, n_points * (n_points - 1) + 1, mapped)
+    return mapped.astype(_code_dtype(n_points * (n_points - 1) + 2))
+
+
+@lru_cache(maxsize=16)
+def _mapping_table(method, n_points):
+    """Lookup table from every raw code to its mapped value."""
+    return _map_codes(np.arange(1 << n_points, dtype=np.uint64), method, n_points)
+
+
 class LBPTool(ImageProcessingTool):
+    output_channels = 'gray'
+
     def __init__(self):
         self._radius = 1
         self._n_points = 8
@@ -13,34 +85,65 @@ class LBPTool(ImageProcessingTool):
         try:
             if self._radius <= 0:
                 raise ValueError("Radius must be positive")
-            if self._n_points <= 0:
-                raise ValueError("Number of points must be positive")
+            if self._n_points <= 0 or self._n_points > MAX_POINTS:
+                raise ValueError(f"Number of points must be between 1 and {MAX_POINTS}")
             if self._method not in ['default', 'uniform', 'ror', 'nri_uniform']:
                 raise ValueError("Invalid method. Must be one of: default, uniform, ror, nri_uniform")
+            if self._method in ['default', 'ror'] and self._n_points > MAX_RAW_POINTS:
+                raise ValueError(f"Methods default and ror support at most {MAX_RAW_POINTS} points")
         except (ValueError, TypeError) as e:
             raise ValueError(f"Invalid parameters: {str(e)}")
 
     def _calculate_lbp(self, image, radius, n_points):
         height, width = image.shape
-        lbp = np.zeros((height, width), dtype=np.uint8)
+        lbp = np.zeros((height, width), dtype=_code_dtype((1 << n_points) - 1))
+        if height <= 2 * radius or width <= 2 * radius:
+            return lbp
         
-        # Precompute the angles and coordinates for the neighbors
-        angles = np.linspace(0, 2 * np.pi, n_points, endpoint=False)
-        x_offsets = radius * np.cos(angles)
-        y_offsets = -radius * np.sin(angles)
+        # Precompute the neighbor offsets, snapping values that are integers up to rounding
+        angles = 2 * np.pi * np.arange(n_points) / n_points
+        y_offsets = np.round(-radius * np.sin(angles), 9)
+        x_offsets = np.round(radius * np.cos(angles), 9)
         
-        for h in range(radius, height - radius):
-            for w in range(radius, width - radius):
-                center = image[h, w]
-                binary = 0
-                for p in range(n_points):
-                    x = int(w + x_offsets[p])
-                    y = int(h + y_offsets[p])
-                    binary |= (image[y, x] >= center) << p
-                lbp[h, w] = binary
+        center = image[radius:height - radius, radius:width - radius]
+        center_float = None
+        # Comparison bits are gathered into one uint8 plane per 8 neighbors
+        planes = [np.zeros(center.shape, dtype=np.uint8) for _ in range((n_points + 7) // 8)]
+        for p in range(n_points):
+            y0, x0 = int(np.floor(y_offsets[p])), int(np.floor(x_offsets[p]))
+            fy, fx = y_offsets[p] - y0, x_offsets[p] - x0
+            if fy == 0 and fx == 0:
+                source, reference = image, center
+            else:
+                # Bilinear interpolation as a 2x2 correlation anchored at the top-left sample
+                kernel = np.array([
+                    [(1 - fy) * (1 - fx), (1 - fy) * fx],
+                    [fy * (1 - fx), fy * fx]
+                ], dtype=np.float32)
+                source = cv2.filter2D(image, cv2.CV_32F, kernel, anchor=(0, 0))
+                if center_float is None:
+                    center_float = center.astype(np.float32)
+                reference = center_float
+            neighbor = source[radius + y0:height - radius + y0, radius + x0:width - radius + x0]
+            bit = cv2.compare(neighbor, reference, cv2.CMP_GE)
+            plane = planes[p // 8]
+            cv2.bitwise_or(plane, cv2.bitwise_and(bit, 1 << (p % 8)), dst=plane)
+
+        codes = lbp[radius:height - radius, radius:width - radius]
+        for index, plane in enumerate(planes):
+            codes |= plane.astype(lbp.dtype) << lbp.dtype.type(8 * index)
         
         return lbp
 
+    def _apply_mapping(self, lbp, method, n_points):
+        if method == 'default':
+            return lbp
+        if n_points <= MAX_TABLE_POINTS:
+            return _mapping_table(method, n_points)[lbp]
+        # Too many points to tabulate every code, so only map the codes that occur
+        codes, inverse = np.unique(lbp, return_inverse=True)
+        return _map_codes(codes, method, n_points)[inverse].reshape(lbp.shape)
+
     def apply(self, image):
         if image is None:
             raise ValueError("No image provided for processing")
@@ -48,10 +151,21 @@ class LBPTool(ImageProcessingTool):
         try:
             if len(image.shape) > 2:
                 image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            return self._calculate_lbp(image, self._radius, self._n_points)
+            lbp = self._calculate_lbp(image, self._radius, self._n_points)
+            codes = self._apply_mapping(lbp, self._method, self._n_points)
+            if codes.dtype.itemsize > 2:
+                # Codes wider than 16 bits have no depth the pipeline can display or save,
+                # so they are scaled to 0-1 floats (exact up to MAX_RAW_POINTS)
+                return (codes / float((1 << self._n_points) - 1)).astype(np.float32)
+            return codes
         except Exception as e:
             raise RuntimeError(f"Error applying LBP: {str(e)}")
 
+    def get_halo(self):
+        # Codes within radius of the border are zero, so one extra pixel keeps
+        # tile borders from being mistaken for image borders
+        return self._radius + 1
+
     def get_parameters(self):
         return {
             "radius": self._radius,
@@ -1,7 +1,7 @@
 # tools/median_blur.py
 import cv2
 import numpy as np
-from .base_tool import ImageProcessingTool
+from .base_tool import ImageProcessingTool, scale_odd_size
 
 class MedianBlurTool(ImageProcessingTool):
     def __init__(self):
@@ -32,9 +32,22 @@ class MedianBlurTool(ImageProcessingTool):
         except Exception as e:
             raise RuntimeError(f"Error applying median blur: {str(e)}")
 
+    @property
+    def dtypes(self):
+        # OpenCV only takes 16-bit and float images with 3x3 and 5x5 kernels
+        if self._kernel_size <= 5:
+            return ('uint8', 'uint16', 'float32')
+        return ('uint8',)
+
+    def get_halo(self):
+        return self._kernel_size // 2
+
     def get_parameters(self):
         return {"kernel_size": self._kernel_size}
 
+    def get_scaled_parameters(self, scale):
+        return {"kernel_size": scale_odd_size(self._kernel_size, scale)}
+
     def update_parameters(self, params):
         if not isinstance(params, dict):
             raise ValueError("Parameters must be provided as a dictionary")
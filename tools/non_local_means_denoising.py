@@ -4,6 +4,8 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class NonLocalMeansDenoisingTool(ImageProcessingTool):
+    input_channels = 'bgr'
+
     def __init__(self):
         self._h = 10  # Filter strength
         self._template_window_size = 7
@@ -58,6 +60,9 @@ class NonLocalMeansDenoisingTool(ImageProcessingTool):
         except Exception as e:
             raise RuntimeError(f"Error applying Non-Local Means denoising: {str(e)}")
 
+    def get_halo(self):
+        return self._template_window_size // 2 + self._search_window_size // 2
+
     def get_parameters(self):
         return self.parameters
 
@@ -1,7 +1,7 @@
 # tools/oil_paint.py
 import cv2
 import numpy as np
-from .base_tool import ImageProcessingTool
+from .base_tool import ImageProcessingTool, scale_odd_size
 
 class OilPaintingTool(ImageProcessingTool):
     def __init__(self):
@@ -9,6 +9,7 @@ class OilPaintingTool(ImageProcessingTool):
         self._brush_size = 5  # Size of the brush/kernel
         self._color_levels = 10  # Number of color intensity levels
         self._smooth_factor = 1  # Smoothing factor
+        self._mode = 'block'  # 'block' paints brush-sized tiles, 'sliding' uses a per-pixel window
 
     def _validate_brush_size(self, size):
         """Validate brush size parameter."""
@@ -40,6 +41,13 @@ class OilPaintingTool(ImageProcessingTool):
         except (ValueError, TypeError) as e:
             raise ValueError(f"Invalid smooth factor: {str(e)}")
 
+    def _validate_mode(self, mode):
+        """Validate painting mode."""
+        valid_modes = ['block', 'sliding']
+        if mode not in valid_modes:
+            raise ValueError(f"Mode must be one of {valid_modes}")
+        return mode
+
     @property
     def brush_size(self):
         return self._brush_size
@@ -64,87 +72,107 @@ class OilPaintingTool(ImageProcessingTool):
     def smooth_factor(self, value):
         self._smooth_factor = self._validate_smooth_factor(value)
 
+    @property
+    def mode(self):
+        return self._mode
+
+    @mode.setter
+    def mode(self, value):
+        self._mode = self._validate_mode(value)
+
+    def _window_sum(self, src):
+        """Sum src over the brush window of every output pixel (or tile in block mode)."""
+        size = self._brush_size
+        # 16-bit sums are exact as long as a full window of 255s fits
+        depth = cv2.CV_16U if size * size * 255 <= 65535 else cv2.CV_32F
+        if self._mode == 'block':
+            # Anchor the window at its top-left corner and keep one sum per tile
+            sums = cv2.boxFilter(
+                src, depth, (size, size), anchor=(0, 0),
+                normalize=False, borderType=cv2.BORDER_CONSTANT
+            )
+            return sums[::size, ::size]
+        # Zero border so edge windows only count pixels inside the image
+        return cv2.boxFilter(
+            src, depth, (size, size), normalize=False, borderType=cv2.BORDER_CONSTANT
+        )
+
     def apply(self, image):
         """Apply oil painting effect."""
         if image is None:
             raise ValueError("No image provided for processing")
         
         try:
-            # Create a copy of the image
-            img = image.copy()
-
-            # Convert to float for processing
-            img_float = img.astype(np.float32) / 255.0
-
-            # Apply Gaussian blur for smoothing
+            # Intensity used to bin pixels, optionally smoothed to reduce speckle
+            gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
             if self._smooth_factor > 0:
-                img_float = cv2.GaussianBlur(
-                    img_float, 
+                gray = cv2.GaussianBlur(
+                    gray, 
                     (0, 0), 
                     sigmaX=self._smooth_factor, 
                     sigmaY=self._smooth_factor
                 )
-
-            # Convert to grayscale for intensity calculation
-            gray = cv2.cvtColor(img_float, cv2.COLOR_BGR2GRAY)
-
-            # Prepare output image
-            oil_painting = np.zeros_like(img)
-
-            # Iterate through each channel
-            for channel in range(3):
-                # Create a canvas for this channel
-                channel_canvas = np.zeros_like(gray)
-
-                # Iterate through image with the specified brush size
-                h, w = img.shape[:2]
-                for y in range(0, h, self._brush_size):
-                    for x in range(0, w, self._brush_size):
-                        # Extract local region
-                        region = gray[
-                            max(0, y-self._brush_size//2):min(h, y+self._brush_size//2+1),
-                            max(0, x-self._brush_size//2):min(w, x+self._brush_size//2+1)
-                        ]
-
-                        # Find the most frequent intensity level
-                        intensity_hist = np.histogram(
-                            region, 
-                            bins=self._color_levels, 
-                            range=(0, 1)
-                        )[0]
-                        most_frequent_intensity = np.argmax(intensity_hist)
-
-                        # Calculate mean color in this region for the current channel
-                        mean_color = np.mean(
-                            img[
-                                max(0, y-self._brush_size//2):min(h, y+self._brush_size//2+1),
-                                max(0, x-self._brush_size//2):min(w, x+self._brush_size//2+1),
-                                channel
-                            ]
-                        )
-
-                        # Fill the region with mean color
-                        channel_canvas[
-                            max(0, y-self._brush_size//2):min(h, y+self._brush_size//2+1),
-                            max(0, x-self._brush_size//2):min(w, x+self._brush_size//2+1)
-                        ] = mean_color
-
-                # Assign channel to output image
-                oil_painting[:,:,channel] = channel_canvas.astype(np.uint8)
+            bins = ((gray.astype(np.uint16) * self._color_levels) >> 8).astype(np.uint8)
+
+            # For every window keep the pixel count and color sum of its most populated bin
+            best_count = best_sum = None
+            for level in np.unique(bins):
+                in_bin = (bins == level).view(np.uint8)
+                count = self._window_sum(in_bin)
+                if best_count is not None:
+                    better = count > best_count
+                    if not better.any():
+                        continue
+                colors = self._window_sum(cv2.bitwise_and(image, image, mask=in_bin))
+                if best_count is None:
+                    best_count, best_sum = count, colors
+                else:
+                    np.copyto(best_count, count, where=better)
+                    np.copyto(best_sum, colors, where=better[..., np.newaxis] if colors.ndim == 3 else better)
+
+            if best_sum.ndim == 3:
+                best_count = best_count[..., np.newaxis]
+            oil_painting = best_sum / np.maximum(best_count, 1).astype(np.float32)
+            oil_painting = np.clip(oil_painting + 0.5, 0, 255).astype(np.uint8)
+
+            if self._mode == 'block':
+                size = self._brush_size
+                h, w = image.shape[:2]
+                oil_painting = cv2.resize(
+                    oil_painting,
+                    (oil_painting.shape[1] * size, oil_painting.shape[0] * size),
+                    interpolation=cv2.INTER_NEAREST
+                )[:h, :w]
 
             return oil_painting
 
         except Exception as e:
             raise RuntimeError(f"Error applying oil painting effect: {str(e)}")
 
+    def get_halo(self):
+        # Block mode paints tiles aligned to the image origin
+        if self._mode == 'block':
+            return None
+        # Brush window plus the extent OpenCV picks for the smoothing kernel
+        blur_radius = int(round(self._smooth_factor * 6 + 1)) // 2 if self._smooth_factor > 0 else 0
+        return self._brush_size // 2 + blur_radius
+
     def get_parameters(self):
         """Get current tool parameters."""
         return {
             "brush_size": self._brush_size,
             "color_levels": self._color_levels,
-            "smooth_factor": self._smooth_factor
+            "smooth_factor": self._smooth_factor,
+            "mode": self._mode
         }
 
+    def get_scaled_parameters(self, scale):
+        """Get parameters adjusted for an image resized by scale."""
+        params = self.get_parameters()
+        params["brush_size"] = min(scale_odd_size(self._brush_size, scale, 3), 21)
+        params["smooth_factor"] = self._smooth_factor * scale
+        return params
+
     def update_parameters(self, params):
         """Update tool parameters."""
         if not isinstance(params, dict):
@@ -155,4 +183,12 @@ class OilPaintingTool(ImageProcessingTool):
         if "color_levels" in params:
             self.color_levels = params["color_levels"]
         if "smooth_factor" in params:
-            self.smooth_factor = params["smooth_factor"]
\ No newline at end of file
+            self.smooth_factor = params["smooth_factor"]
+        if "mode" in params:
+            self.mode = params["mode"]
+
+    def get_valid_options(self):
+        """Return valid options for parameters that require a drop-down menu."""
+        return {
+            "mode": ['block', 'sliding']
+        }
\ No newline at end of file
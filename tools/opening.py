@@ -4,6 +4,10 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class OpeningTool(ImageProcessingTool):
+    # Erosion then dilation with a 3x3 kernel
+    halo = 2
+    dtypes = ('uint8', 'uint16', 'float32')
+
     def apply(self, image):
         if image is None:
             raise ValueError("No image provided for processing")
@@ -4,6 +4,8 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class ORBFeatureDetectionTool(ImageProcessingTool):
+    output_channels = 'bgr'
+
     def __init__(self):
         self._n_features = 500
         self._scale_factor = 1.2
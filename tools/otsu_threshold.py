@@ -4,6 +4,10 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class OtsuThresholdTool(ImageProcessingTool):
+    output_channels = 'gray'
+    # The threshold comes from the histogram of the whole image
+    halo = None
+
     def __init__(self):
         self._max_value = 255
         self._validate_max_value(self._max_value)
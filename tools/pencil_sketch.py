@@ -4,6 +4,8 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class PencilSketchTool(ImageProcessingTool):
+    input_channels = 'bgr'
+
     def __init__(self):
         # Default pencil sketch parameters
         self._sketch_mode = 'grayscale'  # Sketch mode (grayscale or color)
@@ -163,6 +165,14 @@ class PencilSketchTool(ImageProcessingTool):
         except Exception as e:
             raise RuntimeError(f"Error applying pencil sketch effect: {str(e)}")
 
+    @property
+    def output_channels(self):
+        return 'gray' if self._sketch_mode == 'grayscale' else 'bgr'
+
+    def get_halo(self):
+        # 21x21 Gaussian, after a 9-pixel bilateral filter in color mode
+        return 10 if self._sketch_mode == 'grayscale' else 14
+
     def get_parameters(self):
         """Get current tool parameters."""
         return {
@@ -1,13 +1,22 @@
 # tools/pixelation.py
+import os
+
 import cv2
 import numpy as np
 from .base_tool import ImageProcessingTool
 
 class PixelationTool(ImageProcessingTool):
+    # Blocks and regions are aligned to the image origin
+    halo = None
+
     def __init__(self):
         # Default pixelation parameters
-        self._pixel_size = 10  # Size of pixels for pixelation effect
-        self._scale_factor = 0.1  # Scale factor for pixelation
+        self._pixel_size = 10  # Width of each block (and hexagon size)
+        self._pixel_height = 0  # Height of each block, 0 for square blocks
+        self._mode = 'square'  # Block shape: 'square' or 'hexagonal'
+        self._region = None  # Optional rectangle [x, y, width, height] to restrict the effect
+        self._mask = None  # Optional path to a grayscale mask; nonzero pixels are pixelated
+        self._mask_image = None  # (path, mask) read from the mask file
 
     def _validate_pixel_size(self, size):
         """Validate pixel size parameter."""
@@ -19,15 +28,42 @@ class PixelationTool(ImageProcessingTool):
         except (ValueError, TypeError) as e:
             raise ValueError(f"Invalid pixel size: {str(e)}")
 
-    def _validate_scale_factor(self, factor):
-        """Validate scale factor parameter."""
+    def _validate_pixel_height(self, height):
+        """Validate pixel height parameter."""
         try:
-            factor = float(factor)
-            if factor <= 0 or factor > 1:
-                raise ValueError("Scale factor must be between 0 and 1")
-            return factor
+            height = int(height)
+            if height != 0 and (height < 2 or height > 100):
+                raise ValueError("Pixel height must be 0 (square) or between 2 and 100")
+            return height
         except (ValueError, TypeError) as e:
-            raise ValueError(f"Invalid scale factor: {str(e)}")
+            raise ValueError(f"Invalid pixel height: {str(e)}")
+
+    def _validate_mode(self, mode):
+        """Validate pixelation mode."""
+        valid_modes = ['square', 'hexagonal']
+        if mode not in valid_modes:
+            raise ValueError(f"Mode must be one of {valid_modes}")
+        return mode
+
+    def _validate_region(self, region):
+        """Validate region parameter."""
+        if region is None:
+            return None
+        try:
+            x, y, width, height = (int(v) for v in region)
+            if x < 0 or y < 0 or width <= 0 or height <= 0:
+                raise ValueError("Region must have a non-negative origin and positive size")
+            return [x, y, width, height]
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid region (expected [x, y, width, height]): {str(e)}")
+
+    def _validate_mask(self, mask):
+        """Validate mask parameter."""
+        if mask is None or mask == "":
+            return None
+        if not isinstance(mask, str) or not os.path.isfile(mask):
+            raise ValueError(f"Invalid mask: {mask} is not an image file")
+        return mask
 
     @property
     def pixel_size(self):
@@ -38,52 +74,137 @@ class PixelationTool(ImageProcessingTool):
         self._pixel_size = self._validate_pixel_size(value)
 
     @property
-    def scale_factor(self):
-        return self._scale_factor
+    def pixel_height(self):
+        return self._pixel_height
+
+    @pixel_height.setter
+    def pixel_height(self, value):
+        self._pixel_height = self._validate_pixel_height(value)
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @mode.setter
+    def mode(self, value):
+        self._mode = self._validate_mode(value)
+
+    @property
+    def region(self):
+        return self._region
 
-    @scale_factor.setter
-    def scale_factor(self, value):
-        self._scale_factor = self._validate_scale_factor(value)
+    @region.setter
+    def region(self, value):
+        self._region = self._validate_region(value)
+
+    @property
+    def mask(self):
+        return self._mask
+
+    @mask.setter
+    def mask(self, value):
+        self._mask = self._validate_mask(value)
+
+    def _read_mask(self, height, width):
+        """Returns the mask as a boolean array stretched to height x width."""
+        if self._mask_image is None or self._mask_image[0] != self._mask:
+            mask = cv2.imread(self._mask, cv2.IMREAD_GRAYSCALE)
+            if mask is None:
+                raise ValueError(f"Cannot read mask {self._mask}")
+            self._mask_image = (self._mask, mask)
+        mask = self._mask_image[1]
+        if mask.shape != (height, width):
+            # Masks drawn for the full image also fit proxies and other sizes
+            mask = cv2.resize(mask, (width, height), interpolation=cv2.INTER_NEAREST)
+        return mask > 0
+
+    def _pixelate_blocks(self, img, block_width, block_height):
+        """Replace each block with its mean color via area downscaling and nearest upscaling."""
+        h, w = img.shape[:2]
+        pixelated = np.empty_like(img)
+
+        # Whole blocks first, then the partial blocks along the right and bottom edges,
+        # so every area resize uses an exact integer factor
+        h_main, w_main = h - h % block_height, w - w % block_width
+        for rows, bh in ((slice(0, h_main), block_height), (slice(h_main, h), h - h_main)):
+            for cols, bw in ((slice(0, w_main), block_width), (slice(w_main, w), w - w_main)):
+                part = img[rows, cols]
+                if part.size == 0:
+                    continue
+                ph, pw = part.shape[:2]
+                small = cv2.resize(part, (pw // bw, ph // bh), interpolation=cv2.INTER_AREA)
+                pixelated[rows, cols] = cv2.resize(small, (pw, ph), interpolation=cv2.INTER_NEAREST)
+
+        return pixelated
+
+    def _pixelate_hexagons(self, img, size):
+        """Replace each pointy-top hexagonal cell of width size with its mean color."""
+        h, w = img.shape[:2]
+        radius = size / np.sqrt(3)
+
+        # Cells repeat every size columns, so only the first size columns need cube
+        # rounding; the rest are offset by one column of cells per period
+        x = (np.arange(size) + 0.5)[np.newaxis, :]
+        y = (np.arange(h) + 0.5)[:, np.newaxis]
+        q = (np.sqrt(3) / 3 * x - y / 3) / radius
+        r = np.broadcast_to((2 / 3) * y / radius, q.shape)
+        s = -q - r
+        rq, rr, rs = np.round(q), np.round(r), np.round(s)
+        dq, dr, ds = np.abs(rq - q), np.abs(rr - r), np.abs(rs - s)
+        fix_q = (dq > dr) & (dq > ds)
+        fix_r = ~fix_q & (dr > ds)
+        rq = np.where(fix_q, -rr - rs, rq).astype(np.int32)
+        rr = np.where(fix_r, -rq - rs, rr).astype(np.int32)
+
+        columns = np.arange(w, dtype=np.int32)
+        rq = rq[:, columns % size] + columns // size
+        rq -= rq.min()
+        rr = rr[:, columns % size]
+        rr -= rr.min()
+        labels = (rr * (rq.max() + 1) + rq).ravel()
+
+        # Mean color of each cell, gathered back to the pixels
+        counts = np.bincount(labels)
+        flat = img.reshape(h * w, -1)
+        means = np.empty((counts.size, flat.shape[1]), dtype=img.dtype)
+        for channel in range(flat.shape[1]):
+            sums = np.bincount(labels, weights=flat[:, channel], minlength=counts.size)
+            means[:, channel] = np.round(sums / np.maximum(counts, 1))
+        return means[labels].reshape(img.shape)
 
     def apply(self, image):
         """Apply pixelation effect."""
         if image is None:
             raise ValueError("No image provided for processing")
-        
+
         try:
-            # Create a copy of the image
-            img = image.copy()
-
-            # Calculate small image dimensions
-            small_width = int(img.shape[1] * self._scale_factor)
-            small_height = int(img.shape[0] * self._scale_factor)
-
-            # Resize the image down
-            small_img = cv2.resize(img, (small_width, small_height), interpolation=cv2.INTER_LINEAR)
-
-            # Resize back up using nearest neighbor to create pixelation effect
-            pixelated = cv2.resize(
-                small_img, 
-                (img.shape[1], img.shape[0]), 
-                interpolation=cv2.INTER_NEAREST
-            )
-
-            # Alternative pixelation method using mean pooling
-            if self._pixel_size > 1:
-                h, w = img.shape[:2]
-                pixelated = np.zeros_like(img)
-                for i in range(0, h, self._pixel_size):
-                    for j in range(0, w, self._pixel_size):
-                        # Extract block
-                        block = img[i:i+self._pixel_size, j:j+self._pixel_size]
-                        
-                        # Compute mean color of the block
-                        mean_color = np.mean(block, axis=(0, 1)).astype(np.uint8)
-                        
-                        # Fill block with mean color
-                        pixelated[i:i+self._pixel_size, j:j+self._pixel_size] = mean_color
-
-            return pixelated
+            if self._region is None:
+                target = image
+            else:
+                x, y, width, height = self._region
+                target = image[y:y + height, x:x + width]
+                if target.size == 0:
+                    raise ValueError("Region lies outside the image")
+
+            if self._mode == 'hexagonal':
+                pixelated = self._pixelate_hexagons(target, self._pixel_size)
+            else:
+                block_height = self._pixel_height or self._pixel_size
+                pixelated = self._pixelate_blocks(target, self._pixel_size, block_height)
+
+            if self._mask is not None:
+                mask = self._read_mask(*image.shape[:2])
+                if self._region is not None:
+                    mask = mask[y:y + height, x:x + width]
+                if pixelated.ndim == 3:
+                    mask = mask[:, :, np.newaxis]
+                pixelated = np.where(mask, pixelated, target)
+
+            if self._region is None:
+                return pixelated
+            result = image.copy()
+            result[y:y + height, x:x + width] = pixelated
+            return result
 
         except Exception as e:
             raise RuntimeError(f"Error applying pixelation: {str(e)}")
@@ -92,15 +213,41 @@ class PixelationTool(ImageProcessingTool):
         """Get current tool parameters."""
         return {
             "pixel_size": self._pixel_size,
-            "scale_factor": self._scale_factor
+            "pixel_height": self._pixel_height,
+            "mode": self._mode,
+            "region": self._region,
+            "mask": self._mask
         }
 
+    def get_scaled_parameters(self, scale):
+        """Get parameters adjusted for an image resized by scale."""
+        params = self.get_parameters()
+        params["pixel_size"] = min(max(2, int(round(self._pixel_size * scale))), 100)
+        if self._pixel_height:
+            params["pixel_height"] = min(max(2, int(round(self._pixel_height * scale))), 100)
+        if self._region is not None:
+            params["region"] = [max(1, int(round(v * scale))) if i >= 2 else int(v * scale)
+                                for i, v in enumerate(self._region)]
+        return params
+
     def update_parameters(self, params):
         """Update tool parameters."""
         if not isinstance(params, dict):
             raise ValueError("Parameters must be provided as a dictionary")
-        
+
         if "pixel_size" in params:
             self.pixel_size = params["pixel_size"]
-        if "scale_factor" in params:
-            self.scale_factor = params["scale_factor"]
\ No newline at end of file
+        if "pixel_height" in params:
+            self.pixel_height = params["pixel_height"]
+        if "mode" in params:
+            self.mode = params["mode"]
+        if "region" in params:
+            self.region = params["region"]
+        if "mask" in params:
+            self.mask = params["mask"]
+
+    def get_valid_options(self):
+        """Return valid options for parameters that require a drop-down menu."""
+        return {
+            "mode": ['square', 'hexagonal']
+        }
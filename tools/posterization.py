@@ -1,9 +1,11 @@
 # tools/posterization.py
-import cv2
 import numpy as np
-from .base_tool import ImageProcessingTool
+from .base_tool import ImageProcessingTool, apply_lut
 
 class PosterizationTool(ImageProcessingTool):
+    pointwise = True
+    dtypes = ('uint8', 'float32')
+
     def __init__(self):
         self._levels = 4
         self._validate_levels(self._levels)
@@ -29,14 +31,18 @@ class PosterizationTool(ImageProcessingTool):
         if image is None:
             raise ValueError("No image provided for processing")
         try:
-            # Calculate the division factor based on levels
-            factor = 255 / (self._levels - 1)
-            # Quantize the image
-            quantized = np.round(image / factor) * factor
-            return quantized.astype(np.uint8)
+            if image.dtype == np.float32:
+                return np.round(np.clip(image, 0, 1) * (self._levels - 1)) / (self._levels - 1)
+            return apply_lut(image, self.get_lut())
         except Exception as e:
             raise RuntimeError(f"Error applying posterization: {str(e)}")
 
+    def get_lut(self):
+        # Calculate the division factor based on levels and quantize every input value
+        factor = 255 / (self._levels - 1)
+        quantized = np.round(np.arange(256) / factor) * factor
+        return quantized.astype(np.uint8)
+
     def get_parameters(self):
         return {"levels": self._levels}
 
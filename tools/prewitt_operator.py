@@ -4,6 +4,9 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class PrewittOperatorTool(ImageProcessingTool):
+    output_channels = 'gray'
+    halo = 1
+
     def __init__(self):
         self._direction = 'both'  # 'x', 'y', or 'both'
         self._scale = 1.0
@@ -4,6 +4,10 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class SaturationAdjustmentTool(ImageProcessingTool):
+    input_channels = 'bgr'
+    halo = 0
+    dtypes = ('uint8', 'float32')
+
     def __init__(self):
         self._saturation = 1.0
         self._validate_saturation(self._saturation)
@@ -29,6 +33,10 @@ class SaturationAdjustmentTool(ImageProcessingTool):
         if image is None:
             raise ValueError("No image provided for processing")
         try:
+            if image.dtype == np.float32:
+                hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+                hsv[:, :, 1] = np.clip(hsv[:, :, 1] * self._saturation, 0, 1)
+                return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR)
             hsv = cv2.cvtColor(image, cv2.COLOR_BGR2HSV).astype(np.float32)
             hsv[:, :, 1] *= self._saturation
             hsv[:, :, 1] = np.clip(hsv[:, :, 1], 0, 255)
@@ -4,6 +4,9 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class SelectiveColorReplacementTool(ImageProcessingTool):
+    input_channels = 'bgr'
+    halo = 0
+
     def __init__(self):
         self._target_color = [0, 0, 0]  # BGR format
         self._replacement_color = [0, 0, 0]  # BGR format
@@ -4,6 +4,10 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class SepiaEffectTool(ImageProcessingTool):
+    input_channels = 'bgr'
+    halo = 0
+    dtypes = ('uint8', 'float32')
+
     def __init__(self):
         self._intensity = 1.0
         self._validate_intensity(self._intensity)
@@ -37,7 +41,10 @@ class SepiaEffectTool(ImageProcessingTool):
             ])
             
             sepia = cv2.transform(image, sepia_matrix)
-            sepia = np.clip(sepia, 0, 255).astype(np.uint8)
+            if image.dtype == np.float32:
+                sepia = np.clip(sepia, 0, 1)
+            else:
+                sepia = np.clip(sepia, 0, 255).astype(np.uint8)
             
             # Blend with original based on intensity
             return cv2.addWeighted(image, 1 - self._intensity, sepia, self._intensity, 0)
@@ -4,6 +4,8 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class SIFTFeatureDetectionTool(ImageProcessingTool):
+    output_channels = 'bgr'
+
     def __init__(self):
         # Default SIFT parameters
         self._n_features = 0  # Number of best features to retain
@@ -4,6 +4,8 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class SobelFilterTool(ImageProcessingTool):
+    output_channels = 'gray'
+
     def __init__(self):
         self._kernel_size = 3
         self._dx = 1
@@ -73,6 +75,9 @@ class SobelFilterTool(ImageProcessingTool):
         except Exception as e:
             raise RuntimeError(f"Error applying Sobel filter: {str(e)}")
 
+    def get_halo(self):
+        return max(1, self._kernel_size // 2)
+
     def get_parameters(self):
         return self.parameters
 
@@ -4,6 +4,8 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class SURFFeatureDetectionTool(ImageProcessingTool):
+    output_channels = 'bgr'
+
     def __init__(self):
         # Default SURF parameters
         self._hessian_threshold = 100  # Hessian threshold for feature detection
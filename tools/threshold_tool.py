@@ -4,6 +4,9 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class SimpleThresholdTool(ImageProcessingTool):
+    output_channels = 'gray'
+    halo = 0
+
     def __init__(self):
         self._threshold = 127
         self._max_value = 255
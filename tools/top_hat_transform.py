@@ -4,6 +4,8 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class TopHatTransformTool(ImageProcessingTool):
+    dtypes = ('uint8', 'uint16', 'float32')
+
     def __init__(self):
         self._kernel_size = 5
         self._kernel_shape = cv2.MORPH_RECT
@@ -50,6 +52,10 @@ class TopHatTransformTool(ImageProcessingTool):
         except Exception as e:
             raise RuntimeError(f"Error applying top hat transform: {str(e)}")
 
+    def get_halo(self):
+        # Opening is an erosion followed by a dilation
+        return 2 * (self._kernel_size // 2)
+
     def get_parameters(self):
         return {
             "kernel_size": self._kernel_size,
@@ -4,6 +4,8 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class UnsharpMaskingTool(ImageProcessingTool):
+    dtypes = ('uint8', 'float32')
+
     def __init__(self):
         self._kernel_size = 5
         self._amount = 1.5
@@ -49,15 +51,22 @@ class UnsharpMaskingTool(ImageProcessingTool):
             gaussian = cv2.GaussianBlur(image, (self._kernel_size, self._kernel_size), 0)
             # Calculate the unsharp mask
             unsharp_mask = cv2.addWeighted(image, 1.0 + self._amount, gaussian, -self._amount, 0)
+            # The threshold is in 8-bit levels
+            threshold = self._threshold / 255.0 if image.dtype == np.float32 else self._threshold
             # Apply threshold if specified
             if self._threshold > 0:
                 diff = cv2.absdiff(unsharp_mask, image)
-                mask = diff > self._threshold
+                mask = diff > threshold
                 unsharp_mask[~mask] = image[~mask]
+            if image.dtype == np.float32:
+                np.clip(unsharp_mask, 0, 1, out=unsharp_mask)
             return unsharp_mask
         except Exception as e:
             raise RuntimeError(f"Error applying unsharp mask: {str(e)}")
 
+    def get_halo(self):
+        return self._kernel_size // 2
+
     def get_parameters(self):
         return self.parameters
 
@@ -4,6 +4,9 @@ import numpy as np
 from .base_tool import ImageProcessingTool
 
 class VibranceAdjustmentTool(ImageProcessingTool):
+    input_channels = 'bgr'
+    halo = 0
+
     def __init__(self):
         self._vibrance = 0.0
         self._validate_vibrance(self._vibrance)
@@ -4,6 +4,10 @@ import pywt
 from .base_tool import ImageProcessingTool
 
 class WaveletTransformTool(ImageProcessingTool):
+    output_channels = 'gray'
+    # Output is normalized by the global minimum and maximum
+    halo = None
+
     def __init__(self):
         self._wavelet = 'haar'
         self._level = 1
@@ -0,0 +1,193 @@
+# utils/batch_runner.py
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+import cv2
+
+from utils.image_io import EncoderOptions, image_format, read_image, write_image
+from utils.pipeline_executor import apply_stages
+from utils.pipeline_io import build_stack
+from utils.tile_executor import TileExecutor
+
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".bmp", ".tif", ".tiff", ".webp"}
+
+# Processing stack and optional tiler built once per worker process
+_worker_stack = None
+_worker_tiler = None
+
+
+def find_images(input_dir: str) -> List[str]:
+    """Returns every image file under input_dir, sorted for reproducible runs."""
+    paths = []
+    for root, _, files in os.walk(input_dir):
+        for name in files:
+            if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def _init_worker(stages, cv_threads, tile_memory=None):
+    global _worker_stack, _worker_tiler
+    # Parallelism comes from the process pool, so keep OpenCV from oversubscribing cores
+    cv2.setNumThreads(cv_threads)
+    _worker_stack = build_stack(stages)
+    if tile_memory:
+        _worker_tiler = TileExecutor(max_workers=cv_threads, memory_budget=tile_memory)
+
+
+def encoder_options(output_path: str, encoder_params: Optional[Dict] = None) -> EncoderOptions:
+    """Returns the encoder options for output_path's format with encoder_params applied."""
+    options = EncoderOptions(os.path.splitext(output_path)[1])
+    if encoder_params:
+        options.update_parameters(encoder_params)
+    return options
+
+
+def _write_file(result, image, encoder_params):
+    start = time.perf_counter()
+    try:
+        write_image(result["output"], image, encoder_options(result["output"], encoder_params))
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+    result["write_seconds"] = time.perf_counter() - start
+    result["total_seconds"] += result["write_seconds"]
+    return result
+
+
+def _process_file(input_path, output_path, encoder_params=None, write=True):
+    """Reads and processes one file, then writes it, or returns the image for the caller to write."""
+    result = {"input": input_path, "output": output_path, "status": "ok", "error": None}
+    start = time.perf_counter()
+    image = None
+    try:
+        image = read_image(input_path)
+        loaded = time.perf_counter()
+
+        image = apply_stages(image, _worker_stack, tiler=_worker_tiler)
+        processed = time.perf_counter()
+
+        result.update({
+            "read_seconds": loaded - start,
+            "process_seconds": processed - loaded,
+        })
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+        image = None
+    result["total_seconds"] = time.perf_counter() - start
+    if not write:
+        return result, image
+    if image is not None:
+        _write_file(result, image, encoder_params)
+    return result
+
+
+def output_path_for(input_path: str, input_dir: str, output_dir: str,
+                    output_format: Optional[str] = None) -> str:
+    """Maps an input file to its output path, mirroring the input directory layout."""
+    relative = os.path.relpath(input_path, input_dir)
+    if output_format:
+        relative = os.path.splitext(relative)[0] + "." + output_format.lstrip(".")
+    return os.path.join(output_dir, relative)
+
+
+def run_batch(stages: List[Dict], input_dir: str, output_dir: str, workers: int = None,
+              max_in_flight: int = None, output_format: str = None,
+              skip_existing: bool = False, cv_threads: int = 1, progress=None,
+              tile_memory: Optional[int] = None, writers: Optional[int] = None,
+              encoder_params: Optional[Dict] = None) -> List[Dict]:
+    """Processes every image under input_dir across a pool of worker processes.
+
+    At most max_in_flight files are queued or waiting to be written at once
+    (default: two per worker), so memory stays bounded by the number of
+    workers regardless of how many files are in the input directory.
+    tile_memory (bytes) runs neighborhood filters in tiles within that
+    working-memory budget per worker.
+
+    Processed images are encoded and written by writers threads (default:
+    one per worker) in this process, so a worker moves on to its next file
+    while the previous one is being compressed; writers=0 writes in the
+    workers instead. encoder_params are EncoderOptions settings, e.g.
+    {"png_compression": 6, "jpeg_quality": 90}.
+    """
+    # Fail fast on bad pipelines and encoder settings before any worker starts
+    build_stack(stages)
+    if encoder_params:
+        EncoderOptions().update_parameters(encoder_params)
+    if output_format:
+        image_format("output." + output_format.lstrip("."))
+
+    workers = workers or os.cpu_count() or 1
+    writers = workers if writers is None else writers
+    max_in_flight = max(workers, max_in_flight or workers * 2)
+
+    jobs = []
+    for input_path in find_images(input_dir):
+        output_path = output_path_for(input_path, input_dir, output_dir, output_format)
+        if skip_existing and os.path.exists(output_path):
+            continue
+        jobs.append((input_path, output_path))
+
+    results = []
+
+    def finish(result):
+        results.append(result)
+        if progress is not None:
+            progress(len(results), len(jobs), result)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(stages, cv_threads, tile_memory)) as pool, \
+            ThreadPoolExecutor(max_workers=max(1, writers)) as writer_pool:
+        processing, writing = set(), set()
+        job_iter = iter(jobs)
+        while True:
+            # Files being written hold their image here, so they count towards the limit
+            while len(processing) + len(writing) < max_in_flight:
+                job = next(job_iter, None)
+                if job is None:
+                    break
+                processing.add(pool.submit(_process_file, *job, encoder_params, writers == 0))
+            if not processing and not writing:
+                break
+            done, _ = wait(processing | writing, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in writing:
+                    writing.discard(future)
+                    finish(future.result())
+                    continue
+                processing.discard(future)
+                if writers == 0:
+                    finish(future.result())
+                    continue
+                result, image = future.result()
+                if image is None:
+                    finish(result)
+                else:
+                    writing.add(writer_pool.submit(_write_file, result, image, encoder_params))
+
+    return results
+
+
+def write_report(results: List[Dict], path: str, elapsed: float = None,
+                 pipeline_hash: str = None):
+    """Writes a JSON report with per-file timings, errors and a summary."""
+    failed = [r for r in results if r["status"] != "ok"]
+    report = {
+        "summary": {
+            "pipeline_hash": pipeline_hash,
+            "files": len(results),
+            "succeeded": len(results) - len(failed),
+            "failed": len(failed),
+            "elapsed_seconds": elapsed,
+            "process_seconds": sum(r.get("process_seconds", 0.0) for r in results),
+            "write_seconds": sum(r.get("write_seconds", 0.0) for r in results),
+        },
+        "files": results,
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(report, file, indent=4)
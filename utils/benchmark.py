@@ -0,0 +1,304 @@
+# utils/benchmark.py
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from utils.tool_manager import ToolManager
+
+# Image sizes as (height, width), keyed by their nominal megapixel count
+SIZES = {
+    "0.3MP": (480, 640),
+    "2MP": (1200, 1600),
+    "12MP": (3000, 4000),
+    "48MP": (6000, 8000),
+}
+CHANNELS = ("bgr", "gray")
+
+# Frame sizes for comparing pixelation against the per-block loop it replaced
+PIXELATION_SIZES = {
+    "4K": (2160, 3840),
+    "8K": (4320, 7680),
+}
+
+# Runs in a fresh interpreter and prints the cumulative time at each startup phase
+_STARTUP_SCRIPT = """
+import json, time
+start = time.perf_counter()
+phases = {}
+import numpy, cv2
+phases["import_numpy_cv2"] = time.perf_counter() - start
+from utils.tool_manager import ToolManager
+phases["import_tool_manager"] = time.perf_counter() - start
+tool_manager = ToolManager()
+tool_manager.get_available_tools()
+phases["list_tools"] = time.perf_counter() - start
+tool_manager.get_tool("Gaussian Blur")
+phases["first_tool"] = time.perf_counter() - start
+try:
+    import gui.main_window
+    phases["import_gui"] = time.perf_counter() - start
+except ImportError:
+    pass
+print(json.dumps(phases))
+"""
+
+
+def synthetic_image(height: int, width: int, channels: str = "bgr", seed: int = 0) -> np.ndarray:
+    """Returns a reproducible test image with gradients, edges and noise."""
+    rng = np.random.default_rng(seed)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, np.newaxis]
+    x = np.linspace(0, 255, width, dtype=np.float32)[np.newaxis, :]
+    checker = ((np.arange(height)[:, np.newaxis] // 64 + np.arange(width)[np.newaxis, :] // 64) % 2) * 60
+    planes = [x + 0 * y, y + 0 * x, (x + y) / 2 + checker]
+    image = np.stack(planes, axis=2) + rng.normal(0, 8, (height, width, 3)).astype(np.float32)
+    image = np.clip(image, 0, 255).astype(np.uint8)
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY) if channels == "gray" else image
+
+
+def _current_rss() -> Optional[Tuple[int, int]]:
+    """Returns (current, peak) resident set size in bytes from /proc, or None."""
+    try:
+        with open("/proc/self/status") as status:
+            fields = dict(line.split(":", 1) for line in status)
+        return int(fields["VmRSS"].split()[0]) * 1024, int(fields["VmHWM"].split()[0]) * 1024
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _reset_peak_rss() -> bool:
+    """Resets the kernel's peak RSS counter for this process (Linux 4.0+)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as clear_refs:
+            clear_refs.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def measure(tool, image: np.ndarray, repeat: int = 3) -> Dict:
+    """Times tool.apply on image and records its memory use.
+
+    Peak RSS is the growth of the process high-water mark during one call
+    (None where the counter cannot be reset); allocation figures come from
+    tracemalloc, which sees NumPy buffers but not OpenCV's internal ones.
+    """
+    tool.apply(image)  # warm-up: lazy initialization, page faults, OpenCV kernels
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tool.apply(image)
+        times.append(time.perf_counter() - start)
+
+    peak_rss = None
+    if _reset_peak_rss():
+        before = _current_rss()
+        tool.apply(image)
+        after = _current_rss()
+        if before and after:
+            peak_rss = max(0, after[1] - before[0])
+
+    tracemalloc.start()
+    try:
+        tool.apply(image)
+        _, alloc_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds_min": min(times),
+        "seconds_median": statistics.median(times),
+        "peak_rss_bytes": peak_rss,
+        "alloc_peak_bytes": alloc_peak,
+    }
+
+
+def pixelate_loop(image: np.ndarray, pixel_size: int) -> np.ndarray:
+    """The per-block np.mean loop PixelationTool used before area resampling."""
+    h, w = image.shape[:2]
+    pixelated = np.zeros_like(image)
+    for i in range(0, h, pixel_size):
+        for j in range(0, w, pixel_size):
+            block = image[i:i + pixel_size, j:j + pixel_size]
+            pixelated[i:i + pixel_size, j:j + pixel_size] = np.mean(block, axis=(0, 1)).astype(np.uint8)
+    return pixelated
+
+
+def compare_pixelation(sizes: Optional[List[str]] = None, pixel_size: int = 10,
+                       repeat: int = 3) -> List[Dict]:
+    """Times the Pixelation tool's square and hexagonal modes against pixelate_loop.
+
+    max_difference is the largest deviation of square mode from the loop,
+    which truncates block means where the tool rounds them.
+    """
+    tool_manager = ToolManager()
+    square = tool_manager.get_tool("Pixelation")
+    square.update_parameters({"pixel_size": pixel_size, "mode": "square"})
+    hexagonal = tool_manager.get_tool("Pixelation")
+    hexagonal.update_parameters({"pixel_size": pixel_size, "mode": "hexagonal"})
+
+    def best_time(function, image):
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = function(image)
+            times.append(time.perf_counter() - start)
+        return min(times), result
+
+    results = []
+    for size in sizes or list(PIXELATION_SIZES):
+        if size not in PIXELATION_SIZES:
+            raise ValueError(f"Unknown size {size}, expected one of {list(PIXELATION_SIZES)}")
+        height, width = PIXELATION_SIZES[size]
+        image = synthetic_image(height, width)
+        loop_seconds, expected = best_time(lambda frame: pixelate_loop(frame, pixel_size), image)
+        square_seconds, result = best_time(square.apply, image)
+        hexagonal_seconds, _ = best_time(hexagonal.apply, image)
+        results.append({
+            "size": size,
+            "megapixels": round(height * width / 1e6, 2),
+            "pixel_size": pixel_size,
+            "loop_seconds": loop_seconds,
+            "square_seconds": square_seconds,
+            "hexagonal_seconds": hexagonal_seconds,
+            "speedup": loop_seconds / square_seconds,
+            "max_difference": int(np.abs(result.astype(np.int16) - expected).max()),
+        })
+        del image, expected, result
+    return results
+
+
+def measure_startup(repeat: int = 3) -> Dict:
+    """Times cold startup phases in fresh interpreters, taking the median of repeat runs.
+
+    Phases are cumulative seconds since the first import; "interpreter" is
+    the wall time of the whole child process, including Python's own startup.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, "-c", _STARTUP_SCRIPT], cwd=root, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        phases = json.loads(output.strip().splitlines()[-1])
+        phases["interpreter"] = time.perf_counter() - start
+        runs.append(phases)
+    return {phase: statistics.median(run[phase] for run in runs) for phase in runs[0]}
+
+
+def run_benchmarks(tools: Optional[List[str]] = None, sizes: Optional[List[str]] = None,
+                   channels: Optional[List[str]] = None, repeat: int = 3,
+                   progress=None) -> Dict:
+    """Benchmarks every registered tool (or the named ones) with default parameters."""
+    tool_manager = ToolManager()
+    tools = tools or list(tool_manager.tools)
+    sizes = sizes or list(SIZES)
+    channels = channels or list(CHANNELS)
+    for name in tools:
+        if name not in tool_manager.tools:
+            raise ValueError(f"Unknown tool: {name}")
+    for size in sizes:
+        if size not in SIZES:
+            raise ValueError(f"Unknown size {size}, expected one of {list(SIZES)}")
+
+    results = []
+    for size in sizes:
+        height, width = SIZES[size]
+        for layout in channels:
+            image = synthetic_image(height, width, layout)
+            for name in tools:
+                result = {"tool": name, "size": size, "channels": layout,
+                          "megapixels": round(height * width / 1e6, 2), "status": "ok", "error": None}
+                try:
+                    tool = tool_manager.get_tool(name)
+                    if layout == "gray" and tool.input_channels == "bgr":
+                        result["status"] = "skipped"
+                    else:
+                        result.update(measure(tool, image, repeat))
+                except Exception as e:
+                    result["status"] = "error"
+                    result["error"] = str(e)
+                results.append(result)
+                if progress is not None:
+                    progress(result)
+            del image
+
+    return {"environment": environment(), "repeat": repeat, "results": results}
+
+
+def environment() -> Dict:
+    """Describes the machine and library versions the numbers were taken on."""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "opencv": cv2.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "opencv_threads": cv2.getNumThreads(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def _case_key(result: Dict):
+    return result["tool"], result["size"], result["channels"]
+
+
+def compare(report: Dict, baseline: Dict, max_regression: float = 0.2,
+            min_seconds: float = 0.005) -> List[Dict]:
+    """Returns the cases that got slower than baseline by more than max_regression.
+
+    max_regression is a fraction (0.2 = 20%). Cases faster than min_seconds in
+    both runs are ignored as timer noise, and cases that fail now but passed
+    in the baseline are always reported. Startup phases recorded in both
+    reports are compared the same way, as "startup:<phase>" cases.
+    """
+    previous = {_case_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    old_startup, startup = baseline.get("startup") or {}, report.get("startup") or {}
+    for phase, after in startup.items():
+        before = old_startup.get(phase)
+        if before is None or max(before, after) < min_seconds:
+            continue
+        if after > before * (1 + max_regression):
+            regressions.append({"tool": f"startup:{phase}", "size": "-", "channels": "-",
+                                "baseline_seconds": before, "seconds": after, "change": after / before - 1})
+    for result in report["results"]:
+        old = previous.get(_case_key(result))
+        if old is None or old["status"] != "ok":
+            continue
+        if result["status"] != "ok":
+            regressions.append({"tool": result["tool"], "size": result["size"],
+                                "channels": result["channels"], "reason": result["error"] or result["status"]})
+            continue
+        before, after = old["seconds_median"], result["seconds_median"]
+        if max(before, after) < min_seconds:
+            continue
+        if after > before * (1 + max_regression):
+            regressions.append({"tool": result["tool"], "size": result["size"],
+                                "channels": result["channels"], "baseline_seconds": before,
+                                "seconds": after, "change": after / before - 1})
+    return regressions
+
+
+def load_report(path: str) -> Dict:
+    """Loads a benchmark report or baseline."""
+    with open(path, "r") as file:
+        return json.load(file)
+
+
+def save_report(report: Dict, path: str):
+    """Writes a benchmark report as JSON."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(report, file, indent=4)
@@ -0,0 +1,66 @@
+# utils/bit_depth.py
+from typing import Sequence
+
+import cv2
+import numpy as np
+
+# Value of full intensity at each supported depth; float images are normalized to 0-1
+FULL_SCALE = {"uint8": 255, "uint16": 65535, "float32": 1.0}
+
+# Depths to use when a tool or format doesn't accept an image's own, most precise first
+_FALLBACKS = {
+    "uint8": ("uint8", "float32", "uint16"),
+    "uint16": ("uint16", "float32", "uint8"),
+    "float32": ("float32", "uint16", "uint8"),
+}
+
+
+def convert_depth(image: np.ndarray, dtype) -> np.ndarray:
+    """Converts image to dtype, rescaling so full intensity stays full intensity.
+
+    Conversions to integer depths round and clip; float images keep values
+    outside 0-1 until they are converted back.
+    """
+    source, target = image.dtype.name, np.dtype(dtype).name
+    if source == target:
+        return image
+    if source not in FULL_SCALE or target not in FULL_SCALE:
+        raise ValueError(f"Cannot convert {source} images to {target}")
+    if target == "float32":
+        converted = image.astype(np.float32)
+        converted *= 1.0 / FULL_SCALE[source]
+        return converted
+    scale = FULL_SCALE[target] / FULL_SCALE[source]
+    if target == "uint8":
+        if source == "float32":
+            image = np.clip(image, 0, 1)
+        # Saturating, rounding conversion; the inputs are never negative
+        return cv2.convertScaleAbs(image, alpha=scale)
+    if source == "uint8":
+        return image.astype(np.uint16) * np.uint16(257)
+    converted = np.clip(image * scale + 0.5, 0, FULL_SCALE[target])
+    return converted.astype(np.uint16)
+
+
+def working_dtype(dtype, supported: Sequence[str]) -> str:
+    """Returns the depth in supported that loses the least from dtype."""
+    for candidate in _FALLBACKS.get(np.dtype(dtype).name, ("uint8",)):
+        if candidate in supported:
+            return candidate
+    return supported[0]
+
+
+def convert_for(image: np.ndarray, supported: Sequence[str]) -> np.ndarray:
+    """Returns image unchanged if its depth is in supported, else converted to the closest one.
+
+    Chains of tools that accept float32 therefore keep a float working
+    buffer instead of converting back and forth at every stage.
+    """
+    if image.dtype.name in supported:
+        return image
+    return convert_depth(image, working_dtype(image.dtype, supported))
+
+
+def to_display(image: np.ndarray) -> np.ndarray:
+    """Returns image as uint8 for display."""
+    return convert_depth(image, np.uint8)
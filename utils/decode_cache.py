@@ -0,0 +1,195 @@
+# utils/decode_cache.py
+import json
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from utils.proxy import PREVIEW_MIN_PIXELS, PROXY_LEVELS, make_proxy
+
+CACHE_DIR_ENV = "IMAGEU_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".imageu", "decode_cache")
+
+# Default disk budget for cached proxies and thumbnails (2 GiB)
+DEFAULT_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+# Longest side of cached thumbnails in pixels
+THUMBNAIL_SIZE = 256
+
+# Bumped whenever the entry layout changes, so old entries are never read
+CACHE_VERSION = 1
+
+_ENTRY_FILE = "entry.json"
+_THUMBNAIL_FILE = "thumbnail.npy"
+
+
+def _level_file(scale: float) -> str:
+    return f"level_{scale}.npy"
+
+
+class DecodeCache:
+    """On-disk LRU cache of the proxy pyramid and thumbnail of decoded images.
+
+    Entries are keyed by image_io.file_key, so editing or replacing a file
+    misses the cache, and are stored as .npy files that load memory-mapped
+    without decoding. Reading an entry marks it most recently used; storing
+    one evicts least recently used entries until the cache fits max_bytes.
+    Safe to use from several threads and processes at once.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory or os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR
+        self._lock = threading.Lock()
+        self._max_bytes = self._validate_max_bytes(max_bytes)
+        # Entries are written off the caller's thread, one at a time
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="decode-cache")
+
+    def _validate_max_bytes(self, value):
+        try:
+            value = int(value)
+            if value < 0:
+                raise ValueError("Cache budget must be non-negative")
+            return value
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cache budget: {str(e)}")
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value):
+        self._max_bytes = self._validate_max_bytes(value)
+        with self._lock:
+            self._evict()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.directory, f"v{CACHE_VERSION}", key)
+
+    def __contains__(self, key) -> bool:
+        return os.path.isfile(os.path.join(self._entry_path(key), _ENTRY_FILE))
+
+    def load(self, key: str) -> Optional[Tuple[Tuple[int, int], Dict[float, np.ndarray]]]:
+        """Returns the full (height, width) and the cached proxies by scale, or None.
+
+        Proxies are read-only memory maps, so loading costs no decoding and
+        pixels are read from disk only when used.
+        """
+        path = self._entry_path(key)
+        try:
+            with open(os.path.join(path, _ENTRY_FILE), "r") as file:
+                entry = json.load(file)
+            levels = {scale: np.load(os.path.join(path, _level_file(scale)), mmap_mode="r")
+                      for scale in entry["levels"]}
+            os.utime(os.path.join(path, _ENTRY_FILE))
+        except (OSError, ValueError, KeyError):
+            # Missing, partly evicted or unreadable entries are just misses
+            return None
+        return tuple(entry["shape"]), levels
+
+    def thumbnail(self, key: str) -> Optional[np.ndarray]:
+        """Returns the cached thumbnail for key, at most THUMBNAIL_SIZE on its longest side, or None."""
+        path = self._entry_path(key)
+        try:
+            thumbnail = np.load(os.path.join(path, _THUMBNAIL_FILE))
+            os.utime(os.path.join(path, _ENTRY_FILE))
+        except (OSError, ValueError):
+            return None
+        return thumbnail
+
+    def store(self, key: str, image: np.ndarray) -> bool:
+        """Caches the proxies and thumbnail of image under key; returns False if it is not cached.
+
+        Images too small to be previewed through proxies are not cached.
+        """
+        height, width = image.shape[:2]
+        if height * width < PREVIEW_MIN_PIXELS or key in self:
+            return False
+        temp_path = os.path.join(self.directory, f".{key}.{uuid.uuid4().hex[:8]}.tmp")
+        os.makedirs(temp_path)
+        try:
+            levels = {scale: make_proxy(image, scale) for scale in PROXY_LEVELS if scale < 1.0}
+            for scale, level in levels.items():
+                np.save(os.path.join(temp_path, _level_file(scale)), level)
+            smallest = levels[min(levels)]
+            np.save(os.path.join(temp_path, _THUMBNAIL_FILE),
+                    make_proxy(smallest, THUMBNAIL_SIZE / max(smallest.shape[:2])))
+            with open(os.path.join(temp_path, _ENTRY_FILE), "w") as file:
+                json.dump({"shape": [height, width], "dtype": image.dtype.name,
+                           "levels": sorted(levels)}, file)
+
+            with self._lock:
+                size = _directory_bytes(temp_path)
+                if size > self._max_bytes:
+                    return False
+                path = self._entry_path(key)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                try:
+                    os.rename(temp_path, path)
+                except OSError:
+                    # Another process cached the same file first
+                    return False
+                self._evict(keep=key)
+            return True
+        finally:
+            shutil.rmtree(temp_path, ignore_errors=True)
+
+    def store_async(self, key: str, image: np.ndarray):
+        """Queues store(key, image) on the cache's writer thread and returns its Future.
+
+        image must not be modified until the Future is done.
+        """
+        return self._writer.submit(self.store, key, image)
+
+    def current_bytes(self) -> int:
+        """Returns the disk space used by cached entries."""
+        entries = self._entries()
+        return sum(size for _, _, size in entries)
+
+    def clear(self):
+        """Deletes every cached entry."""
+        with self._lock:
+            for path, _, _ in self._entries():
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _entries(self):
+        """Lists (path, last use, bytes) of every entry, least recently used first."""
+        root = os.path.dirname(self._entry_path("_"))
+        if not os.path.isdir(root):
+            return []
+        entries = []
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            try:
+                last_use = os.stat(os.path.join(path, _ENTRY_FILE)).st_mtime_ns
+            except OSError:
+                # Left behind by an interrupted eviction; goes first
+                last_use = 0
+            entries.append((path, last_use, _directory_bytes(path)))
+        return sorted(entries, key=lambda entry: entry[1])
+
+    def _evict(self, keep: Optional[str] = None):
+        entries = self._entries()
+        total = sum(size for _, _, size in entries)
+        for path, _, size in entries:
+            if total <= self._max_bytes:
+                break
+            if os.path.basename(path) == keep:
+                continue
+            # Open memory maps of an evicted entry stay readable on POSIX systems
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+
+def _directory_bytes(path: str) -> int:
+    total = 0
+    try:
+        for entry in os.scandir(path):
+            total += entry.stat().st_size
+    except OSError:
+        pass
+    return total
@@ -0,0 +1,336 @@
+# utils/image_io.py
+import hashlib
+import math
+import os
+import struct
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from utils.bit_depth import FULL_SCALE, convert_for
+
+# Reduced decodes aim for at most this many pixels
+PREVIEW_MAX_PIXELS = 4_000_000
+
+# libjpeg can scale the DCT by these factors while decoding, at a fraction of the full cost
+_REDUCED_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# Formats write_image can encode, by file extension
+FORMATS = {
+    ".png": "png", ".jpg": "jpeg", ".jpeg": "jpeg", ".tif": "tiff", ".tiff": "tiff",
+    ".webp": "webp", ".bmp": "bmp",
+}
+
+# zlib strategies for PNG, by name; run-length encoding is fastest at a similar size
+PNG_STRATEGY = {
+    "rle": cv2.IMWRITE_PNG_STRATEGY_RLE,
+    "default": cv2.IMWRITE_PNG_STRATEGY_DEFAULT,
+    "filtered": cv2.IMWRITE_PNG_STRATEGY_FILTERED,
+    "huffman_only": cv2.IMWRITE_PNG_STRATEGY_HUFFMAN_ONLY,
+    "fixed": cv2.IMWRITE_PNG_STRATEGY_FIXED,
+}
+
+# Sample depths each format can store; other images are converted to the closest one
+FORMAT_DTYPES = {
+    "png": ("uint8", "uint16"),
+    "jpeg": ("uint8",),
+    "tiff": ("uint8", "uint16", "float32"),
+    "webp": ("uint8",),
+    "bmp": ("uint8",),
+}
+
+# libtiff compression schemes, by name
+TIFF_COMPRESSION = {"none": 1, "lzw": 5, "deflate": 8, "packbits": 32773}
+
+# Share of write_image progress reported once encoding is done; the rest tracks the write.
+# Encoding is a single cv2.imencode call, so there is no progress within it
+_ENCODE_PROGRESS = 0.8
+_WRITE_CHUNK_BYTES = 4 * 1024 * 1024
+
+# Start-of-frame markers carry the image size; C4, C8 and CC are other segments
+_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def file_key(path: str) -> str:
+    """Returns a key identifying a file's current contents by path, size and modification time."""
+    stat = os.stat(path)
+    identity = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.blake2b(identity.encode(), digest_size=16).hexdigest()
+
+
+def read_jpeg_size(path: str) -> Optional[Tuple[int, int]]:
+    """Returns (height, width) from a JPEG header, or None if path is not a JPEG.
+
+    This is the stored size, before any EXIF rotation.
+    """
+    with open(path, "rb") as file:
+        if file.read(2) != b"\xff\xd8":
+            return None
+        while True:
+            byte = file.read(1)
+            while byte and byte != b"\xff":
+                byte = file.read(1)
+            while byte == b"\xff":
+                byte = file.read(1)
+            if not byte:
+                return None
+            marker = byte[0]
+            if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+                continue  # markers without a length field
+            if marker in (0xD9, 0xDA):
+                return None  # end of image or scan data before any frame header
+            length_bytes = file.read(2)
+            if len(length_bytes) < 2:
+                return None
+            (length,) = struct.unpack(">H", length_bytes)
+            if marker in _SOF_MARKERS:
+                header = file.read(5)
+                if len(header) < 5:
+                    return None
+                _, height, width = struct.unpack(">BHH", header)
+                return height, width
+            file.seek(length - 2, os.SEEK_CUR)
+
+
+def read_image(path: str) -> np.ndarray:
+    """Decodes an image file at full resolution as BGR, keeping 16-bit and float samples.
+
+    Float images are expected to be normalized to 0-1.
+    """
+    # IMREAD_UNCHANGED would also keep depth, but skips EXIF rotation and keeps alpha
+    image = cv2.imread(path, cv2.IMREAD_ANYDEPTH | cv2.IMREAD_COLOR)
+    if image is None:
+        raise ValueError(f"Failed to load image: {path}")
+    if image.dtype == np.float64:
+        image = image.astype(np.float32)
+    if image.dtype.name not in FULL_SCALE:
+        raise ValueError(f"Unsupported sample format {image.dtype} in {path}")
+    return image
+
+
+def read_reduced(path: str, max_pixels: int = PREVIEW_MAX_PIXELS
+                 ) -> Optional[Tuple[np.ndarray, int, Tuple[int, int]]]:
+    """Decodes a JPEG at 1/2, 1/4 or 1/8 scale, the largest within max_pixels.
+
+    Returns (image, factor, full (height, width)), or None when the file is
+    not a JPEG or is already small enough to decode in full. The full size
+    accounts for EXIF rotation, which OpenCV applies to both decodes.
+    """
+    size = read_jpeg_size(path)
+    if size is None or size[0] * size[1] <= max_pixels:
+        return None
+    height, width = size
+    factor = next((f for f in sorted(_REDUCED_FLAGS) if (height / f) * (width / f) <= max_pixels),
+                  max(_REDUCED_FLAGS))
+    image = cv2.imread(path, _REDUCED_FLAGS[factor])
+    if image is None:
+        return None
+    if image.shape[:2] == (math.ceil(height / factor), math.ceil(width / factor)):
+        return image, factor, (height, width)
+    return image, factor, (width, height)
+
+
+def temporary_path(path: str) -> str:
+    """Returns a unique hidden path next to path to write to before renaming over it."""
+    directory = os.path.dirname(os.path.abspath(path))
+    return os.path.join(directory, f".{os.path.basename(path)}.{uuid.uuid4().hex[:8]}.tmp")
+
+
+def image_format(path: str) -> str:
+    """Returns the format name write_image uses for path, from its extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unsupported image format: {extension or path}")
+    return FORMATS[extension]
+
+
+class EncoderOptions:
+    """Encoder settings for write_image.
+
+    Exposes the settings of one format through the same get_parameters /
+    update_parameters interface as the tools, so ConfigDialog can edit them.
+    Settings of other formats are kept but not listed.
+    """
+
+    # Parameters listed for each format
+    FORMAT_PARAMETERS = {
+        "png": ["png_compression", "png_strategy"],
+        "jpeg": ["jpeg_quality", "jpeg_progressive", "jpeg_optimize"],
+        "tiff": ["tiff_compression"],
+        "webp": ["webp_quality", "webp_lossless"],
+        "bmp": [],
+    }
+
+    def __init__(self, format: str = "png"):
+        self._format = self._validate_format(format)
+        self._png_compression = 1  # zlib level 0-9; higher is smaller but much slower
+        self._png_strategy = "rle"
+        self._jpeg_quality = 95
+        self._jpeg_progressive = False
+        self._jpeg_optimize = False  # optimized Huffman tables: slightly smaller, slower
+        self._tiff_compression = "lzw"
+        self._webp_quality = 90
+        self._webp_lossless = False
+
+    def _validate_format(self, format):
+        format = FORMATS.get(f".{format.lower().lstrip('.')}", format.lower())
+        if format not in self.FORMAT_PARAMETERS:
+            raise ValueError(f"Format must be one of {list(self.FORMAT_PARAMETERS)}")
+        return format
+
+    def _validate_int(self, name, value, low, high):
+        try:
+            value = int(value)
+            if value < low or value > high:
+                raise ValueError(f"{name} must be between {low} and {high}")
+            return value
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid {name}: {str(e)}")
+
+    def _validate_bool(self, name, value):
+        if isinstance(value, str) and value.lower() in ("true", "false"):
+            return value.lower() == "true"
+        if isinstance(value, (bool, int)) and value in (0, 1):
+            return bool(value)
+        raise ValueError(f"Invalid {name}: expected True or False")
+
+    def _validate_png_strategy(self, value):
+        if value not in PNG_STRATEGY:
+            raise ValueError(f"PNG strategy must be one of {list(PNG_STRATEGY)}")
+        return value
+
+    def _validate_tiff_compression(self, value):
+        if value not in TIFF_COMPRESSION:
+            raise ValueError(f"TIFF compression must be one of {list(TIFF_COMPRESSION)}")
+        return value
+
+    @property
+    def format(self):
+        return self._format
+
+    @format.setter
+    def format(self, value):
+        self._format = self._validate_format(value)
+
+    def get_parameters(self) -> Dict:
+        """Get the settings of the current format."""
+        values = {
+            "png_compression": self._png_compression,
+            "png_strategy": self._png_strategy,
+            "jpeg_quality": self._jpeg_quality,
+            "jpeg_progressive": self._jpeg_progressive,
+            "jpeg_optimize": self._jpeg_optimize,
+            "tiff_compression": self._tiff_compression,
+            "webp_quality": self._webp_quality,
+            "webp_lossless": self._webp_lossless,
+        }
+        return {name: values[name] for name in self.FORMAT_PARAMETERS[self._format]}
+
+    def update_parameters(self, params: Dict):
+        """Update settings; settings of any format are accepted."""
+        if not isinstance(params, dict):
+            raise ValueError("Parameters must be provided as a dictionary")
+
+        if "png_compression" in params:
+            self._png_compression = self._validate_int("PNG compression", params["png_compression"], 0, 9)
+        if "png_strategy" in params:
+            self._png_strategy = self._validate_png_strategy(params["png_strategy"])
+        if "jpeg_quality" in params:
+            self._jpeg_quality = self._validate_int("JPEG quality", params["jpeg_quality"], 1, 100)
+        if "jpeg_progressive" in params:
+            self._jpeg_progressive = self._validate_bool("JPEG progressive", params["jpeg_progressive"])
+        if "jpeg_optimize" in params:
+            self._jpeg_optimize = self._validate_bool("JPEG optimize", params["jpeg_optimize"])
+        if "tiff_compression" in params:
+            self._tiff_compression = self._validate_tiff_compression(params["tiff_compression"])
+        if "webp_quality" in params:
+            self._webp_quality = self._validate_int("WebP quality", params["webp_quality"], 1, 100)
+        if "webp_lossless" in params:
+            self._webp_lossless = self._validate_bool("WebP lossless", params["webp_lossless"])
+
+    def get_valid_options(self) -> Dict:
+        """Return valid options for parameters that require a drop-down menu."""
+        return {
+            "png_strategy": list(PNG_STRATEGY),
+            "jpeg_progressive": ["False", "True"],
+            "jpeg_optimize": ["False", "True"],
+            "tiff_compression": list(TIFF_COMPRESSION),
+            "webp_lossless": ["False", "True"],
+        }
+
+    def imwrite_params(self) -> List[int]:
+        """Returns the cv2.imwrite/imencode flags for the current format."""
+        if self._format == "png":
+            params = [cv2.IMWRITE_PNG_COMPRESSION, self._png_compression,
+                      cv2.IMWRITE_PNG_STRATEGY, PNG_STRATEGY[self._png_strategy]]
+            if hasattr(cv2, "IMWRITE_PNG_FILTER"):
+                # The Sub row filter, as OpenCV uses when no options are given (OpenCV >= 4.11)
+                params += [cv2.IMWRITE_PNG_FILTER, cv2.IMWRITE_PNG_FILTER_SUB]
+            return params
+        if self._format == "jpeg":
+            return [cv2.IMWRITE_JPEG_QUALITY, self._jpeg_quality,
+                    cv2.IMWRITE_JPEG_PROGRESSIVE, int(self._jpeg_progressive),
+                    cv2.IMWRITE_JPEG_OPTIMIZE, int(self._jpeg_optimize)]
+        if self._format == "tiff":
+            return [cv2.IMWRITE_TIFF_COMPRESSION, TIFF_COMPRESSION[self._tiff_compression]]
+        if self._format == "webp":
+            # OpenCV encodes WebP losslessly for qualities above 100
+            return [cv2.IMWRITE_WEBP_QUALITY, 101 if self._webp_lossless else self._webp_quality]
+        return []
+
+
+def write_image(path: str, image: np.ndarray, options: Optional[EncoderOptions] = None,
+                progress: Optional[Callable[[float], None]] = None):
+    """Encodes image and writes it to path atomically.
+
+    Images deeper than the format can store are converted to the closest
+    depth it supports (FORMAT_DTYPES), e.g. float to 16-bit for PNG.
+
+    The file is written under a temporary name in the same directory and
+    renamed over path only once complete, so readers never see a partial
+    file and a failed save leaves any existing file untouched.
+
+    progress, if given, is called with the completed fraction from 0 to 1.
+    It is coarse while encoding: OpenCV encodes in a single call, so it
+    jumps from 0 to _ENCODE_PROGRESS once the image is encoded, then
+    advances with each chunk written.
+    """
+    image_format(path)
+    if options is None:
+        options = EncoderOptions(os.path.splitext(path)[1])
+    if progress is not None:
+        progress(0.0)
+    image = convert_for(image, FORMAT_DTYPES[options.format])
+    ok, encoded = cv2.imencode(os.path.splitext(path)[1], image, options.imwrite_params())
+    if not ok:
+        raise ValueError(f"Failed to encode image as {options.format}")
+    if progress is not None:
+        progress(_ENCODE_PROGRESS)
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = temporary_path(path)
+    data = memoryview(encoded).cast("B")
+    try:
+        # os.open honors the umask, unlike tempfile's private 0600 files
+        descriptor = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+        with os.fdopen(descriptor, "wb") as file:
+            for offset in range(0, len(data), _WRITE_CHUNK_BYTES):
+                file.write(data[offset:offset + _WRITE_CHUNK_BYTES])
+                if progress is not None:
+                    written = min(len(data), offset + _WRITE_CHUNK_BYTES) / len(data)
+                    progress(_ENCODE_PROGRESS + (1 - _ENCODE_PROGRESS) * written)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    if progress is not None:
+        progress(1.0)
@@ -0,0 +1,348 @@
+# utils/image_source.py
+import mmap
+import os
+import struct
+from typing import Callable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from utils.image_io import temporary_path
+
+# Uncompressed files at least this large are mapped instead of decoded into memory
+MAP_MIN_BYTES = 512 * 1024 * 1024
+
+# Formats that can be mapped for reading and created for tile-by-tile writing
+MAPPED_EXTENSIONS = {".tif", ".tiff", ".npy"}
+
+# Rows are resized in bands of about this many bytes so mapped images are never read whole
+BAND_BYTES = 64 * 1024 * 1024
+
+# Where streamed full-resolution renders of mapped images are kept; unset uses the temp directory
+SCRATCH_DIR_ENV = "IMAGEU_SCRATCH_DIR"
+
+# TIFF field types: (struct format, size)
+_TIFF_TYPES = {1: ("B", 1), 3: ("H", 2), 4: ("I", 4), 16: ("Q", 8)}
+# Sample depths that can be mapped, by (SampleFormat, BitsPerSample)
+_TIFF_DTYPES = {(1, 8): np.dtype(np.uint8), (1, 16): np.dtype(np.uint16), (3, 32): np.dtype(np.float32)}
+
+# Tags written by create_mapped, in ascending order as TIFF requires
+_WIDTH, _LENGTH, _BITS, _COMPRESSION, _PHOTOMETRIC = 256, 257, 258, 259, 262
+_STRIP_OFFSETS, _SAMPLES, _ROWS_PER_STRIP, _STRIP_BYTES, _PLANAR = 273, 277, 278, 279, 284
+_SAMPLE_FORMAT = 339
+
+
+def mapped_buffer(image: np.ndarray) -> Optional[mmap.mmap]:
+    """Returns the memory map an array (or a view of one) is backed by, or None."""
+    base = image
+    while base is not None:
+        if isinstance(base, mmap.mmap):
+            return base
+        base = getattr(base, "base", None)
+    return None
+
+
+def is_mapped(image: np.ndarray) -> bool:
+    """Returns True if image is backed by a memory-mapped file."""
+    return image is not None and mapped_buffer(image) is not None
+
+
+def release_pages(image: np.ndarray):
+    """Flushes a mapped image and drops its pages from this process.
+
+    The data stays in the file (and the OS page cache); pages are read back
+    on next access. Does nothing for in-memory arrays or without madvise.
+    """
+    buffer = mapped_buffer(image)
+    if buffer is None or not hasattr(mmap, "MADV_DONTNEED"):
+        return
+    if getattr(image, "flags", None) is not None and image.flags.writeable:
+        buffer.flush()
+    buffer.madvise(mmap.MADV_DONTNEED)
+
+
+def _map(path: str, shape: Tuple[int, ...], dtype, offset: int, writable: bool) -> np.ndarray:
+    with open(path, "r+b" if writable else "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+    return np.ndarray(shape, dtype=dtype, buffer=buffer, offset=offset)
+
+
+def _bgr_view(image: np.ndarray) -> np.ndarray:
+    """Presents RGB samples in OpenCV's BGR order without copying them."""
+    return image[:, :, ::-1] if image.ndim == 3 and image.shape[2] == 3 else image
+
+
+def read_tiff_layout(path: str) -> Optional[Tuple[int, Tuple[int, ...], np.dtype]]:
+    """Returns (data offset, shape, dtype) of a TIFF whose pixels can be mapped directly.
+
+    That is the first image of a classic or BigTIFF file that is
+    uncompressed, interleaved, 8- or 16-bit unsigned or 32-bit float,
+    in this machine's byte order, grayscale or RGB, and
+    stored in strips that follow each other in the file. Returns None for
+    anything else.
+    """
+    with open(path, "rb") as file:
+        header = file.read(16)
+        if header[:2] not in (b"II", b"MM"):
+            return None
+        order = "<" if header[:2] == b"II" else ">"
+        (version,) = struct.unpack(order + "H", header[2:4])
+        # Classic TIFF uses 2-byte entry counts and 4-byte value counts and offsets; BigTIFF 8 bytes
+        if version == 42:
+            (ifd,) = struct.unpack(order + "I", header[4:8])
+            entries_format, value_format = "H", "I"
+        elif version == 43:
+            (ifd,) = struct.unpack(order + "Q", header[8:16])
+            entries_format, value_format = "Q", "Q"
+        else:
+            return None
+        inline = struct.calcsize(value_format)
+        entry_size = 4 + 2 * inline
+
+        file.seek(ifd)
+        (entries,) = struct.unpack(order + entries_format, file.read(struct.calcsize(entries_format)))
+        table = file.read(entries * entry_size)
+        tags = {}
+        for index in range(entries):
+            entry = table[index * entry_size:(index + 1) * entry_size]
+            tag, field_type, count = struct.unpack(order + "HH" + value_format, entry[:4 + inline])
+            if field_type not in _TIFF_TYPES:
+                continue
+            data = entry[4 + inline:]
+            type_format, value_size = _TIFF_TYPES[field_type]
+            if count * value_size > inline:
+                # Values that don't fit in the entry are stored elsewhere
+                (offset,) = struct.unpack(order + value_format, data)
+                file.seek(offset)
+                data = file.read(count * value_size)
+            tags[tag] = np.frombuffer(data[:count * value_size], dtype=np.dtype(order + type_format))
+
+    try:
+        width, height = int(tags[_WIDTH][0]), int(tags[_LENGTH][0])
+        offsets, byte_counts = tags[_STRIP_OFFSETS].astype(np.int64), tags[_STRIP_BYTES].astype(np.int64)
+    except (KeyError, IndexError):
+        return None
+    samples = int(tags.get(_SAMPLES, [1])[0])
+    depths = set(zip((int(f) for f in tags.get(_SAMPLE_FORMAT, [1] * samples)),
+                     (int(b) for b in tags.get(_BITS, [1] * samples))))
+    if (int(tags.get(_COMPRESSION, [1])[0]) != 1 or int(tags.get(_PLANAR, [1])[0]) != 1
+            or len(depths) != 1 or samples not in (1, 3)
+            or int(tags.get(_PHOTOMETRIC, [-1])[0]) != (2 if samples == 3 else 1)):
+        return None
+    dtype = _TIFF_DTYPES.get(depths.pop())
+    # OpenCV only handles native byte order
+    if dtype is None or not dtype.newbyteorder(order).isnative:
+        return None
+    shape = (height, width, samples) if samples > 1 else (height, width)
+    # The strips must tile the pixel data without gaps
+    if (len(offsets) != len(byte_counts) or byte_counts.sum() != np.prod(shape) * dtype.itemsize
+            or np.any(offsets[1:] != offsets[:-1] + byte_counts[:-1])):
+        return None
+    return int(offsets[0]), shape, dtype
+
+
+def map_raw(path: str, shape: Tuple[int, ...], dtype=np.uint8, offset: int = 0,
+            rgb: bool = False) -> np.ndarray:
+    """Maps headerless pixel data read-only; rgb presents RGB samples as BGR."""
+    image = _map(path, tuple(shape), np.dtype(dtype), offset, writable=False)
+    return _bgr_view(image) if rgb else image
+
+
+def open_mapped(path: str, min_bytes: int = MAP_MIN_BYTES) -> Optional[np.ndarray]:
+    """Maps an uncompressed TIFF or NPY image read-only, if it is at least min_bytes.
+
+    Returns None for other files, which should be decoded normally. RGB
+    TIFFs are presented in BGR order as a view, so pixels are only read
+    from disk when they are accessed.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in MAPPED_EXTENSIONS or os.path.getsize(path) < min_bytes:
+        return None
+    if extension == ".npy":
+        image = np.load(path, mmap_mode="r")
+        if image.ndim not in (2, 3) or image.dtype not in _TIFF_DTYPES.values() or not image.dtype.isnative:
+            return None
+        return image
+    layout = read_tiff_layout(path)
+    if layout is None:
+        return None
+    offset, shape, dtype = layout
+    return _bgr_view(_map(path, shape, dtype, offset, writable=False))
+
+
+def _tiff_header(shape: Tuple[int, ...], dtype: np.dtype) -> Tuple[bytes, int]:
+    """Returns a little-endian TIFF header and IFD for one strip of shape, and the data offset."""
+    height, width = shape[:2]
+    samples = shape[2] if len(shape) == 3 else 1
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    big = nbytes > 0xFFFF0000
+    entries_format, value_format = ("Q", "Q") if big else ("H", "I")
+    long_type = 16 if big else 4
+    inline = struct.calcsize(value_format)
+
+    entries = [
+        (_WIDTH, 4, [width]), (_LENGTH, 4, [height]), (_BITS, 3, [dtype.itemsize * 8] * samples),
+        (_COMPRESSION, 3, [1]), (_PHOTOMETRIC, 3, [2 if samples == 3 else 1]),
+        (_STRIP_OFFSETS, long_type, [0]), (_SAMPLES, 3, [samples]), (_ROWS_PER_STRIP, 4, [height]),
+        (_STRIP_BYTES, long_type, [nbytes]), (_PLANAR, 3, [1]),
+        (_SAMPLE_FORMAT, 3, [3 if dtype.kind == "f" else 1] * samples),
+    ]
+    header_size = 16 if big else 8
+    extra_offset = (header_size + struct.calcsize(entries_format)
+                    + len(entries) * (4 + 2 * inline) + inline)
+    # Values too large for their entry (BitsPerSample of RGB) follow the IFD
+    extra_size = sum(_TIFF_TYPES[field_type][1] * len(values) for _, field_type, values in entries
+                     if _TIFF_TYPES[field_type][1] * len(values) > inline)
+    data_offset = (extra_offset + extra_size + 15) // 16 * 16
+
+    if big:
+        header = struct.pack("<2sHHHQ", b"II", 43, 8, 0, header_size)
+    else:
+        header = struct.pack("<2sHI", b"II", 42, header_size)
+    ifd = struct.pack("<" + entries_format, len(entries))
+    extra = b""
+    for tag, field_type, values in entries:
+        if tag == _STRIP_OFFSETS:
+            values = [data_offset]
+        packed = struct.pack("<" + _TIFF_TYPES[field_type][0] * len(values), *values)
+        if len(packed) > inline:
+            field = struct.pack("<" + value_format, extra_offset + len(extra))
+            extra += packed
+        else:
+            field = packed.ljust(inline, b"\0")
+        ifd += struct.pack("<HH" + value_format, tag, field_type, len(values)) + field
+    ifd += struct.pack("<" + value_format, 0)
+    return (header + ifd + extra).ljust(data_offset, b"\0"), data_offset
+
+
+def create_mapped(path: str, shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+    """Creates an uncompressed TIFF or NPY file at path and maps its pixels for writing.
+
+    BGR images are stored as RGB TIFFs; the returned array is a BGR view
+    of them, like open_mapped returns.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    dtype = np.dtype(dtype)
+    if extension not in MAPPED_EXTENSIONS:
+        raise ValueError(f"Cannot write {extension or path} files tile by tile")
+    if len(shape) not in (2, 3) or (len(shape) == 3 and shape[2] not in (1, 3)):
+        raise ValueError(f"Cannot write images of shape {shape} tile by tile")
+    if extension == ".npy":
+        return np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=tuple(shape))
+    if dtype not in _TIFF_DTYPES.values():
+        raise ValueError(f"Cannot write {dtype} TIFF files")
+    # Headers are little-endian, so the samples must be too
+    dtype = dtype.newbyteorder("<")
+    if len(shape) == 3 and shape[2] == 1:
+        shape = shape[:2]
+    header, data_offset = _tiff_header(tuple(shape), dtype)
+    with open(path, "wb") as file:
+        file.write(header)
+        file.truncate(data_offset + int(np.prod(shape)) * dtype.itemsize)
+    return _bgr_view(_map(path, tuple(shape), dtype, data_offset, writable=True))
+
+
+def write_streamed(path: str, shape: Tuple[int, ...], dtype, fill: Callable[[np.ndarray], None]):
+    """Writes an uncompressed TIFF or NPY file atomically, without holding its pixels in memory.
+
+    fill(output) must write every pixel of the mapped output array. The
+    file is created under a temporary name and renamed over path only when
+    fill returns.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temp_path = temporary_path(path) + os.path.splitext(path)[1]
+    try:
+        output = create_mapped(temp_path, shape, dtype)
+        fill(output)
+        release_pages(output)
+        buffer = mapped_buffer(output)
+        del output
+        try:
+            buffer.close()
+        except BufferError:
+            pass  # fill kept a view; the mapping closes when that is collected
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def scratch_image(shape: Tuple[int, ...], dtype=np.uint8) -> np.ndarray:
+    """Returns a writable array backed by an anonymous temporary file.
+
+    The file is deleted as soon as it is created, so its space is freed
+    when the array is garbage collected.
+    """
+    import tempfile
+
+    nbytes = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+    with tempfile.TemporaryFile(dir=os.environ.get(SCRATCH_DIR_ENV) or None) as file:
+        file.truncate(nbytes)
+        buffer = mmap.mmap(file.fileno(), nbytes, access=mmap.ACCESS_WRITE)
+    return np.ndarray(tuple(shape), dtype=dtype, buffer=buffer)
+
+
+def area_resize(image: np.ndarray, size: Tuple[int, int]) -> np.ndarray:
+    """cv2.resize with INTER_AREA to size (width, height), in row bands for mapped images.
+
+    Mapped images are first averaged over k x k blocks, k being the
+    integer part of the scale, a band of rows at a time (edge pixels are
+    repeated to complete the last block); the much smaller result is then
+    resized to size in memory. That matches a single resize exactly for
+    even integer factors and closely otherwise.
+    """
+    height, width = image.shape[:2]
+    out_width, out_height = size
+    factor = int(round(min(height / out_height, width / out_width)))
+    if not is_mapped(image) or image.nbytes <= BAND_BYTES or factor < 2:
+        return cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+
+    block_height, block_width = -(-height // factor), -(-width // factor)
+    blocks = np.empty((block_height, block_width) + image.shape[2:], dtype=image.dtype)
+    band_rows = max(1, int(BAND_BYTES / (image.nbytes / height)) // factor) * factor
+    for y0 in range(0, height, band_rows):
+        band = np.ascontiguousarray(image[y0:y0 + band_rows])
+        pad_bottom, pad_right = -band.shape[0] % factor, -width % factor
+        if pad_bottom or pad_right:
+            band = cv2.copyMakeBorder(band, 0, pad_bottom, 0, pad_right, cv2.BORDER_REPLICATE)
+        averaged = cv2.resize(band, (band.shape[1] // factor, band.shape[0] // factor),
+                              interpolation=cv2.INTER_AREA)
+        target = blocks[y0 // factor:(y0 + band.shape[0]) // factor]
+        target[...] = averaged.reshape(target.shape)
+        release_pages(image)
+    if (block_width, block_height) == size:
+        return blocks
+    return cv2.resize(blocks, size, interpolation=cv2.INTER_AREA)
+
+
+def stream_stages(image: np.ndarray, stack, output: np.ndarray, halo: int,
+                  tile_size: int = 1024, should_cancel: Optional[Callable[[], bool]] = None,
+                  progress: Optional[Callable[[float], None]] = None):
+    """Applies stack to image tile by tile, writing each tile's core into output.
+
+    halo must be the stack's accumulated halo (see accumulated_halo), so
+    every tile matches the same pixels of a whole-image run. Only one
+    padded tile is held in memory at a time; mapped input and output pages
+    are released after each row of tiles.
+    """
+    from utils.pipeline_executor import PipelineCancelled, apply_stages
+
+    height, width = image.shape[:2]
+    for y0 in range(0, height, tile_size):
+        y1 = min(y0 + tile_size, height)
+        py0, py1 = max(0, y0 - halo), min(height, y1 + halo)
+        for x0 in range(0, width, tile_size):
+            if should_cancel is not None and should_cancel():
+                raise PipelineCancelled()
+            x1 = min(x0 + tile_size, width)
+            px0, px1 = max(0, x0 - halo), min(width, x1 + halo)
+            result = apply_stages(image[py0:py1, px0:px1], stack)
+            if result.shape[:2] != (py1 - py0, px1 - px0):
+                raise ValueError("A tool changed the tile size")
+            core = output[y0:y1, x0:x1]
+            core[...] = result[y0 - py0:y1 - py0, x0 - px0:x1 - px0].reshape(core.shape)
+        release_pages(output)
+        release_pages(image)
+        if progress is not None:
+            progress(y1 / height)
@@ -0,0 +1,199 @@
+# utils/pipeline_executor.py
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from tools.base_tool import apply_lut, compose_luts
+from utils.bit_depth import convert_for
+from utils.image_source import is_mapped, scratch_image, stream_stages
+from utils.profiler import PipelineProfiler
+from utils.stage_cache import StageCache, image_fingerprint, stage_key
+from utils.tile_executor import TileExecutor
+
+
+class PipelineCancelled(Exception):
+    """Raised when a pipeline run is abandoned between stages."""
+
+
+def apply_stages(image: np.ndarray, stack: List, start: int = 0,
+                 on_stage: Optional[Callable[[int, np.ndarray], None]] = None,
+                 should_cancel: Optional[Callable[[], bool]] = None,
+                 tiler: Optional[TileExecutor] = None,
+                 profiler: Optional[PipelineProfiler] = None) -> np.ndarray:
+    """Applies stack[start:] to image, fusing runs of pointwise tools into one LUT pass.
+
+    Each stage gets its input in a depth it declares in dtypes (see
+    convert_for), so 16-bit and float images only lose precision at tools
+    that need 8 bits. on_stage(index, output) is called with the output of every stage that is
+    materialized; stages folded into a fused lookup table are skipped. Other
+    stages run through tiler when one is given. profiler, if given, must have
+    a run in progress and receives every stage.
+    """
+    index = start
+    while index < len(stack):
+        if should_cancel is not None and should_cancel():
+            raise PipelineCancelled()
+
+        tool = stack[index]
+        image = convert_for(image, tool.dtypes)
+        end = index + 1
+        if tool.pointwise and image.dtype == np.uint8:
+            while end < len(stack) and stack[end].pointwise:
+                end += 1
+        tiled = end == index + 1 and tiler is not None and tiler.should_tile(tool, image)
+        token = profiler.start_stage() if profiler is not None else None
+
+        if end > index + 1:
+            try:
+                lut = tool.get_lut()
+                for fused in stack[index + 1:end]:
+                    lut = compose_luts(lut, fused.get_lut())
+                image = apply_lut(image, lut)
+            except Exception as e:
+                raise RuntimeError(f"Error applying fused adjustments: {str(e)}")
+        elif tiled:
+            image = tiler.apply(tool, image)
+        else:
+            image = tool.apply(image)
+
+        if profiler is not None:
+            profiler.end_stage(token, index, end - 1, image, tiled)
+        if on_stage is not None:
+            on_stage(end - 1, image)
+        index = end
+
+    return image
+
+
+def accumulated_halo(stack: List) -> Optional[int]:
+    """Returns how far the stack's output at a pixel can depend on input pixels.
+
+    This is the sum of the stages' halos, or None if any stage needs the
+    whole image or changes its size.
+    """
+    total = 0
+    for tool in stack:
+        halo = tool.get_halo()
+        if halo is None or tool.changes_size:
+            return None
+        total += halo
+    return total
+
+
+class PipelineExecutor:
+    """Runs a processing stack, reusing cached stage outputs where possible.
+
+    With a tiler, neighborhood stages run tile by tile to bound memory; with
+    a profiler, per-stage timing and memory are recorded for every run.
+    Memory-mapped images (see utils.image_source) are streamed through the
+    whole stack tile by tile into a mapped scratch file instead, when every
+    stage allows it, and their stage outputs are not cached.
+    """
+
+    def __init__(self, cache: Optional[StageCache] = None, tiler: Optional[TileExecutor] = None,
+                 profiler: Optional[PipelineProfiler] = None):
+        self.cache = cache if cache is not None else StageCache()
+        self.tiler = tiler
+        self.profiler = profiler
+
+    def run(self, image: np.ndarray, stack: List, source_key: Optional[str] = None,
+            should_cancel: Optional[Callable[[], bool]] = None) -> np.ndarray:
+        """Applies every tool in stack to image and returns the final output.
+
+        Only the stages after the deepest cached prefix are recomputed. Pass
+        source_key (see image_fingerprint) to avoid re-hashing the input, and
+        should_cancel to abandon the run between stages with PipelineCancelled.
+        """
+        if image is None:
+            raise ValueError("No image provided for processing")
+        if is_mapped(image) and stack and accumulated_halo(stack) is not None:
+            return self.run_streamed(image, stack, should_cancel=should_cancel)
+
+        keys, cacheable = self._stage_keys(image, stack, source_key)
+        start, current = self._cached_prefix(image, keys, cacheable)
+
+        def on_stage(index, output):
+            if index < cacheable:
+                self.cache.put(keys[index], output)
+
+        profiler = self.profiler
+        if profiler is None:
+            return apply_stages(current, stack, start, on_stage=on_stage,
+                                should_cancel=should_cancel, tiler=self.tiler)
+
+        profiler.begin_run(image, stack)
+        completed = False
+        try:
+            if start > 0:
+                profiler.mark_cached(start - 1, current)
+            result = apply_stages(current, stack, start, on_stage=on_stage,
+                                  should_cancel=should_cancel, tiler=self.tiler, profiler=profiler)
+            completed = True
+            return result
+        finally:
+            profiler.end_run(completed)
+
+    def run_streamed(self, image: np.ndarray, stack: List, output: Optional[np.ndarray] = None,
+                     should_cancel: Optional[Callable[[], bool]] = None,
+                     progress: Optional[Callable[[float], None]] = None) -> np.ndarray:
+        """Applies stack to image tile by tile and returns output.
+
+        output defaults to a mapped scratch array, so neither the input nor
+        the result has to fit in memory. Raises ValueError if a stage needs
+        the whole image or changes its size (see accumulated_halo).
+        """
+        halo = accumulated_halo(stack)
+        if halo is None:
+            raise ValueError("Every tool must work on tiles to process an image larger than memory")
+        # Channels and dtype come from a run on a small corner
+        sample = apply_stages(image[:2 * halo + 64, :2 * halo + 64], stack)
+        if output is None:
+            output = scratch_image(image.shape[:2] + sample.shape[2:], sample.dtype)
+        tile_size = self.tiler.tile_size_for(image, halo, 1) if self.tiler is not None else 1024
+        stream_stages(image, stack, output, halo, tile_size, should_cancel, progress)
+        return output
+
+    def run_region(self, image: np.ndarray, stack: List, region: Tuple[int, int, int, int],
+                   source_key: Optional[str] = None,
+                   should_cancel: Optional[Callable[[], bool]] = None) -> Optional[np.ndarray]:
+        """Computes only region (y0, y1, x0, x1) of the stack's output.
+
+        The region is processed with the accumulated halo of the stages
+        left after the deepest cached one, so it matches the same pixels of
+        a full run. Nothing is cached. Returns None if the remaining stages
+        can't be limited to a region (see accumulated_halo).
+        """
+        if image is None:
+            raise ValueError("No image provided for processing")
+
+        keys, cacheable = self._stage_keys(image, stack, source_key)
+        start, current = self._cached_prefix(image, keys, cacheable)
+        halo = accumulated_halo(stack[start:])
+        if halo is None:
+            return None
+
+        height, width = current.shape[:2]
+        y0, y1, x0, x1 = region
+        py0, py1, px0, px1 = max(0, y0 - halo), min(height, y1 + halo), max(0, x0 - halo), min(width, x1 + halo)
+        result = apply_stages(current[py0:py1, px0:px1], stack, start, should_cancel=should_cancel)
+        return result[y0 - py0:y1 - py0, x0 - px0:x1 - px0]
+
+    def _stage_keys(self, image, stack, source_key):
+        """Returns the cache key of every stage and the index of the first uncacheable one."""
+        input_key = source_key or image_fingerprint(image)
+        keys = []
+        for tool in stack:
+            input_key = stage_key(input_key, tool)
+            keys.append(input_key)
+
+        # Outputs of a non-deterministic stage, and of everything after it, are never cached
+        cacheable = next((index for index, tool in enumerate(stack) if not tool.deterministic), len(stack))
+        return keys, cacheable
+
+    def _cached_prefix(self, image, keys, cacheable):
+        """Returns (index of the first stage to run, its input) after the deepest cached stage."""
+        for index in range(cacheable - 1, -1, -1):
+            cached = self.cache.get(keys[index])
+            if cached is not None:
+                return index + 1, cached
+        return 0, image
@@ -0,0 +1,107 @@
+# utils/pipeline_io.py
+import hashlib
+import json
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from utils.tool_manager import ToolManager
+
+PIPELINE_FORMAT = "imageu-pipeline"
+PIPELINE_VERSION = 1
+
+
+def _to_json_value(value):
+    """Converts NumPy scalars/arrays and tuples in tool parameters to JSON types."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_to_json_value(v) for v in value]
+    if isinstance(value, dict):
+        return {str(k): _to_json_value(v) for k, v in value.items()}
+    return value
+
+
+def stack_to_stages(stack: List, names: Optional[List[str]] = None,
+                    tool_manager: Optional[ToolManager] = None) -> List[Dict]:
+    """Describes a processing stack as a list of {"name", "params"} stage specs.
+
+    names gives each tool's display name; missing names are looked up in the
+    tool manager by class.
+    """
+    tool_manager = tool_manager or ToolManager()
+    stages = []
+    for index, tool in enumerate(stack):
+        name = names[index] if names and index < len(names) else tool_manager.get_display_name(tool)
+        stages.append({"name": name, "params": _to_json_value(tool.get_parameters())})
+    return stages
+
+
+def stages_to_dict(stages: List[Dict]) -> Dict:
+    """Wraps stage specs in the versioned pipeline document."""
+    return {
+        "format": PIPELINE_FORMAT,
+        "version": PIPELINE_VERSION,
+        "tools": stages,
+    }
+
+
+def stages_from_dict(data) -> List[Dict]:
+    """Validates a pipeline document and returns its stage specs.
+
+    Unversioned documents ({"tools": [...]} or a bare list) are read as version 1.
+    """
+    if isinstance(data, list):
+        data = {"tools": data}
+    if not isinstance(data, dict):
+        raise ValueError("Pipeline must be a JSON object")
+
+    version = data.get("version", 1)
+    if not isinstance(version, int) or version < 1:
+        raise ValueError(f"Invalid pipeline version: {version!r}")
+    if version > PIPELINE_VERSION:
+        raise ValueError(f"Pipeline version {version} is newer than supported version {PIPELINE_VERSION}")
+
+    stages = data.get("tools")
+    if not isinstance(stages, list):
+        raise ValueError("Pipeline must contain a list of tools")
+    for stage in stages:
+        if not isinstance(stage, dict) or not isinstance(stage.get("name"), str):
+            raise ValueError(f"Invalid pipeline stage: {stage!r}")
+        if not isinstance(stage.get("params", {}), dict):
+            raise ValueError(f"Invalid parameters for stage {stage['name']}")
+    return [{"name": stage["name"], "params": stage.get("params", {})} for stage in stages]
+
+
+def load_pipeline(path: str) -> List[Dict]:
+    """Loads stage specs from a pipeline file."""
+    with open(path, "r") as file:
+        return stages_from_dict(json.load(file))
+
+
+def save_pipeline(path: str, stages: List[Dict]):
+    """Writes stage specs to a pipeline file."""
+    with open(path, "w") as file:
+        json.dump(stages_to_dict(stages), file, indent=4)
+
+
+def build_stack(stages: List[Dict], tool_manager: Optional[ToolManager] = None) -> List:
+    """Instantiates and configures the tools described by stages."""
+    tool_manager = tool_manager or ToolManager()
+    stack = []
+    for stage in stages:
+        tool = tool_manager.get_tool(stage["name"])
+        try:
+            tool.update_parameters(stage.get("params", {}))
+        except Exception as e:
+            raise ValueError(f"Invalid parameters for {stage['name']}: {str(e)}")
+        stack.append(tool)
+    return stack
+
+
+def pipeline_hash(stages: List[Dict]) -> str:
+    """Returns a stable hash identifying a pipeline's tools and parameters."""
+    encoded = json.dumps(stages_to_dict(stages), sort_keys=True, default=repr)
+    return hashlib.blake2b(encoded.encode(), digest_size=16).hexdigest()
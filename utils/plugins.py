@@ -0,0 +1,218 @@
+# utils/plugins.py
+import hashlib
+import importlib
+import importlib.util
+import inspect
+import json
+import os
+import sys
+import warnings
+from typing import Dict, List, Optional
+
+ENTRY_POINT_GROUP = "imageu.tools"
+# Extra plugin directories, separated like PATH
+PLUGIN_PATH_ENV = "IMAGEU_PLUGIN_PATH"
+DEFAULT_PLUGIN_DIR = os.path.join(os.path.expanduser("~"), ".imageu", "plugins")
+DEFAULT_MANIFEST_PATH = os.path.join(os.path.expanduser("~"), ".imageu", "plugin_manifest.json")
+MANIFEST_VERSION = 2
+
+# Plugin files are imported under this package name so they can't shadow real modules
+PLUGIN_PACKAGE = "imageu_plugins"
+
+
+def plugin_directories() -> List[str]:
+    """Returns the directories scanned for plugin files: IMAGEU_PLUGIN_PATH, then the default."""
+    extra = os.environ.get(PLUGIN_PATH_ENV, "")
+    return [path for path in extra.split(os.pathsep) if path] + [DEFAULT_PLUGIN_DIR]
+
+
+def plugin_module_name(path: str) -> str:
+    """Module name a plugin file is imported under.
+
+    A hash of the file's absolute path keeps same-named files in different
+    plugin directories apart.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    digest = hashlib.blake2b(os.path.abspath(path).encode(), digest_size=4).hexdigest()
+    return f"{PLUGIN_PACKAGE}.{stem}_{digest}"
+
+
+def load_plugin_file(path: str):
+    """Imports a plugin file (once) and returns the module."""
+    name = plugin_module_name(path)
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None:
+        raise ImportError(f"Cannot import plugin file {path}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except Exception:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def describe_tool(tool_class, name: Optional[str] = None) -> Dict:
+    """Returns the manifest entry for a tool class."""
+    category = getattr(tool_class, "category", None)
+    entry = {
+        "name": name or getattr(tool_class, "display_name", None) or tool_class.__name__,
+        "category": getattr(category, "value", category),
+        "module": tool_class.__module__,
+        "class": tool_class.__name__,
+        "capabilities": None,
+    }
+    try:
+        entry["capabilities"] = tool_class().capabilities()
+    except Exception:
+        # Capabilities are informational; a tool that needs setup still loads
+        pass
+    return entry
+
+
+def _tool_classes(module) -> List:
+    from tools.base_tool import ImageProcessingTool
+
+    return [obj for obj in vars(module).values()
+            if inspect.isclass(obj) and issubclass(obj, ImageProcessingTool)
+            and obj.__module__ == module.__name__ and not inspect.isabstract(obj)]
+
+
+def _scan_entry_point(entry_point) -> List[Dict]:
+    tool_class = entry_point.load()
+    return [describe_tool(tool_class, entry_point.name)]
+
+
+def _scan_file(path: str) -> List[Dict]:
+    entries = []
+    for tool_class in _tool_classes(load_plugin_file(path)):
+        entry = describe_tool(tool_class)
+        entry["path"] = path
+        entries.append(entry)
+    return entries
+
+
+def _entry_points():
+    # importlib.metadata is slow to import and only needed when installed packages changed
+    from importlib import metadata
+
+    entry_points = metadata.entry_points()
+    if hasattr(entry_points, "select"):
+        return entry_points.select(group=ENTRY_POINT_GROUP)
+    # Python < 3.10 returns a dict of groups
+    return entry_points.get(ENTRY_POINT_GROUP, [])
+
+
+def environment_key() -> str:
+    """Returns a key that changes whenever packages are installed into or removed from sys.path.
+
+    Installing or removing a distribution adds or deletes its metadata
+    directory, which updates the modification time of the directory on
+    sys.path that holds it.
+    """
+    stamps = []
+    for path in sys.path:
+        try:
+            stamps.append(f"{os.path.abspath(path or '.')}:{os.stat(path or '.').st_mtime_ns}")
+        except OSError:
+            continue
+    return hashlib.blake2b("|".join(stamps).encode(), digest_size=16).hexdigest()
+
+
+def _sources(directories: List[str], scan_entry_points: bool = True) -> List[Dict]:
+    """Lists plugin sources with a key that changes whenever the source does."""
+    sources = []
+    for entry_point in _entry_points() if scan_entry_points else []:
+        dist = getattr(entry_point, "dist", None)
+        version = f"{dist.name}=={dist.version}" if dist is not None else ""
+        sources.append({"id": f"entry_point:{entry_point.name}",
+                        "key": f"{entry_point.value}|{version}", "entry_point": entry_point})
+    for directory in directories:
+        if not os.path.isdir(directory):
+            continue
+        for file_name in sorted(os.listdir(directory)):
+            path = os.path.abspath(os.path.join(directory, file_name))
+            if not file_name.endswith(".py") or file_name.startswith("_"):
+                continue
+            stat = os.stat(path)
+            sources.append({"id": f"file:{path}", "key": f"{stat.st_mtime_ns}|{stat.st_size}", "path": path})
+    return sources
+
+
+def load_manifest(path: str) -> Dict:
+    """Loads the plugin manifest, or an empty one if it is missing, unreadable or outdated."""
+    try:
+        with open(path, "r") as file:
+            manifest = json.load(file)
+        if manifest.get("version") == MANIFEST_VERSION:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": MANIFEST_VERSION, "sources": {}}
+
+
+def discover_plugins(directories: Optional[List[str]] = None,
+                     manifest_path: Optional[str] = DEFAULT_MANIFEST_PATH,
+                     refresh: bool = False) -> List[Dict]:
+    """Returns manifest entries for every tool provided by plugins.
+
+    Plugins are installed packages declaring "imageu.tools" entry points
+    (name = display name, value = "module:Class") and .py files in the
+    plugin directories. Only sources that are new or changed since the
+    cached manifest are imported; the rest are described from the cache.
+    Entry points are only listed again when installed packages changed
+    (see environment_key). Broken plugins are reported as warnings and
+    skipped until they change.
+    """
+    directories = plugin_directories() if directories is None else directories
+    manifest = {"version": MANIFEST_VERSION, "sources": {}} if refresh or not manifest_path \
+        else load_manifest(manifest_path)
+    cached = manifest["sources"]
+    sources = {}
+    environment = environment_key()
+    scan_entry_points = manifest.get("environment") != environment
+    changed = scan_entry_points
+
+    if not scan_entry_points:
+        sources.update({source_id: record for source_id, record in cached.items()
+                        if source_id.startswith("entry_point:")})
+    for source in _sources(directories, scan_entry_points):
+        previous = cached.get(source["id"])
+        if previous is not None and previous["key"] == source["key"]:
+            sources[source["id"]] = previous
+        else:
+            changed = True
+            record = {"key": source["key"], "tools": [], "error": None}
+            try:
+                if "entry_point" in source:
+                    record["tools"] = _scan_entry_point(source["entry_point"])
+                else:
+                    record["tools"] = _scan_file(source["path"])
+            except Exception as e:
+                record["error"] = str(e)
+            sources[source["id"]] = record
+    for source_id, record in sources.items():
+        if record["error"]:
+            warnings.warn(f"Skipping plugin {source_id}: {record['error']}")
+
+    changed = changed or set(sources) != set(cached)
+    if changed and manifest_path:
+        try:
+            os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+            with open(manifest_path, "w") as file:
+                json.dump({"version": MANIFEST_VERSION, "environment": environment,
+                           "sources": sources}, file, indent=4)
+        except OSError as e:
+            warnings.warn(f"Could not write plugin manifest {manifest_path}: {str(e)}")
+
+    return [tool for record in sources.values() for tool in record["tools"]]
+
+
+if __name__ == "__main__":
+    refresh = "--refresh" in sys.argv[1:]
+    for tool in discover_plugins(refresh=refresh):
+        origin = tool.get("path") or tool["module"]
+        print(f"{tool['name']:32s} {tool['category'] or '-':18s} {origin}:{tool['class']}")
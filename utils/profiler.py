@@ -0,0 +1,183 @@
+# utils/profiler.py
+import json
+import os
+import threading
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+
+class PipelineProfiler:
+    """Records per-stage timing and memory for pipeline runs.
+
+    Each run is a dict with "start", "seconds", "input_shape" and a
+    "stages" list with one entry per stack position:
+        {"index", "tool", "status", "start", "seconds", "output_shape",
+         "output_dtype", "output_bytes", "alloc_peak_bytes", "fused_into", "tiled"}
+    status is "run", "cached" (served from the stage cache) or "fused" (folded
+    into the lookup table applied at stage fused_into). Times are in seconds
+    relative to the run start. With track_allocations, peak traced NumPy
+    allocations per stage are recorded via tracemalloc. Its peak counter is
+    process-wide, so allocation peaks are only valid when no other run
+    overlaps; timings are unaffected.
+    """
+
+    def __init__(self, track_allocations: bool = True, history: int = 20,
+                 trace_path: Optional[str] = None):
+        self.track_allocations = track_allocations
+        self.history = history
+        # When set, every completed run is also written there as a Chrome trace
+        self.trace_path = trace_path
+        self.runs: List[Dict] = []
+        self._lock = threading.Lock()
+        # Runs in progress are per thread, so a synchronous save can be timed
+        # while a background render is running
+        self._local = threading.local()
+        self._tracing_runs = 0
+
+    @property
+    def _run(self):
+        return getattr(self._local, "run", None)
+
+    @_run.setter
+    def _run(self, run):
+        self._local.run = run
+
+    @property
+    def last_run(self) -> Optional[Dict]:
+        """The most recent completed run."""
+        with self._lock:
+            return self.runs[-1] if self.runs else None
+
+    def begin_run(self, image, stack: List):
+        """Starts recording a run of stack over image."""
+        self._run = {
+            "start": time.perf_counter(),
+            "timestamp": time.time(),
+            "input_shape": list(image.shape),
+            "stages": [self._stage_entry(index, tool) for index, tool in enumerate(stack)],
+        }
+        if self.track_allocations:
+            with self._lock:
+                if self._tracing_runs == 0 and not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                    self._tracing_runs = 1
+                elif self._tracing_runs:
+                    self._tracing_runs += 1
+            self._run["traced"] = self._tracing_runs > 0
+
+    def _stage_entry(self, index, tool):
+        return {"index": index, "tool": type(tool).__name__, "status": "pending",
+                "start": None, "seconds": None, "output_shape": None, "output_dtype": None,
+                "output_bytes": None, "alloc_peak_bytes": None, "fused_into": None, "tiled": False}
+
+    def mark_cached(self, last_index: int, output):
+        """Records that stages up to last_index were served from the cache."""
+        for stage in self._run["stages"][:last_index + 1]:
+            stage["status"] = "cached"
+        self._describe_output(self._run["stages"][last_index], output)
+
+    def start_stage(self) -> Dict:
+        """Returns a token to pass to end_stage once the stage's output exists."""
+        token = {"start": time.perf_counter(), "traced": None}
+        if self.track_allocations and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            token["traced"] = tracemalloc.get_traced_memory()[0]
+        return token
+
+    def end_stage(self, token: Dict, first_index: int, last_index: int, output, tiled: bool = False):
+        """Records a stage (or a fused group of stages) that just ran."""
+        end = time.perf_counter()
+        stage = self._run["stages"][last_index]
+        stage.update({
+            "status": "run",
+            "start": token["start"] - self._run["start"],
+            "seconds": end - token["start"],
+            "tiled": tiled,
+        })
+        if token["traced"] is not None:
+            stage["alloc_peak_bytes"] = max(0, tracemalloc.get_traced_memory()[1] - token["traced"])
+        self._describe_output(stage, output)
+        for fused in self._run["stages"][first_index:last_index]:
+            fused.update({"status": "fused", "fused_into": last_index})
+
+    @staticmethod
+    def _describe_output(stage, output):
+        stage.update({
+            "output_shape": list(output.shape),
+            "output_dtype": output.dtype.name,
+            "output_bytes": int(output.nbytes),
+        })
+
+    def end_run(self, completed: bool = True):
+        """Finishes the current run; only completed runs are kept."""
+        run, self._run = self._run, None
+        if run is None:
+            return
+        if run.pop("traced", False):
+            with self._lock:
+                self._tracing_runs -= 1
+                if self._tracing_runs == 0:
+                    tracemalloc.stop()
+        if not completed:
+            return
+        run["seconds"] = time.perf_counter() - run["start"]
+        with self._lock:
+            self.runs.append(run)
+            del self.runs[:-self.history]
+        if self.trace_path:
+            save_chrome_trace(run, self.trace_path)
+
+
+def chrome_trace(run: Dict, names: Optional[List[str]] = None) -> Dict:
+    """Converts a profiled run to the Chrome trace event format (chrome://tracing, Perfetto)."""
+    events = [{
+        "name": "pipeline", "ph": "X", "pid": 1, "tid": 1, "ts": 0,
+        "dur": run["seconds"] * 1e6,
+        "args": {"input_shape": run["input_shape"]},
+    }]
+    for stage in run["stages"]:
+        if stage["status"] != "run":
+            continue
+        first = stage["index"]
+        while first > 0 and run["stages"][first - 1]["fused_into"] == stage["index"]:
+            first -= 1
+        label = names[stage["index"]] if names and stage["index"] < len(names) else stage["tool"]
+        if first != stage["index"]:
+            label = f"{label} (fused {first}-{stage['index']})"
+        events.append({
+            "name": label, "cat": "stage", "ph": "X", "pid": 1, "tid": 2,
+            "ts": stage["start"] * 1e6, "dur": stage["seconds"] * 1e6,
+            "args": {key: stage[key] for key in
+                     ("index", "tool", "output_shape", "output_dtype", "output_bytes",
+                      "alloc_peak_bytes", "tiled")},
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def save_chrome_trace(run: Dict, path: str, names: Optional[List[str]] = None):
+    """Writes a profiled run as a Chrome trace JSON file."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(chrome_trace(run, names), file, indent=1)
+
+
+def format_stage(stage: Dict) -> str:
+    """Short human-readable summary of a stage, e.g. '41.2 ms · 34.3 MB'.
+
+    The size is the stage's peak traced allocations when they were tracked,
+    otherwise the bytes of the output it allocated.
+    """
+    if stage["status"] == "cached":
+        return "cached"
+    if stage["status"] == "fused":
+        return "fused"
+    if stage["status"] != "run":
+        return ""
+    text = f"{stage['seconds'] * 1000:.1f} ms"
+    allocated = stage["alloc_peak_bytes"]
+    if allocated is None:
+        allocated = stage["output_bytes"]
+    if allocated is not None:
+        text += f" · {allocated / 1e6:.1f} MB"
+    return text
@@ -0,0 +1,46 @@
+# utils/proxy.py
+import copy
+from typing import List, Tuple
+
+import numpy as np
+
+from utils.image_source import area_resize
+
+# Proxy scales are powers of two so zooming between them reuses cached proxies
+PROXY_LEVELS = (0.125, 0.25, 0.5, 1.0)
+
+# Images smaller than this are always previewed at full resolution
+PREVIEW_MIN_PIXELS = 2_000_000
+
+
+def proxy_scale_for(display_scale: float, image_shape: Tuple[int, ...]) -> float:
+    """Returns the smallest proxy level that still covers display_scale."""
+    if image_shape[0] * image_shape[1] < PREVIEW_MIN_PIXELS:
+        return 1.0
+    for level in PROXY_LEVELS:
+        if level >= display_scale:
+            return level
+    return 1.0
+
+
+def make_proxy(image: np.ndarray, scale: float) -> np.ndarray:
+    """Returns image downscaled by scale using area averaging."""
+    if scale >= 1.0:
+        return image
+    height, width = image.shape[:2]
+    size = (max(1, int(round(width * scale))), max(1, int(round(height * scale))))
+    return area_resize(image, size)
+
+
+def scale_stack(stack: List, scale: float) -> List:
+    """Returns stack with scaled copies of tools whose parameters depend on pixel size."""
+    if scale >= 1.0:
+        return list(stack)
+    scaled = []
+    for tool in stack:
+        params = tool.get_scaled_parameters(scale)
+        if params != tool.get_parameters():
+            tool = copy.deepcopy(tool)
+            tool.update_parameters(params)
+        scaled.append(tool)
+    return scaled
@@ -0,0 +1,107 @@
+# utils/stage_cache.py
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+# Default memory budget for cached intermediate frames (1 GiB)
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+
+
+def image_fingerprint(image: np.ndarray) -> str:
+    """Returns a content hash identifying an image buffer."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{image.shape}|{image.dtype.str}".encode())
+    digest.update(memoryview(np.ascontiguousarray(image)).cast("B"))
+    return digest.hexdigest()
+
+
+def parameter_hash(params: dict) -> str:
+    """Returns a stable hash of a tool's parameter dictionary."""
+    encoded = json.dumps(params, sort_keys=True, default=repr)
+    return hashlib.blake2b(encoded.encode(), digest_size=16).hexdigest()
+
+
+def stage_key(input_key: str, tool) -> str:
+    """Returns the cache key for running a tool on the input identified by input_key."""
+    tool_class = f"{tool.__class__.__module__}.{tool.__class__.__qualname__}"
+    params = parameter_hash(tool.get_parameters())
+    return hashlib.blake2b(
+        f"{input_key}|{tool_class}|{params}".encode(), digest_size=16
+    ).hexdigest()
+
+
+class StageCache:
+    """LRU cache of processing stage outputs bounded by a memory budget.
+
+    All methods are safe to call from the GUI thread and render workers concurrently.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self._lock = threading.RLock()
+        self._entries = OrderedDict()
+        self._current_bytes = 0
+        self._max_bytes = self._validate_max_bytes(max_bytes)
+
+    def _validate_max_bytes(self, value):
+        try:
+            value = int(value)
+            if value < 0:
+                raise ValueError("Cache budget must be non-negative")
+            return value
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cache budget: {str(e)}")
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value):
+        with self._lock:
+            self._max_bytes = self._validate_max_bytes(value)
+            self._evict()
+
+    @property
+    def current_bytes(self) -> int:
+        return self._current_bytes
+
+    def __contains__(self, key) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns the cached frame for key, or None, marking it most recently used."""
+        with self._lock:
+            image = self._entries.get(key)
+            if image is not None:
+                self._entries.move_to_end(key)
+            return image
+
+    def put(self, key, image: np.ndarray):
+        """Stores a frame, evicting least recently used entries to stay within budget."""
+        if image.nbytes > self._max_bytes:
+            return
+        # Cached frames are shared between stages, so guard them against in-place edits
+        image.setflags(write=False)
+        with self._lock:
+            if key in self._entries:
+                self._current_bytes -= self._entries.pop(key).nbytes
+            self._entries[key] = image
+            self._current_bytes += image.nbytes
+            self._evict()
+
+    def clear(self):
+        """Drops every cached frame."""
+        with self._lock:
+            self._entries.clear()
+            self._current_bytes = 0
+
+    def _evict(self):
+        while self._current_bytes > self._max_bytes and self._entries:
+            _, image = self._entries.popitem(last=False)
+            self._current_bytes -= image.nbytes
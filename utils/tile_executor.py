@@ -0,0 +1,170 @@
+# utils/tile_executor.py
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+MIN_TILE_SIZE = 64
+
+# Rough bytes of working memory per pixel value inside a filter: the tile
+# itself, its output and a couple of float32 temporaries
+WORKING_BYTES_PER_VALUE = 16
+
+
+def plan_tiles(height: int, width: int, tile_size: int,
+               halo: int) -> Iterator[Tuple[Tuple[int, int, int, int], Tuple[int, int, int, int]]]:
+    """Yields (core, padded) rectangles as (y0, y1, x0, x1) covering the image.
+
+    Cores partition the image; padded rectangles extend each core by halo
+    pixels on every side, clipped to the image.
+    """
+    for y0 in range(0, height, tile_size):
+        y1 = min(y0 + tile_size, height)
+        for x0 in range(0, width, tile_size):
+            x1 = min(x0 + tile_size, width)
+            yield (y0, y1, x0, x1), (max(0, y0 - halo), min(height, y1 + halo),
+                                     max(0, x0 - halo), min(width, x1 + halo))
+
+
+class TileExecutor:
+    """Runs neighborhood tools tile by tile across a thread pool.
+
+    Each tile is processed with a halo of context pixels around it and only
+    its core is kept, so the stitched result matches a whole-image run. The
+    memory budget bounds the working memory of the tiles in flight; tools
+    that need the whole image (no halo) run on it directly.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET, tile_size: Optional[int] = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.memory_budget = memory_budget
+        self.tile_size = tile_size
+
+    def can_tile(self, tool, image: np.ndarray) -> bool:
+        """Returns True if tool can run on tiles of image."""
+        return (tool.get_halo() is not None
+                and not tool.changes_size
+                and image.dtype.name in tool.dtypes)
+
+    def should_tile(self, tool, image: np.ndarray) -> bool:
+        """Returns True if apply would split image into several tiles for tool."""
+        if not self.can_tile(tool, image):
+            return False
+        tile_size = self.tile_size_for(image, tool.get_halo(), self._workers_for(tool))
+        return image.shape[0] > tile_size or image.shape[1] > tile_size
+
+    def _workers_for(self, tool) -> int:
+        return self.max_workers if tool.thread_safe else 1
+
+    def tile_size_for(self, image: np.ndarray, halo: int, workers: int) -> int:
+        """Returns the tile core size that keeps the tiles in flight within the budget."""
+        if self.tile_size is not None:
+            return self.tile_size
+        channels = image.shape[2] if image.ndim == 3 else 1
+        per_tile = self.memory_budget / (workers * channels * WORKING_BYTES_PER_VALUE)
+        padded = int(np.sqrt(per_tile))
+        return max(MIN_TILE_SIZE, padded - 2 * halo)
+
+    def apply(self, tool, image: np.ndarray) -> np.ndarray:
+        """Applies tool to image, tiled when the tool allows it and the image spans several tiles."""
+        if image is None:
+            raise ValueError("No image provided for processing")
+        if not self.should_tile(tool, image):
+            return tool.apply(image)
+
+        halo = tool.get_halo()
+        workers = self._workers_for(tool)
+        tile_size = self.tile_size_for(image, halo, workers)
+        height, width = image.shape[:2]
+
+        def run_tile(core, padded):
+            y0, y1, x0, x1 = core
+            py0, py1, px0, px1 = padded
+            result = tool.apply(image[py0:py1, px0:px1])
+            if result.shape[:2] != (py1 - py0, px1 - px0):
+                raise ValueError(f"{type(tool).__name__} changed the tile size")
+            return core, result[y0 - py0:y1 - py0, x0 - px0:x1 - px0]
+
+        tiles = plan_tiles(height, width, tile_size, halo)
+
+        # The first tile fixes the output channels and dtype
+        core, result = run_tile(*next(tiles))
+        output = np.empty((height, width) + result.shape[2:], dtype=result.dtype)
+        output[core[0]:core[1], core[2]:core[3]] = result
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for tile in tiles:
+                pending.add(pool.submit(run_tile, *tile))
+                # At most 2 * workers tiles in flight (one running and one queued per
+                # worker), so memory stays bounded
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    self._store(output, done)
+            self._store(output, pending)
+
+        return output
+
+    @staticmethod
+    def _store(output, futures):
+        for future in futures:
+            (y0, y1, x0, x1), result = future.result()
+            output[y0:y1, x0:x1] = result
+
+
+def verify_tiling(tool, image: np.ndarray, tile_size: int = MIN_TILE_SIZE,
+                  tolerance: int = 0) -> Dict:
+    """Compares a tiled run of tool with a whole-image run.
+
+    Returns {"tiled": bool, "equal": bool, "max_difference": number or None}.
+    Tools that cannot be tiled are reported as equal, since they always run
+    on the whole image.
+    """
+    executor = TileExecutor(max_workers=2, tile_size=tile_size)
+    if not executor.can_tile(tool, image):
+        return {"tiled": False, "equal": True, "max_difference": None}
+    whole = tool.apply(image)
+    tiled = executor.apply(tool, image)
+    if whole.shape != tiled.shape:
+        return {"tiled": True, "equal": False, "max_difference": None}
+    difference = np.abs(whole.astype(np.float64) - tiled.astype(np.float64)).max()
+    return {"tiled": True, "equal": bool(difference <= tolerance), "max_difference": float(difference)}
+
+
+def verify_all_tools(image: Optional[np.ndarray] = None, tool_manager=None,
+                     tile_size: int = MIN_TILE_SIZE, tolerance: int = 1) -> List[Dict]:
+    """Runs verify_tiling for every tool registered in the tool manager.
+
+    The default tolerance of one level allows for OpenCV switching large
+    filter2D kernels (Gabor) to DFT convolution, whose rounding depends on
+    the input size.
+    """
+    from utils.tool_manager import ToolManager
+
+    tool_manager = tool_manager or ToolManager()
+    if image is None:
+        rng = np.random.default_rng(0)
+        # Smooth gradients plus noise exercise both flat regions and edges
+        y, x = np.mgrid[0:3 * tile_size + 17, 0:4 * tile_size + 29]
+        base = np.stack([(x * 255 // x.max()), (y * 255 // y.max()), ((x + y) % 256)], axis=2)
+        image = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+
+    report = []
+    for name in tool_manager.tools:
+        entry = {"name": name}
+        try:
+            entry.update(verify_tiling(tool_manager.get_tool(name), image, tile_size, tolerance))
+        except Exception as e:
+            entry.update({"tiled": None, "equal": False, "error": str(e)})
+        report.append(entry)
+    return report
+
+
+if __name__ == "__main__":
+    for entry in verify_all_tools():
+        status = "ok" if entry["equal"] else "MISMATCH"
+        detail = entry.get("error") or (f"max diff {entry['max_difference']}" if entry["tiled"] else "whole image")
+        print(f"{entry['name']:32s} {status:8s} {detail}")
@@ -1,60 +1,10 @@
 # tools/tool_manager.py
+import importlib
+import warnings
 from enum import Enum
-from typing import List, Dict, Type
+from typing import List, Dict, Optional, Type
 
-# Import all tools
-from tools.bilateral_filter import BilateralFilterTool
-from tools.brightness_adjustment import BrightnessAdjustmentTool
-from tools.canny_edge_detection import CannyEdgeDetectionTool
-from tools.closing import ClosingTool
-from tools.color_balancing import ColorBalancingTool
-from tools.contrast_adjustment import ContrastAdjustmentTool
-from tools.darken_image import DarkenImageTool
-from tools.dilation import DilationTool
-from tools.erosion import ErosionTool
-from tools.exposure_adjustment import ExposureAdjustmentTool
-from tools.flipping_mirroring import FlippingMirroringTool
-from tools.gamma_correction import GammaCorrectionTool
-from tools.gaussian_blur import GaussianBlurTool
-from tools.gaussian_noise_reduction import GaussianNoiseReductionTool
-from tools.grayscale_conversion import GrayscaleConversionTool
-from tools.high_pass_filter import HighPassFilterTool
-from tools.hue_adjustment import HueAdjustmentTool
-from tools.invert_colors import InvertColorsTool
-from tools.laplacian_edge_detection import LaplacianEdgeDetectionTool
-from tools.laplacian_sharpening import LaplacianSharpeningTool
-from tools.median_blur import MedianBlurTool
-from tools.non_local_means_denoising import NonLocalMeansDenoisingTool
-from tools.opening import OpeningTool
-from tools.orb_feature_detection import ORBFeatureDetectionTool
-from tools.otsu_threshold import OtsuThresholdTool
-from tools.posterization import PosterizationTool
-from tools.prewitt_operator import PrewittOperatorTool
-from tools.saturation_adjustment import SaturationAdjustmentTool
-from tools.selective_color_replacement import SelectiveColorReplacementTool
-from tools.sepia_effect import SepiaEffectTool
-from tools.threshold_tool import SimpleThresholdTool
-from tools.adaptive_threshold import AdaptiveThresholdTool
-from tools.sobel_filter import SobelFilterTool
-from tools.top_hat_transform import TopHatTransformTool
-from tools.black_hat_transform import BlackHatTransformTool
-from tools.hough_transform import HoughTransformTool
-from tools.unsharp_masking import UnsharpMaskingTool
-from tools.vibrance_adjustment import VibranceAdjustmentTool
-from tools.wavelet_transform import WaveletTransformTool
-from tools.surf_feature_detection import SURFFeatureDetectionTool
-from tools.sift_feature_detection import SIFTFeatureDetectionTool
-from tools.pixelation import PixelationTool
-from tools.pencil_sketch import PencilSketchTool
-from tools.oil_paint import OilPaintingTool
-from tools.lbp import LBPTool
-from tools.glitch_effect import GlitchEffectTool
-from tools.gabor_filter import GaborFilterTool
-from tools.fast_corner_detection import FASTCornerDetectionTool
-from tools.emboss import EmbossingTool
-from tools.dehaze import DehazingTool
-from tools.cartoonize import CartoonizationTool
-from tools.gradient_tool import GradientTool
+from utils import plugins
 
 class ToolCategory(str, Enum):
     ADJUSTMENT = "Adjustment"
@@ -69,174 +19,157 @@ class ToolCategory(str, Enum):
     TRANSFORM = "Transform"
     ARTISTIC = "Artistic"
     TEXTURE = "Texture"
+    PLUGIN = "Plugin"
+
+# Built-in tools as (display name, "module:Class" path, category)
+BUILTIN_TOOLS = [
+    # Filtering & Noise Reduction
+    ("Bilateral Filter", "tools.bilateral_filter:BilateralFilterTool", ToolCategory.FILTER),
+    ("Gaussian Blur", "tools.gaussian_blur:GaussianBlurTool", ToolCategory.FILTER),
+    ("Median Blur", "tools.median_blur:MedianBlurTool", ToolCategory.FILTER),
+    ("Gaussian Noise Reduction", "tools.gaussian_noise_reduction:GaussianNoiseReductionTool", ToolCategory.NOISE_REDUCTION),
+    ("NonLocal Means Denoising", "tools.non_local_means_denoising:NonLocalMeansDenoisingTool", ToolCategory.NOISE_REDUCTION),
+    ("Wavelet Transform", "tools.wavelet_transform:WaveletTransformTool", ToolCategory.TRANSFORM),
+    ("Gabor Filter", "tools.gabor_filter:GaborFilterTool", ToolCategory.FILTER),
+
+    # Image Enhancement & Adjustment
+    ("Brightness Adjustment", "tools.brightness_adjustment:BrightnessAdjustmentTool", ToolCategory.ADJUSTMENT),
+    ("Contrast Adjustment", "tools.contrast_adjustment:ContrastAdjustmentTool", ToolCategory.ADJUSTMENT),
+    ("Exposure Adjustment", "tools.exposure_adjustment:ExposureAdjustmentTool", ToolCategory.ADJUSTMENT),
+    ("Gamma Correction", "tools.gamma_correction:GammaCorrectionTool", ToolCategory.ADJUSTMENT),
+    ("Hue Adjustment", "tools.hue_adjustment:HueAdjustmentTool", ToolCategory.COLOR),
+    ("Saturation Adjustment", "tools.saturation_adjustment:SaturationAdjustmentTool", ToolCategory.COLOR),
+    ("Vibrance Adjustment", "tools.vibrance_adjustment:VibranceAdjustmentTool", ToolCategory.ADJUSTMENT),
+    ("Color Balancing", "tools.color_balancing:ColorBalancingTool", ToolCategory.COLOR),
+    ("Darken Image", "tools.darken_image:DarkenImageTool", ToolCategory.EFFECT),
+
+    # Edge Detection & Feature Detection
+    ("Canny Edge Detection", "tools.canny_edge_detection:CannyEdgeDetectionTool", ToolCategory.EDGE_DETECTION),
+    ("Laplacian Edge Detection", "tools.laplacian_edge_detection:LaplacianEdgeDetectionTool", ToolCategory.EDGE_DETECTION),
+    ("Prewitt Operator", "tools.prewitt_operator:PrewittOperatorTool", ToolCategory.EDGE_DETECTION),
+    ("Sobel Filter", "tools.sobel_filter:SobelFilterTool", ToolCategory.FILTER),
+    ("FAST Corner Detection", "tools.fast_corner_detection:FASTCornerDetectionTool", ToolCategory.FEATURE_DETECTION),
+    ("ORB Feature Detection", "tools.orb_feature_detection:ORBFeatureDetectionTool", ToolCategory.FEATURE_DETECTION),
+    ("SURF Feature Detection", "tools.surf_feature_detection:SURFFeatureDetectionTool", ToolCategory.FEATURE_DETECTION),
+    ("SIFT Feature Detection", "tools.sift_feature_detection:SIFTFeatureDetectionTool", ToolCategory.FEATURE_DETECTION),
+
+    # Morphological Operations
+    ("Erosion", "tools.erosion:ErosionTool", ToolCategory.MORPHOLOGICAL),
+    ("Dilation", "tools.dilation:DilationTool", ToolCategory.MORPHOLOGICAL),
+    ("Opening", "tools.opening:OpeningTool", ToolCategory.MORPHOLOGICAL),
+    ("Closing", "tools.closing:ClosingTool", ToolCategory.MORPHOLOGICAL),
+    ("TopHat Transform", "tools.top_hat_transform:TopHatTransformTool", ToolCategory.MORPHOLOGICAL),
+    ("BlackHat Transform", "tools.black_hat_transform:BlackHatTransformTool", ToolCategory.MORPHOLOGICAL),
+
+    # Thresholding & Binarization
+    ("Otsu Threshold", "tools.otsu_threshold:OtsuThresholdTool", ToolCategory.THRESHOLD),
+    ("Simple Threshold", "tools.threshold_tool:SimpleThresholdTool", ToolCategory.THRESHOLD),
+    ("Adaptive Threshold", "tools.adaptive_threshold:AdaptiveThresholdTool", ToolCategory.THRESHOLD),
+
+    # Artistic & Stylization Effects
+    ("Sepia Effect", "tools.sepia_effect:SepiaEffectTool", ToolCategory.EFFECT),
+    ("Pencil Sketch", "tools.pencil_sketch:PencilSketchTool", ToolCategory.ARTISTIC),
+    ("Oil Painting", "tools.oil_paint:OilPaintingTool", ToolCategory.ARTISTIC),
+    ("Cartoonization", "tools.cartoonize:CartoonizationTool", ToolCategory.ARTISTIC),
+    ("Glitch Effect", "tools.glitch_effect:GlitchEffectTool", ToolCategory.EFFECT),
+    ("Pixelation", "tools.pixelation:PixelationTool", ToolCategory.ARTISTIC),
+    ("Embossing", "tools.emboss:EmbossingTool", ToolCategory.ARTISTIC),
+
+    # Color & Transformation Effects
+    ("Invert Colors", "tools.invert_colors:InvertColorsTool", ToolCategory.COLOR),
+    ("Selective Color Replacement", "tools.selective_color_replacement:SelectiveColorReplacementTool", ToolCategory.COLOR),
+    ("Posterization", "tools.posterization:PosterizationTool", ToolCategory.EFFECT),
+
+    # Image Sharpening & High-Frequency Filtering
+    ("Laplacian Sharpening", "tools.laplacian_sharpening:LaplacianSharpeningTool", ToolCategory.EFFECT),
+    ("Unsharp Masking", "tools.unsharp_masking:UnsharpMaskingTool", ToolCategory.FILTER),
+    ("HighPass Filter", "tools.high_pass_filter:HighPassFilterTool", ToolCategory.FILTER),
+
+    # Image Transformation
+    ("Flipping", "tools.flipping_mirroring:FlippingMirroringTool", ToolCategory.EFFECT),
+    ("Hough Transform", "tools.hough_transform:HoughTransformTool", ToolCategory.FEATURE_DETECTION),
+    ("Dehazing", "tools.dehaze:DehazingTool", ToolCategory.EFFECT),
+
+    # Texture & Feature Analysis
+    ("LBP", "tools.lbp:LBPTool", ToolCategory.TEXTURE),
+    ("Gradient", "tools.gradient_tool:GradientTool", ToolCategory.TEXTURE),
+]
 
 class ToolManager:
-    def __init__(self):
-        # Define tool categories mapping
-        self.tool_categories: Dict[str, ToolCategory] = {
-            # Adjustment Tools
-            "BrightnessAdjustment": ToolCategory.ADJUSTMENT,
-            "ContrastAdjustment": ToolCategory.ADJUSTMENT,
-            "ExposureAdjustment": ToolCategory.ADJUSTMENT,
-            "GammaCorrection": ToolCategory.ADJUSTMENT,
-            "VibranceAdjustment": ToolCategory.ADJUSTMENT,
-
-            # Feature Detection
-            "SURFFeatureDetection": ToolCategory.FEATURE_DETECTION,
-            "SIFTFeatureDetection": ToolCategory.FEATURE_DETECTION,
-            "FASTCornerDetection": ToolCategory.FEATURE_DETECTION,
-            
-            # Filter Tools
-            "BilateralFilter": ToolCategory.FILTER,
-            "GaussianBlur": ToolCategory.FILTER,
-            "MedianBlur": ToolCategory.FILTER,
-            "SobelFilter": ToolCategory.FILTER,
-            "UnsharpMasking": ToolCategory.FILTER,
-            "HighPassFilter": ToolCategory.FILTER,
-            "GaborFilter": ToolCategory.FILTER,
-            
-            # Edge Detection Tools
-            "CannyEdgeDetection": ToolCategory.EDGE_DETECTION,
-            "LaplacianEdgeDetection": ToolCategory.EDGE_DETECTION,
-            "PrewittOperator": ToolCategory.EDGE_DETECTION,
-            
-            # Noise Reduction Tools
-            "GaussianNoiseReduction": ToolCategory.NOISE_REDUCTION,
-            "NonLocalMeansDenoising": ToolCategory.NOISE_REDUCTION,
-            
-            # Morphological Tools
-            "Closing": ToolCategory.MORPHOLOGICAL,
-            "Dilation": ToolCategory.MORPHOLOGICAL,
-            "Erosion": ToolCategory.MORPHOLOGICAL,
-            "Opening": ToolCategory.MORPHOLOGICAL,
-            "TopHatTransform": ToolCategory.MORPHOLOGICAL,
-            "BlackHatTransform": ToolCategory.MORPHOLOGICAL,
-            
-            # Color Tools
-            "ColorBalancing": ToolCategory.COLOR,
-            "GrayscaleConversion": ToolCategory.COLOR,
-            "HueAdjustment": ToolCategory.COLOR,
-            "InvertColors": ToolCategory.COLOR,
-            "SaturationAdjustment": ToolCategory.COLOR,
-            "SelectiveColorReplacement": ToolCategory.COLOR,
-            
-            # Effect Tools
-            "DarkenImage": ToolCategory.EFFECT,
-            "FlippingMirroring": ToolCategory.EFFECT,
-            "LaplacianSharpening": ToolCategory.EFFECT,
-            "Posterization": ToolCategory.EFFECT,
-            "SepiaEffect": ToolCategory.EFFECT,
-            "GlitchEffect": ToolCategory.EFFECT,
-            "Dehazing": ToolCategory.EFFECT,
-
-            # Feature Detection Tools
-            "ORBFeatureDetection": ToolCategory.FEATURE_DETECTION,
-            "HoughTransform": ToolCategory.FEATURE_DETECTION,
-
-            # Threshold Tools
-            "SimpleThreshold": ToolCategory.THRESHOLD,
-            "AdaptiveThreshold": ToolCategory.THRESHOLD,
-            "OtsuThreshold": ToolCategory.THRESHOLD,
-
-            # Artistic Effects
-            "Pixelation": ToolCategory.ARTISTIC,
-            "PencilSketch": ToolCategory.ARTISTIC,
-            "OilPainting": ToolCategory.ARTISTIC,
-            "Cartoonization": ToolCategory.ARTISTIC,
-            "Embossing": ToolCategory.ARTISTIC,
-
-            # Transform Tools
-            "WaveletTransform": ToolCategory.TRANSFORM,
-
-            # Texture Tools 
-            "LBP": ToolCategory.TEXTURE,
-            "Gradient": ToolCategory.TEXTURE,
-        }
-
-        # Define tool class mapping
-        self.tools: Dict[str, Type] = {
-            # Filtering & Noise Reduction
-            "Bilateral Filter": BilateralFilterTool,
-            "Gaussian Blur": GaussianBlurTool,
-            "Median Blur": MedianBlurTool,
-            "Gaussian Noise Reduction": GaussianNoiseReductionTool,
-            "NonLocal Means Denoising": NonLocalMeansDenoisingTool,
-            "Wavelet Transform": WaveletTransformTool,
-            "Gabor Filter": GaborFilterTool,
-
-            # Image Enhancement & Adjustment
-            "Brightness Adjustment": BrightnessAdjustmentTool,
-            "Contrast Adjustment": ContrastAdjustmentTool,
-            "Exposure Adjustment": ExposureAdjustmentTool,
-            "Gamma Correction": GammaCorrectionTool,
-            "Hue Adjustment": HueAdjustmentTool,
-            "Saturation Adjustment": SaturationAdjustmentTool,
-            "Vibrance Adjustment": VibranceAdjustmentTool,
-            "Color Balancing": ColorBalancingTool,
-            "Darken Image": DarkenImageTool,
-
-            # Edge Detection & Feature Detection
-            "Canny Edge Detection": CannyEdgeDetectionTool,
-            "Laplacian Edge Detection": LaplacianEdgeDetectionTool,
-            "Prewitt Operator": PrewittOperatorTool,
-            "Sobel Filter": SobelFilterTool,
-            "FAST Corner Detection": FASTCornerDetectionTool,
-            "ORB Feature Detection": ORBFeatureDetectionTool,
-            "SURF Feature Detection": SURFFeatureDetectionTool,
-            "SIFT Feature Detection": SIFTFeatureDetectionTool,
-
-            # Morphological Operations
-            "Erosion": ErosionTool,
-            "Dilation": DilationTool,
-            "Opening": OpeningTool,
-            "Closing": ClosingTool,
-            "TopHat Transform": TopHatTransformTool,
-            "BlackHat Transform": BlackHatTransformTool,
-
-            # Thresholding & Binarization
-            "Otsu Threshold": OtsuThresholdTool,
-            "Simple Threshold": SimpleThresholdTool,
-            "Adaptive Threshold": AdaptiveThresholdTool,
-
-            # Artistic & Stylization Effects
-            "Sepia Effect": SepiaEffectTool,
-            "Pencil Sketch": PencilSketchTool,
-            "Oil Painting": OilPaintingTool,
-            "Cartoonization": CartoonizationTool,
-            "Glitch Effect": GlitchEffectTool,
-            "Pixelation": PixelationTool,
-            "Embossing": EmbossingTool,
-
-            # Color & Transformation Effects
-            "Invert Colors": InvertColorsTool,
-            "Selective Color Replacement": SelectiveColorReplacementTool,
-            "Posterization": PosterizationTool,
-
-            # Image Sharpening & High-Frequency Filtering
-            "Laplacian Sharpening": LaplacianSharpeningTool,
-            "Unsharp Masking": UnsharpMaskingTool,
-            "HighPass Filter": HighPassFilterTool,
-
-            # Image Transformation
-            "Flipping": FlippingMirroringTool,
-            "Hough Transform": HoughTransformTool,
-            "Dehazing": DehazingTool,
+    """Registry of the processing tools.
+
+    Tools are registered by "module:Class" path and their modules are only
+    imported when a tool is first created, so listing names and categories
+    stays cheap and startup doesn't pay for tools a session never uses.
+    Plugin tools (see utils/plugins.py) are added after the built-in ones.
+    """
+
+    def __init__(self, load_plugins: bool = True, plugin_dirs: Optional[List[str]] = None,
+                 manifest_path: Optional[str] = plugins.DEFAULT_MANIFEST_PATH):
+        # Display name -> "module:Class" path of the tool, imported on first use
+        self.tools: Dict[str, str] = {}
+        # Display name -> category
+        self.categories: Dict[str, ToolCategory] = {}
+        # Class name without the "Tool" suffix -> category
+        self.tool_categories: Dict[str, ToolCategory] = {}
+        # Plugin module name -> file it is loaded from, for directory plugins
+        self._plugin_files: Dict[str, str] = {}
+
+        for name, path, category in BUILTIN_TOOLS:
+            self.register(name, path, category)
+        if load_plugins:
+            for entry in plugins.discover_plugins(plugin_dirs, manifest_path):
+                self._register_plugin(entry)
+
+    def register(self, name: str, path: str, category: ToolCategory):
+        """Adds a tool by display name and "module:Class" path."""
+        if name in self.tools:
+            raise ValueError(f"Tool already registered: {name}")
+        self.tools[name] = path
+        self.categories[name] = category
+        self.tool_categories[self._category_key(path.split(":")[1])] = category
+
+    def _register_plugin(self, entry: Dict):
+        try:
+            category = ToolCategory(entry["category"]) if entry["category"] else ToolCategory.PLUGIN
+        except ValueError:
+            category = ToolCategory.PLUGIN
+        module_name = plugins.plugin_module_name(entry["path"]) if entry.get("path") else entry["module"]
+        try:
+            self.register(entry["name"], f"{module_name}:{entry['class']}", category)
+        except ValueError as e:
+            warnings.warn(f"Skipping plugin tool: {str(e)}")
+            return
+        if entry.get("path"):
+            self._plugin_files[module_name] = entry["path"]
 
-            # Texture & Feature Analysis
-            "LBP": LBPTool,
-            "Gradient": GradientTool,
-        }
+    @staticmethod
+    def _category_key(class_name: str) -> str:
+        return class_name[:-len("Tool")] if class_name.endswith("Tool") else class_name
 
     def get_available_tools(self) -> List[str]:
         """Returns a list of all available tool names."""
         return list(self.tools.keys())
 
-    def get_tool(self, name: str):
-        """Creates and returns an instance of the specified tool."""
+    def get_tool_class(self, name: str) -> Type:
+        """Imports (once) and returns the class of the specified tool."""
         if name not in self.tools:
             raise ValueError(f"Unknown tool: {name}")
+        module_name, class_name = self.tools[name].split(":")
         try:
-            return self.tools[name]()
+            if module_name in self._plugin_files:
+                module = plugins.load_plugin_file(self._plugin_files[module_name])
+            else:
+                module = importlib.import_module(module_name)
+            return getattr(module, class_name)
+        except (ImportError, AttributeError, OSError) as e:
+            raise RuntimeError(f"Error loading tool {name}: {str(e)}")
+
+    def get_tool(self, name: str):
+        """Creates and returns an instance of the specified tool."""
+        tool_class = self.get_tool_class(name)
+        try:
+            return tool_class()
         except Exception as e:
             raise RuntimeError(f"Error creating tool {name}: {str(e)}")
 
@@ -254,13 +187,26 @@ class ToolManager:
             raise ValueError(f"Unknown tool: {tool_name}")
         return self.tool_categories[tool_name]
 
+    def get_display_category(self, display_name: str) -> ToolCategory:
+        """Returns the category of a tool by its display name, without importing it."""
+        if display_name not in self.categories:
+            raise ValueError(f"Unknown tool: {display_name}")
+        return self.categories[display_name]
+
     def get_all_categories(self) -> List[ToolCategory]:
         """Returns a list of all available tool categories."""
-        return list(set(self.tool_categories.values()))
+        return list(set(self.categories.values()))
+
+    def get_display_name(self, tool) -> str:
+        """Returns the display name registered for a tool instance's class."""
+        path = f"{type(tool).__module__}:{type(tool).__name__}"
+        for display_name, tool_path in self.tools.items():
+            if tool_path == path:
+                return display_name
+        raise ValueError(f"Unregistered tool: {tool.__class__.__name__}")
 
-    # In tool_manager.py, add this method to the ToolManager class
     def get_tool_class_name(self, display_name: str) -> str:
         """Gets the class name for a tool based on its display name."""
         if display_name not in self.tools:
             raise ValueError(f"Unknown tool: {display_name}")
-        return self.tools[display_name].__name__
\ No newline at end of file
+        return self.tools[display_name].split(":")[1]